@@ -0,0 +1,28 @@
+"""Add patient phone and date of birth index
+
+Revision ID: 3f9df75c44f0
+Revises: ba5aa6971622
+Create Date: 2026-10-19 13:21:37.604192
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9df75c44f0'
+down_revision = 'ba5aa6971622'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Поиск дубликатов при импорте: (телефон без форматирования, дата рождения)
+    op.execute(
+        "CREATE INDEX ix_patients_phone_digits_dob ON patients "
+        "((regexp_replace(coalesce(phone, ''), '\\D', '', 'g')), date_of_birth)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_patients_phone_digits_dob', table_name='patients')
@@ -0,0 +1,49 @@
+"""Add icd10 codes
+
+Revision ID: 409c97ed880d
+Revises: 9f6de2f47c48
+Create Date: 2026-10-19 17:42:11.508236
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '409c97ed880d'
+down_revision = '9f6de2f47c48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Справочник МКБ-10 (заполняется командой manage.py load-icd10)
+    op.create_table(
+        'icd10_codes',
+        sa.Column('code', sa.String(length=10), nullable=False),
+        sa.Column('title', sa.String(length=500), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('code')
+    )
+    # Нечеткий поиск по названию, пока справочник не загружен в память
+    op.create_index(
+        'ix_icd10_codes_title_trgm', 'icd10_codes', ['title'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'title': 'gin_trgm_ops'}
+    )
+
+    # Коды диагнозов приводятся к виду справочника (j069 -> J06.9)
+    op.execute(
+        "UPDATE diagnoses SET icd_code = substr(upper(icd_code), 1, 3) || '.' || substr(upper(icd_code), 4) "
+        "WHERE icd_code ~* '^[A-Z][0-9]{2}[0-9A-Z]{1,4}$'"
+    )
+    op.execute("UPDATE diagnoses SET icd_code = upper(icd_code) WHERE icd_code <> upper(icd_code)")
+    # Группировка диагнозов по коду в статистике
+    op.create_index(op.f('ix_diagnoses_icd_code'), 'diagnoses', ['icd_code'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_diagnoses_icd_code'), table_name='diagnoses')
+    op.drop_index('ix_icd10_codes_title_trgm', table_name='icd10_codes')
+    op.drop_table('icd10_codes')
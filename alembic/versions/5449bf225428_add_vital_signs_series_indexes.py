@@ -0,0 +1,39 @@
+"""Add vital signs series indexes
+
+Revision ID: 5449bf225428
+Revises: a76a41f0b16d
+Create Date: 2026-10-19 15:32:41.207354
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5449bf225428'
+down_revision = 'a76a41f0b16d'
+branch_labels = None
+depends_on = None
+
+
+VITAL_COLUMNS = [
+    'blood_pressure_systolic', 'blood_pressure_diastolic', 'heart_rate',
+    'temperature', 'weight', 'height', 'bmi',
+]
+
+
+def upgrade() -> None:
+    # Временной ряд показателей: visits(patient_id, id) -> vital_signs(visit_id, measured_at) INCLUDE (...)
+    op.create_index('ix_visits_patient_id_id', 'visits', ['patient_id', 'id'], unique=False)
+    op.create_index(
+        'ix_vital_signs_visit_measured_at', 'vital_signs', ['visit_id', 'measured_at'],
+        unique=False, postgresql_include=VITAL_COLUMNS
+    )
+    # Покрывается составным индексом
+    op.drop_index(op.f('ix_vital_signs_visit_id'), table_name='vital_signs')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_vital_signs_visit_id'), 'vital_signs', ['visit_id'], unique=False)
+    op.drop_index('ix_vital_signs_visit_measured_at', table_name='vital_signs')
+    op.drop_index('ix_visits_patient_id_id', table_name='visits')
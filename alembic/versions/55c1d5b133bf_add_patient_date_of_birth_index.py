@@ -0,0 +1,25 @@
+"""Add patient date of birth index
+
+Revision ID: 55c1d5b133bf
+Revises: 3f9df75c44f0
+Create Date: 2026-10-19 14:02:51.947310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '55c1d5b133bf'
+down_revision = '3f9df75c44f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Кандидаты в дубликаты ищутся по дате рождения
+    op.create_index(op.f('ix_patients_date_of_birth'), 'patients', ['date_of_birth'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_patients_date_of_birth'), table_name='patients')
@@ -0,0 +1,41 @@
+"""Add appointment intervals
+
+Revision ID: 59ceff042ea5
+Revises: 93cde7aa86d0
+Create Date: 2026-10-19 18:54:03.719410
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '59ceff042ea5'
+down_revision = '93cde7aa86d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Время окончания приема (поддерживается приложением)
+    op.add_column('appointments', sa.Column('ends_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE appointments SET ends_at = scheduled_date + duration_minutes * interval '1 minute'")
+    op.alter_column('appointments', 'ends_at', nullable=False)
+
+    op.create_index(
+        'ix_appointments_doctor_scheduled_date', 'appointments', ['doctor_id', 'scheduled_date'], unique=False
+    )
+
+    # Пересечение интервалов (&&) по врачу; выражение должно совпадать с period_expr()
+    # в app/modules/appointments/availability.py
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        "CREATE INDEX ix_appointments_doctor_period ON appointments "
+        "USING gist (doctor_id, tstzrange(scheduled_date, ends_at, '[)'))"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_appointments_doctor_period', table_name='appointments')
+    op.drop_index('ix_appointments_doctor_scheduled_date', table_name='appointments')
+    op.drop_column('appointments', 'ends_at')
@@ -0,0 +1,30 @@
+"""Add partial index for live appointments
+
+Revision ID: 7f6a56e2066f
+Revises: eb11aeea4f55
+Create Date: 2026-10-19 21:34:47.208351
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f6a56e2066f'
+down_revision = 'eb11aeea4f55'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Предстоящие записи и поиск неявок читают только записи, ждущие пациента
+    op.create_index(
+        'ix_appointments_live_scheduled_date', 'appointments', ['scheduled_date'],
+        unique=False,
+        postgresql_where=sa.text("status IN ('SCHEDULED', 'CONFIRMED')"),
+        postgresql_include=['doctor_id', 'ends_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_appointments_live_scheduled_date', table_name='appointments')
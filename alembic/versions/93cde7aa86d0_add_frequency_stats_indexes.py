@@ -0,0 +1,29 @@
+"""Add frequency stats indexes
+
+Revision ID: 93cde7aa86d0
+Revises: 409c97ed880d
+Create Date: 2026-10-19 18:20:37.164902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '93cde7aa86d0'
+down_revision = '409c97ed880d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Частотная статистика: visits(visit_date) INCLUDE (...) -> diagnoses/treatments(visit_id, ключ)
+    # (составные индексы diagnoses/treatments создает a76a41f0b16d)
+    op.create_index(
+        'ix_visits_visit_date', 'visits', ['visit_date'],
+        unique=False, postgresql_include=['doctor_id', 'patient_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_visits_visit_date', table_name='visits')
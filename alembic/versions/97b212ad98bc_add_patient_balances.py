@@ -0,0 +1,49 @@
+"""Add patient balances
+
+Revision ID: 97b212ad98bc
+Revises: 9df6e2cea083
+Create Date: 2026-10-19 11:40:27.903114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '97b212ad98bc'
+down_revision = '9df6e2cea083'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('patient_balances',
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('outstanding', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('overdue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('paid', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('invoices_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('patient_id')
+    )
+    op.create_index(op.f('ix_patient_balances_outstanding'), 'patient_balances', ['outstanding'], unique=False)
+    op.create_index(op.f('ix_patient_balances_overdue'), 'patient_balances', ['overdue'], unique=False)
+
+    # Заполняем балансы по существующим счетам
+    op.execute("""
+        INSERT INTO patient_balances (patient_id, outstanding, overdue, paid, invoices_count)
+        SELECT patient_id,
+               COALESCE(SUM(CASE WHEN status IN ('PENDING', 'OVERDUE') THEN amount ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN status = 'OVERDUE' THEN amount ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN status = 'PAID' THEN amount ELSE 0 END), 0),
+               COUNT(id)
+        FROM billing
+        GROUP BY patient_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_patient_balances_overdue'), table_name='patient_balances')
+    op.drop_index(op.f('ix_patient_balances_outstanding'), table_name='patient_balances')
+    op.drop_table('patient_balances')
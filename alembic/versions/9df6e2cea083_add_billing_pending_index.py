@@ -0,0 +1,28 @@
+"""Add partial index for pending billing
+
+Revision ID: 9df6e2cea083
+Revises: 58c1272fe7f4
+Create Date: 2026-10-19 10:12:04.518213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9df6e2cea083'
+down_revision = '58c1272fe7f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_billing_pending_created_at', 'billing', ['created_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDING'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_billing_pending_created_at', table_name='billing')
@@ -0,0 +1,47 @@
+"""Compute vital signs bmi
+
+Revision ID: 9f6de2f47c48
+Revises: 5449bf225428
+Create Date: 2026-10-19 16:05:12.613780
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f6de2f47c48'
+down_revision = '5449bf225428'
+branch_labels = None
+depends_on = None
+
+
+BMI_EXPRESSION = "CASE WHEN height > 0 THEN round(weight * 100000.0 / (height * height)) / 10.0 END"
+
+VITAL_COLUMNS = [
+    'blood_pressure_systolic', 'blood_pressure_diastolic', 'heart_rate',
+    'temperature', 'weight', 'height', 'bmi',
+]
+
+
+def _create_series_index() -> None:
+    op.create_index(
+        'ix_vital_signs_visit_measured_at', 'vital_signs', ['visit_id', 'measured_at'],
+        unique=False, postgresql_include=VITAL_COLUMNS
+    )
+
+
+def upgrade() -> None:
+    # Обычную колонку нельзя сделать вычисляемой - пересоздаем (значения считаются при перезаписи таблицы)
+    op.drop_index('ix_vital_signs_visit_measured_at', table_name='vital_signs')
+    op.drop_column('vital_signs', 'bmi')
+    op.add_column('vital_signs', sa.Column('bmi', sa.Float(), sa.Computed(BMI_EXPRESSION, persisted=True), nullable=True))
+    _create_series_index()
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vital_signs_visit_measured_at', table_name='vital_signs')
+    op.drop_column('vital_signs', 'bmi')
+    op.add_column('vital_signs', sa.Column('bmi', sa.Float(), nullable=True))
+    op.execute(f"UPDATE vital_signs SET bmi = {BMI_EXPRESSION}")
+    _create_series_index()
@@ -0,0 +1,46 @@
+"""Add patient history indexes
+
+Revision ID: a76a41f0b16d
+Revises: 55c1d5b133bf
+Create Date: 2026-10-19 14:47:10.382915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a76a41f0b16d'
+down_revision = '55c1d5b133bf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Лента событий пациента: (patient_id, дата события)
+    op.create_index('ix_appointments_patient_scheduled_date', 'appointments', ['patient_id', 'scheduled_date'], unique=False)
+    op.create_index('ix_visits_patient_visit_date', 'visits', ['patient_id', 'visit_date'], unique=False)
+    op.create_index('ix_prescriptions_patient_prescription_date', 'prescriptions', ['patient_id', 'prescription_date'], unique=False)
+    op.create_index('ix_surgeries_patient_operation_date', 'surgeries', ['patient_id', 'operation_date'], unique=False)
+    op.create_index('ix_billing_patient_created_at', 'billing', ['patient_id', 'created_at'], unique=False)
+
+    # Подгрузка связанных данных визитов и рецептов (составные индексы покрывают и поиск по visit_id)
+    op.create_index('ix_diagnoses_visit_id_icd_code', 'diagnoses', ['visit_id', 'icd_code'], unique=False)
+    op.create_index(
+        'ix_treatments_visit_id_treatment_name', 'treatments', ['visit_id', 'treatment_name'], unique=False
+    )
+    op.create_index(op.f('ix_vital_signs_visit_id'), 'vital_signs', ['visit_id'], unique=False)
+    op.create_index(op.f('ix_medications_prescription_id'), 'medications', ['prescription_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_medications_prescription_id'), table_name='medications')
+    op.drop_index(op.f('ix_vital_signs_visit_id'), table_name='vital_signs')
+    op.drop_index('ix_treatments_visit_id_treatment_name', table_name='treatments')
+    op.drop_index('ix_diagnoses_visit_id_icd_code', table_name='diagnoses')
+
+    op.drop_index('ix_billing_patient_created_at', table_name='billing')
+    op.drop_index('ix_surgeries_patient_operation_date', table_name='surgeries')
+    op.drop_index('ix_prescriptions_patient_prescription_date', table_name='prescriptions')
+    op.drop_index('ix_visits_patient_visit_date', table_name='visits')
+    op.drop_index('ix_appointments_patient_scheduled_date', table_name='appointments')
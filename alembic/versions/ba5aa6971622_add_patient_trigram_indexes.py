@@ -0,0 +1,40 @@
+"""Add patient trigram indexes
+
+Revision ID: ba5aa6971622
+Revises: 97b212ad98bc
+Create Date: 2026-10-19 12:05:48.316027
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ba5aa6971622'
+down_revision = '97b212ad98bc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for column in ('last_name', 'first_name', 'middle_name'):
+        op.create_index(
+            f'ix_patients_{column}_trgm', 'patients', [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+    # Выражение должно совпадать с phone_digits_expr() в app/modules/patients/search.py
+    op.execute(
+        "CREATE INDEX ix_patients_phone_digits_trgm ON patients "
+        "USING gin ((regexp_replace(coalesce(phone, ''), '\\D', '', 'g')) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_patients_phone_digits_trgm', table_name='patients')
+    for column in ('middle_name', 'first_name', 'last_name'):
+        op.drop_index(f'ix_patients_{column}_trgm', table_name='patients')
@@ -0,0 +1,51 @@
+"""Add appointment exclusion constraint
+
+Revision ID: be0590932ef0
+Revises: 59ceff042ea5
+Create Date: 2026-10-19 19:31:46.902157
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'be0590932ef0'
+down_revision = '59ceff042ea5'
+branch_labels = None
+depends_on = None
+
+# Enum хранится по имени; должно совпадать с ACTIVE_STATUSES в app/modules/appointments/availability.py
+ACTIVE_STATUSES = "('SCHEDULED', 'CONFIRMED', 'IN_PROGRESS')"
+PERIOD = "tstzrange(scheduled_date, ends_at, '[)')"
+
+
+def upgrade() -> None:
+    # Уже пересекающиеся записи нужно разрешить вручную до создания ограничения
+    overlaps = op.get_bind().execute(sa.text(
+        "SELECT a.id, b.id FROM appointments a JOIN appointments b "
+        "ON b.doctor_id = a.doctor_id AND b.id > a.id "
+        "AND tstzrange(b.scheduled_date, b.ends_at, '[)') && tstzrange(a.scheduled_date, a.ends_at, '[)') "
+        f"WHERE a.status IN {ACTIVE_STATUSES} AND b.status IN {ACTIVE_STATUSES} "
+        "LIMIT 20"
+    )).all()
+    if overlaps:
+        pairs = ", ".join(f"{first}/{second}" for first, second in overlaps)
+        raise RuntimeError(f"Overlapping active appointments must be rescheduled or cancelled first: {pairs}")
+
+    # Запрет двойной записи к врачу (btree_gist создан в 59ceff042ea5)
+    op.execute(
+        "ALTER TABLE appointments ADD CONSTRAINT ex_appointments_doctor_period "
+        f"EXCLUDE USING gist (doctor_id WITH =, {PERIOD} WITH &&) "
+        f"WHERE (status IN {ACTIVE_STATUSES})"
+    )
+    # Запросы с && используют индекс ограничения
+    op.drop_index('ix_appointments_doctor_period', table_name='appointments')
+
+
+def downgrade() -> None:
+    op.execute(
+        "CREATE INDEX ix_appointments_doctor_period ON appointments "
+        f"USING gist (doctor_id, {PERIOD})"
+    )
+    op.execute("ALTER TABLE appointments DROP CONSTRAINT ex_appointments_doctor_period")
@@ -0,0 +1,47 @@
+"""Add doctor schedules
+
+Revision ID: cc15254cf6fe
+Revises: be0590932ef0
+Create Date: 2026-10-19 20:14:37.281905
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cc15254cf6fe'
+down_revision = 'be0590932ef0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Недельные шаблоны и исключения на даты; врач без правил принимает в любое время
+    op.create_table(
+        'doctor_schedules',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('doctor_id', sa.Integer(), nullable=False),
+        sa.Column('weekday', sa.Integer(), nullable=True),
+        sa.Column('schedule_date', sa.Date(), nullable=True),
+        sa.Column('start_time', sa.Time(), nullable=True),
+        sa.Column('end_time', sa.Time(), nullable=True),
+        sa.Column('is_available', sa.String(length=1), nullable=False),
+        sa.Column('note', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.CheckConstraint('(weekday IS NULL) <> (schedule_date IS NULL)', name='ck_doctor_schedules_weekday_or_date'),
+        sa.ForeignKeyConstraint(['doctor_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_doctor_schedules_id'), 'doctor_schedules', ['id'], unique=False)
+    # Пересборка расписания врача по одному дню недели или одной дате
+    op.create_index('ix_doctor_schedules_doctor_weekday', 'doctor_schedules', ['doctor_id', 'weekday'], unique=False)
+    op.create_index('ix_doctor_schedules_doctor_date', 'doctor_schedules', ['doctor_id', 'schedule_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_doctor_schedules_doctor_date', table_name='doctor_schedules')
+    op.drop_index('ix_doctor_schedules_doctor_weekday', table_name='doctor_schedules')
+    op.drop_index(op.f('ix_doctor_schedules_id'), table_name='doctor_schedules')
+    op.drop_table('doctor_schedules')
@@ -0,0 +1,29 @@
+"""Add index on visits by appointment
+
+Revision ID: dcfb5c3266a0
+Revises: 7f6a56e2066f
+Create Date: 2026-10-20 09:12:31.417205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'dcfb5c3266a0'
+down_revision = '7f6a56e2066f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Поиск неявок проверяет отсутствие визита по записи (NOT EXISTS), лист дня соединяет по нему
+    op.create_index(
+        'ix_visits_appointment_id', 'visits', ['appointment_id'],
+        unique=False,
+        postgresql_where=sa.text('appointment_id IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_visits_appointment_id', table_name='visits')
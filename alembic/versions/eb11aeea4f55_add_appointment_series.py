@@ -0,0 +1,63 @@
+"""Add appointment series
+
+Revision ID: eb11aeea4f55
+Revises: cc15254cf6fe
+Create Date: 2026-10-19 20:52:08.614730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'eb11aeea4f55'
+down_revision = 'cc15254cf6fe'
+branch_labels = None
+depends_on = None
+
+# Тип уже создан вместе с таблицей appointments
+APPOINTMENT_TYPE = postgresql.ENUM(
+    'CONSULTATION', 'EXAMINATION', 'PROCEDURE', 'SURGERY', 'FOLLOW_UP', 'EMERGENCY',
+    name='appointmenttype', create_type=False
+)
+
+
+def upgrade() -> None:
+    # Серии повторяющихся записей (курсы процедур)
+    op.create_table(
+        'appointment_series',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('doctor_id', sa.Integer(), nullable=False),
+        sa.Column('appointment_type', APPOINTMENT_TYPE, nullable=False),
+        sa.Column('rrule', sa.String(length=500), nullable=False),
+        sa.Column('starts_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('duration_minutes', sa.Integer(), nullable=False),
+        sa.Column('reason', sa.String(length=255), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['doctor_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_appointment_series_id'), 'appointment_series', ['id'], unique=False)
+
+    op.add_column('appointments', sa.Column('series_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'appointments_series_id_fkey', 'appointments', 'appointment_series', ['series_id'], ['id']
+    )
+    # Записи серии начиная с даты ("эта и следующие")
+    op.create_index(
+        'ix_appointments_series_scheduled_date', 'appointments', ['series_id', 'scheduled_date'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_appointments_series_scheduled_date', table_name='appointments')
+    op.drop_constraint('appointments_series_id_fkey', 'appointments', type_='foreignkey')
+    op.drop_column('appointments', 'series_id')
+    op.drop_index(op.f('ix_appointment_series_id'), table_name='appointment_series')
+    op.drop_table('appointment_series')
@@ -1,4 +1,6 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings
+from datetime import time
 from typing import List
 
 
@@ -11,6 +13,7 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str
+    reference_precheck: bool = True  # Проверять ссылки запросом до записи; False - только FK (IntegrityError -> 404)
 
     @property
     def async_database_url(self) -> str:
@@ -32,6 +35,39 @@ class Settings(BaseSettings):
     
     # Logging
     log_level: str = "INFO"
+
+    # Background jobs
+    scheduler_enabled: bool = True
+    batch_chunk_size: int = 1000  # Размер порции для пакетных UPDATE
+
+    # Billing
+    billing_overdue_days: int = 30  # Через сколько дней неоплаченный счет считается просроченным
+    billing_overdue_sweep_interval_minutes: int = 60  # 0 - отключить фоновую задачу
+
+    # Patients
+    typeahead_enabled: bool = True  # Индекс автодополнения в памяти процесса
+    typeahead_rebuild_interval_minutes: int = 60  # Сверка с БД (изменения из других процессов), 0 - отключить
+    patient_cache_size: int = 10000  # Карточек пациентов в кэше процесса, 0 - отключить
+    patient_cache_ttl_seconds: int = 60  # Ограничивает устаревание при записи из других процессов
+
+    # Appointments
+    clinic_timezone: str = "UTC"  # Часовой пояс рабочего времени
+    # Шаблон клиники для врачей без недельного шаблона в doctor_schedules
+    working_hours_start: time = time(9, 0)
+    working_hours_end: time = time(18, 0)
+    working_days: List[int] = [0, 1, 2, 3, 4]  # 0 - понедельник
+    schedule_reload_interval_minutes: int = 5  # Подхватывать изменения расписаний из других процессов
+    slot_step_minutes: int = 15  # Сетка свободных слотов
+    appointment_no_show_grace_minutes: int = Field(60, ge=0)  # Через сколько минут после окончания запись без приема - неявка
+    appointment_no_show_sweep_interval_minutes: int = 15  # 0 - отключить фоновую задачу
+
+    # Stats
+    stats_refresh_interval_minutes: int = 1440  # Ежедневный пересчет сводной статистики, 0 - отключить
+    stats_cache_size: int = 256  # Наборов параметров частотной статистики в кэше процесса
+    stats_cache_ttl_seconds: int = 86400  # Сбрасывается пересчетом; TTL - для записей других процессов
+
+    # ICD-10
+    icd10_reload_interval_minutes: int = 0  # Перечитывать справочник периодически, 0 - только при старте и POST /icd10/reload
     
     class Config:
         env_file = ".env"
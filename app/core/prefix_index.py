@@ -0,0 +1,91 @@
+"""
+Префиксный индекс в памяти (отсортированный массив + bisect)
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Iterable, List, Optional, Tuple
+
+# Символ, который больше любого реального символа ключа
+_MAX_CHAR = "\U0010ffff"
+
+
+class PrefixIndex:
+    """Отсортированные пары (ключ, id) с поиском по префиксу за O(log n + k)"""
+
+    __slots__ = ("_keys", "_ids")
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._ids = array("q")
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def build(self, pairs: Iterable[Tuple[str, int]]) -> None:
+        """Построить индекс заново из пар (ключ, id)"""
+        ordered = sorted(pair for pair in pairs if pair[0])
+        self._keys = [key for key, _ in ordered]
+        self._ids = array("q", (item_id for _, item_id in ordered))
+
+    def add(self, key: str, item_id: int) -> None:
+        """Добавить пару (ключ, id)"""
+        if not key:
+            return
+        position = self._position(key, item_id)
+        if position < len(self._keys) and self._keys[position] == key and self._ids[position] == item_id:
+            return
+        self._keys.insert(position, key)
+        self._ids.insert(position, item_id)
+
+    def remove(self, key: str, item_id: int) -> None:
+        """Удалить пару (ключ, id), если она есть"""
+        if not key:
+            return
+        position = self._position(key, item_id)
+        if position < len(self._keys) and self._keys[position] == key and self._ids[position] == item_id:
+            del self._keys[position]
+            del self._ids[position]
+
+    def count(self, prefix: str) -> int:
+        """Количество пар, у которых ключ начинается с prefix"""
+        start = bisect_left(self._keys, prefix)
+        return bisect_right(self._keys, prefix + _MAX_CHAR, lo=start) - start
+
+    def search(
+        self,
+        prefix: str,
+        limit: int,
+        accept: Optional[Callable[[int], bool]] = None,
+        max_scan: Optional[int] = None,
+    ) -> List[int]:
+        """Найти до limit уникальных id, у которых ключ начинается с prefix"""
+        start = bisect_left(self._keys, prefix)
+        stop = bisect_right(self._keys, prefix + _MAX_CHAR, lo=start)
+        if max_scan is not None:
+            stop = min(stop, start + max_scan)
+
+        found: List[int] = []
+        seen = set()
+        for position in range(start, stop):
+            item_id = self._ids[position]
+            if item_id in seen:
+                continue
+            seen.add(item_id)
+            if accept is None or accept(item_id):
+                found.append(item_id)
+                if len(found) >= limit:
+                    break
+        return found
+
+    def _position(self, key: str, item_id: int) -> int:
+        """Позиция пары в отсортированном порядке (ключ, id)"""
+        lo = bisect_left(self._keys, key)
+        hi = bisect_right(self._keys, key, lo=lo)
+        # Среди одинаковых ключей id тоже упорядочены
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._ids[mid] < item_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
@@ -0,0 +1,73 @@
+"""
+Планировщик периодических фоновых задач (in-process)
+"""
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Scheduler:
+    """Простой планировщик периодических задач на asyncio"""
+
+    def __init__(self):
+        self._jobs: Dict[str, tuple] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, func: Callable[[], Awaitable], interval_seconds: float) -> None:
+        """Зарегистрировать периодическую задачу"""
+        if interval_seconds <= 0:
+            logger.info(f"Job '{name}' is disabled (interval={interval_seconds})")
+            return
+        self._jobs[name] = (func, interval_seconds)
+        logger.info(f"Registered job '{name}' every {interval_seconds}s")
+
+    def every(self, interval_seconds: float, name: Optional[str] = None):
+        """Декоратор для регистрации периодической задачи"""
+        def decorator(func: Callable[[], Awaitable]):
+            self.add_job(name or func.__name__, func, interval_seconds)
+            return func
+        return decorator
+
+    async def _run_forever(self, name: str, func: Callable[[], Awaitable], interval_seconds: float) -> None:
+        """Цикл выполнения задачи: первый запуск через один интервал"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in job '{name}': {e}", exc_info=True)
+
+    def run_once(self, name: str, func: Callable[[], Awaitable]) -> None:
+        """Однократно выполнить задачу в фоне (например, прогрев при старте)"""
+        async def runner():
+            try:
+                await func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in job '{name}': {e}", exc_info=True)
+
+        self._tasks.append(asyncio.create_task(runner(), name=f"once:{name}"))
+
+    def start(self) -> None:
+        """Запустить все зарегистрированные задачи"""
+        for name, (func, interval_seconds) in self._jobs.items():
+            task = asyncio.create_task(self._run_forever(name, func, interval_seconds), name=f"job:{name}")
+            self._tasks.append(task)
+        if self._jobs:
+            logger.info(f"Scheduler started with {len(self._jobs)} job(s)")
+
+    async def stop(self) -> None:
+        """Остановить все задачи"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+
+# Глобальный экземпляр планировщика
+scheduler = Scheduler()
@@ -0,0 +1,49 @@
+"""
+Пакетные (set-based) операции над БД
+"""
+from typing import Any, AsyncIterator, Dict, List, Sequence
+from sqlalchemy import select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def iter_chunked_update(
+    db: AsyncSession,
+    model,
+    where: Sequence[Any],
+    values: Dict[str, Any],
+    returning: Sequence[Any],
+    chunk_size: int = 1000,
+) -> AsyncIterator[List[Row]]:
+    """
+    UPDATE ... WHERE id IN (SELECT id ... LIMIT n FOR UPDATE SKIP LOCKED) RETURNING ...
+    порциями по chunk_size строк, с коммитом после каждой порции,
+    чтобы не держать долгих блокировок. Порция отдается вызывающему коду
+    до коммита, так что его дополнительные запросы попадают в ту же транзакцию.
+    Условие where должно перестать выполняться для обновленных строк,
+    иначе цикл не завершится.
+    """
+    while True:
+        ids_query = (
+            select(model.id)
+            .where(*where)
+            .order_by(model.id)
+            .limit(chunk_size)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            update(model)
+            .where(model.id.in_(ids_query))
+            .values(**values)
+            .returning(*returning)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(query)
+        rows = list(result.all())
+
+        if rows:
+            yield rows
+        await db.commit()
+
+        if len(rows) < chunk_size:
+            break
@@ -0,0 +1,63 @@
+"""
+Обновление дочерних коллекций по разнице (вставки/изменения/удаления)
+"""
+from collections import defaultdict
+from typing import Any, Dict, List, NamedTuple, Sequence
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class CollectionDiff(NamedTuple):
+    """Разница между текущими и желаемыми дочерними строками"""
+    inserts: List[Dict[str, Any]]
+    updates: List[Dict[str, Any]]  # {"id": ..., <только измененные поля>}
+    deletes: List[int]
+
+    @property
+    def empty(self) -> bool:
+        return not (self.inserts or self.updates or self.deletes)
+
+
+def diff_collection(
+    existing: Sequence[Any],
+    desired: Sequence[Dict[str, Any]],
+    key_fields: Sequence[str],
+    fields: Sequence[str],
+) -> CollectionDiff:
+    """
+    Сопоставить текущие строки (объекты или Row с id) с желаемыми словарями
+    по естественному ключу key_fields. Совпавшие строки обновляются только
+    по измененным полям, лишние удаляются, недостающие вставляются.
+    """
+    pool: Dict[tuple, List[Any]] = defaultdict(list)
+    for row in existing:
+        pool[tuple(getattr(row, field) for field in key_fields)].append(row)
+
+    inserts, updates = [], []
+    for values in desired:
+        candidates = pool.get(tuple(values.get(field) for field in key_fields))
+        if not candidates:
+            inserts.append(values)
+            continue
+        row = candidates.pop(0)
+        changed = {field: values.get(field) for field in fields if getattr(row, field) != values.get(field)}
+        if changed:
+            updates.append({"id": row.id, **changed})
+
+    deletes = [row.id for rows in pool.values() for row in rows]
+    return CollectionDiff(inserts, updates, deletes)
+
+
+async def apply_collection_diff(
+    db: AsyncSession, model, parent_column: str, parent_id: int, diff: CollectionDiff
+) -> None:
+    """DELETE ... WHERE id IN, executemany UPDATE и многострочный INSERT (без коммита)"""
+    if diff.deletes:
+        await db.execute(
+            delete(model).where(model.id.in_(diff.deletes)).execution_options(synchronize_session=False)
+        )
+    if diff.updates:
+        # ORM bulk UPDATE по первичному ключу (executemany)
+        await db.execute(update(model), diff.updates)
+    if diff.inserts:
+        await db.execute(insert(model), [{**values, parent_column: parent_id} for values in diff.inserts])
@@ -0,0 +1,81 @@
+"""
+Проверка ссылок (внешних ключей) перед записью
+
+Все ссылки запроса проверяются одним SELECT EXISTS(...), EXISTS(...), ...
+Если предварительная проверка отключена (settings.reference_precheck = False),
+полагаемся на FK-ограничения БД и переводим нарушение (23503) в 404.
+"""
+import re
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, NamedTuple, Optional, Sequence
+from sqlalchemy import exists, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.exceptions import NotFoundException
+
+FOREIGN_KEY_VIOLATION = "23503"
+
+# Колонка FK -> название сущности в сообщении об ошибке
+REFERENCE_LABELS: Dict[str, str] = {
+    "patient_id": "Patient",
+    "doctor_id": "Doctor",
+    "surgeon_id": "Surgeon",
+    "visit_id": "Visit",
+    "appointment_id": "Appointment",
+    "prescription_id": "Prescription",
+    "created_by": "User",
+}
+
+_FK_DETAIL = re.compile(r"Key \((\w+)\)=")
+
+
+class Reference(NamedTuple):
+    """Ссылка на запись: модель, id (None - ссылки нет) и название для 404"""
+    model: type
+    id: Optional[int]
+    label: str
+
+
+def build_references_query(references: Sequence[Reference]):
+    """Один SELECT с EXISTS на каждую ссылку"""
+    return select(*[
+        exists().where(reference.model.id == reference.id).label(f"ref_{index}")
+        for index, reference in enumerate(references)
+    ])
+
+
+async def validate_references(db: AsyncSession, *references: Reference, force: bool = False) -> None:
+    """Проверить ссылки за один запрос; 404 по первой отсутствующей"""
+    references = [reference for reference in references if reference.id is not None]
+    if not references or not (settings.reference_precheck or force):
+        return
+
+    row = (await db.execute(build_references_query(references))).one()
+    for reference, found in zip(references, row):
+        if not found:
+            raise NotFoundException(f"{reference.label} not found")
+
+
+def foreign_key_label(exc: IntegrityError) -> Optional[str]:
+    """Название сущности по нарушению FK (None - это не нарушение FK)"""
+    orig = exc.orig
+    if getattr(orig, "sqlstate", None) != FOREIGN_KEY_VIOLATION:
+        return None
+    detail = getattr(orig.__cause__, "detail", None) or str(orig)
+    match = _FK_DETAIL.search(detail)
+    column = match.group(1) if match else None
+    return REFERENCE_LABELS.get(column, "Referenced record")
+
+
+@asynccontextmanager
+async def foreign_key_errors(db: AsyncSession) -> AsyncIterator[None]:
+    """Перевести нарушение FK при записи в 404 (с откатом транзакции)"""
+    try:
+        yield
+    except IntegrityError as exc:
+        label = foreign_key_label(exc)
+        if label is None:
+            raise
+        await db.rollback()
+        raise NotFoundException(f"{label} not found") from exc
@@ -5,6 +5,7 @@ from fastapi.responses import JSONResponse
 from app.core.config import settings
 from app.core.exceptions import ValidationException, BusinessLogicException
 from app.core.middleware import LoggingMiddleware, RateLimitMiddleware
+from app.core.scheduler import scheduler
 
 # Импорт роутеров (раскомментируй когда создашь)
 from app.modules.auth.router import router as auth_router
@@ -15,6 +16,14 @@ from app.modules.prescriptions.router import router as prescriptions_router
 from app.modules.operations.router import router as operations_router
 from app.modules.stats.router import router as stats_router
 from app.modules.billing.router import router as billing_router
+from app.modules.icd10.router import router as icd10_router
+from app.modules.schedules.router import router as schedules_router
+from app.modules.billing.tasks import mark_overdue_job
+from app.modules.appointments.tasks import mark_no_show_job
+from app.modules.patients.tasks import rebuild_typeahead_job
+from app.modules.icd10.tasks import reload_icd10_job
+from app.modules.stats.tasks import refresh_stats_job
+from app.modules.schedules.tasks import reload_schedules_job
 
 app = FastAPI(
     title=settings.app_name,
@@ -155,6 +164,71 @@ app.include_router(prescriptions_router, prefix="/prescriptions", tags=["Prescri
 app.include_router(operations_router, prefix="/operations", tags=["Operations"])
 app.include_router(stats_router, prefix="/stats", tags=["Statistics"])
 app.include_router(billing_router, prefix="/billing", tags=["Billing"])
+app.include_router(icd10_router, prefix="/icd10", tags=["ICD-10"])
+app.include_router(schedules_router, prefix="/schedules", tags=["Schedules"])
+
+
+# Фоновые задачи
+scheduler.add_job(
+    "billing.mark_overdue", mark_overdue_job,
+    interval_seconds=settings.billing_overdue_sweep_interval_minutes * 60
+)
+scheduler.add_job(
+    "appointments.mark_no_show", mark_no_show_job,
+    interval_seconds=settings.appointment_no_show_sweep_interval_minutes * 60
+)
+if settings.typeahead_enabled:
+    scheduler.add_job(
+        "patients.rebuild_typeahead", rebuild_typeahead_job,
+        interval_seconds=settings.typeahead_rebuild_interval_minutes * 60
+    )
+scheduler.add_job(
+    "stats.refresh", refresh_stats_job,
+    interval_seconds=settings.stats_refresh_interval_minutes * 60
+)
+scheduler.add_job(
+    "icd10.reload_catalog", reload_icd10_job,
+    interval_seconds=settings.icd10_reload_interval_minutes * 60
+)
+scheduler.add_job(
+    "schedules.reload", reload_schedules_job,
+    interval_seconds=settings.schedule_reload_interval_minutes * 60
+)
+
+
+@app.on_event("startup")
+async def start_scheduler():
+    """Запустить фоновые задачи"""
+    if settings.scheduler_enabled:
+        scheduler.start()
+
+
+@app.on_event("startup")
+async def build_typeahead_index():
+    """Построить индекс автодополнения пациентов (в фоне, до готовности поиск идет в БД)"""
+    if settings.scheduler_enabled and settings.typeahead_enabled:
+        scheduler.run_once("patients.build_typeahead", rebuild_typeahead_job)
+
+
+@app.on_event("startup")
+async def load_icd10_catalog():
+    """Загрузить справочник МКБ-10 в память (в фоне, до готовности поиск идет в БД)"""
+    if settings.scheduler_enabled:
+        scheduler.run_once("icd10.load_catalog", reload_icd10_job)
+
+
+@app.on_event("startup")
+async def load_doctor_schedules():
+    """Скомпилировать расписания врачей в память (в фоне; до готовности запись на прием загрузит их сама)"""
+    if settings.scheduler_enabled:
+        scheduler.run_once("schedules.load", reload_schedules_job)
+
+
+@app.on_event("shutdown")
+async def stop_scheduler():
+    """Остановить фоновые задачи"""
+    await scheduler.stop()
+
 
 @app.get("/")
 def root():
@@ -0,0 +1,116 @@
+"""
+Appointments Availability (пересечения интервалов приема врача)
+
+В БД интервал приема - tstzrange(scheduled_date, ends_at, '[)'). Двойную запись
+запрещает ограничение EXCLUDE USING gist (doctor_id WITH =, интервал WITH &&)
+для активных статусов; его GiST-индекс обслуживает и запросы с &&.
+Серия записей проверяется по интервалам врача, загруженным одним запросом
+и отсортированным в памяти.
+"""
+from bisect import bisect_left
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, func, literal_column, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.exceptions import ConflictException
+from .models import Appointment, AppointmentStatus
+
+# Статусы, которые занимают время врача (совпадают с WHERE ограничения ex_appointments_doctor_period)
+ACTIVE_STATUSES = (AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED, AppointmentStatus.IN_PROGRESS)
+
+# Записи, которые еще ждут пациента (совпадают с WHERE частичного индекса ix_appointments_live_scheduled_date)
+LIVE_STATUSES = (AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED)
+
+EXCLUSION_VIOLATION = "23P01"
+
+
+def period_expr():
+    """Интервал приема (выражение совпадает с ограничением ex_appointments_doctor_period)"""
+    return func.tstzrange(Appointment.scheduled_date, Appointment.ends_at, literal_column("'[)'"))
+
+
+def active_status_filter():
+    """Активные статусы; значения встраиваются в SQL, чтобы планировщик сопоставил частичный индекс"""
+    return Appointment.status.in_(
+        bindparam("active_statuses", list(ACTIVE_STATUSES), expanding=True, literal_execute=True)
+    )
+
+
+def live_status_filter():
+    """Записи, ждущие пациента; значения встраиваются в SQL (частичный индекс ix_appointments_live_scheduled_date)"""
+    return Appointment.status.in_(
+        bindparam("live_statuses", list(LIVE_STATUSES), expanding=True, literal_execute=True)
+    )
+
+
+@asynccontextmanager
+async def booking_conflicts(db: AsyncSession) -> AsyncIterator[None]:
+    """Перевести нарушение ограничения двойной записи в 409 (с откатом транзакции)"""
+    try:
+        yield
+    except IntegrityError as exc:
+        if getattr(exc.orig, "sqlstate", None) != EXCLUSION_VIOLATION:
+            raise
+        await db.rollback()
+        raise ConflictException("Time slot is not available") from exc
+
+
+def build_intervals_query(doctor_id: int, start: datetime, end: datetime):
+    """Интервалы активных записей врача, пересекающиеся с [start, end), по времени начала"""
+    return (
+        select(Appointment.scheduled_date, Appointment.ends_at, Appointment.id)
+        .where(
+            Appointment.doctor_id == doctor_id,
+            active_status_filter(),
+            period_expr().op("&&")(func.tstzrange(start, end, literal_column("'[)'"))),
+        )
+        .order_by(Appointment.scheduled_date, Appointment.id)
+    )
+
+
+def build_busy_query(doctor_ids: Sequence[int], start: datetime, end: datetime):
+    """Занятые интервалы нескольких врачей за период одним запросом, по врачу и началу"""
+    return (
+        select(Appointment.doctor_id, Appointment.scheduled_date, Appointment.ends_at)
+        .where(
+            Appointment.doctor_id.in_(doctor_ids),
+            active_status_filter(),
+            period_expr().op("&&")(func.tstzrange(start, end, literal_column("'[)'"))),
+        )
+        .order_by(Appointment.doctor_id, Appointment.scheduled_date)
+    )
+
+
+class DayIntervals:
+    """Отсортированные по началу интервалы врача за день; поиск пересечения за O(log n + k)"""
+
+    __slots__ = ("starts", "ends", "ids", "_max_ends")
+
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime, int]]):
+        ordered = sorted(intervals)
+        self.starts: List[datetime] = [start for start, _, _ in ordered]
+        self.ends: List[datetime] = [end for _, end, _ in ordered]
+        self.ids: List[int] = [item_id for _, _, item_id in ordered]
+        # Максимум окончаний на префиксе: останавливает обратный просмотр (интервалы могут пересекаться)
+        self._max_ends: List[datetime] = []
+        for end in self.ends:
+            self._max_ends.append(max(end, self._max_ends[-1]) if self._max_ends else end)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def find_overlap(self, start: datetime, end: datetime, exclude_id: Optional[int] = None) -> Optional[int]:
+        """id интервала, пересекающегося с [start, end) (None - свободно)"""
+        position = bisect_left(self.starts, end) - 1
+        while position >= 0 and self._max_ends[position] > start:
+            if self.ends[position] > start and self.ids[position] != exclude_id:
+                return self.ids[position]
+            position -= 1
+        return None
+
+
+def as_utc(value: datetime) -> datetime:
+    """Время в UTC (время без часового пояса считается UTC, как его передает asyncpg)"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
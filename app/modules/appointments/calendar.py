@@ -0,0 +1,131 @@
+"""
+Appointments Calendar (лист дня врачей одним запросом)
+
+Записи за период (с визитом, созданным по записи) и визиты без записи
+(пациент пришел без записи) собираются одним UNION ALL с пациентом и врачом,
+упорядоченным по врачу и времени. ETag - хэш строк результата: опрашивающий
+календарь получает 304 без сборки и передачи ответа, если ничего не изменилось.
+"""
+import enum
+import hashlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+from sqlalchemy import String, literal_column, select, union_all
+from app.modules.auth.models import User
+from app.modules.patients.models import Patient
+from app.modules.visits.models import Visit
+from .models import Appointment
+from .schemas import CalendarDoctor, CalendarEntry
+
+
+def build_calendar_query(doctor_ids: Sequence[int], start: datetime, end: datetime):
+    """Записи и визиты без записи врачей за [start, end) с пациентом и врачом, по врачу и времени"""
+    null = literal_column("NULL")
+    appointments = (
+        select(
+            literal_column("'appointment'", String).label("kind"),
+            Appointment.doctor_id.label("doctor_id"),
+            User.full_name.label("doctor_name"),
+            Appointment.scheduled_date.label("starts_at"),
+            Appointment.ends_at.label("ends_at"),
+            Appointment.id.label("appointment_id"),
+            Appointment.status.label("appointment_status"),
+            Appointment.appointment_type.label("appointment_type"),
+            Appointment.reason.label("reason"),
+            Visit.id.label("visit_id"),
+            Visit.status.label("visit_status"),
+            Patient.id.label("patient_id"),
+            Patient.last_name.label("last_name"),
+            Patient.first_name.label("first_name"),
+            Patient.middle_name.label("middle_name"),
+            Patient.phone.label("phone"),
+        )
+        .join(Patient, Patient.id == Appointment.patient_id)
+        .join(User, User.id == Appointment.doctor_id)
+        .outerjoin(Visit, Visit.appointment_id == Appointment.id)
+        .where(
+            Appointment.doctor_id.in_(doctor_ids),
+            Appointment.scheduled_date >= start,
+            Appointment.scheduled_date < end,
+        )
+    )
+    walk_ins = (
+        select(
+            literal_column("'visit'", String),
+            Visit.doctor_id,
+            User.full_name,
+            Visit.visit_date,
+            null,
+            null,
+            null,
+            null,
+            Visit.chief_complaint,
+            Visit.id,
+            Visit.status,
+            Patient.id,
+            Patient.last_name,
+            Patient.first_name,
+            Patient.middle_name,
+            Patient.phone,
+        )
+        .join(Patient, Patient.id == Visit.patient_id)
+        .join(User, User.id == Visit.doctor_id)
+        .where(
+            Visit.doctor_id.in_(doctor_ids),
+            Visit.appointment_id.is_(None),
+            Visit.visit_date >= start,
+            Visit.visit_date < end,
+        )
+    )
+    entries = union_all(appointments, walk_ins).subquery("entries")
+    return select(entries).order_by(entries.c.doctor_id, entries.c.starts_at, entries.c.kind, entries.c.visit_id)
+
+
+def _value(value):
+    """Значение enum для ответа и хэша"""
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def calendar_etag(rows: Iterable) -> str:
+    """Слабый ETag по содержимому строк"""
+    digest = hashlib.sha1()
+    for row in rows:
+        digest.update(repr(tuple(_value(value) for value in row)).encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Совпадает ли If-None-Match с ETag (слабое сравнение, список через запятую или *)"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    plain = etag[2:] if etag.startswith("W/") else etag
+    return "*" in candidates or any(
+        (candidate[2:] if candidate.startswith("W/") else candidate) == plain for candidate in candidates
+    )
+
+
+def group_calendar(rows: Iterable, doctor_ids: Sequence[int]) -> List[CalendarDoctor]:
+    """Строки, упорядоченные по врачу и времени -> расписание по врачам (врачи без записей - пустые)"""
+    doctors: Dict[int, CalendarDoctor] = {
+        doctor_id: CalendarDoctor(doctor_id=doctor_id, entries=[]) for doctor_id in doctor_ids
+    }
+    for row in rows:
+        doctor = doctors[row.doctor_id]
+        doctor.doctor_name = row.doctor_name
+        patient_name = " ".join(part for part in (row.last_name, row.first_name, row.middle_name) if part)
+        doctor.entries.append(CalendarEntry(
+            kind=row.kind,
+            starts_at=row.starts_at,
+            ends_at=row.ends_at,
+            appointment_id=row.appointment_id,
+            appointment_status=row.appointment_status,
+            appointment_type=row.appointment_type,
+            reason=row.reason,
+            visit_id=row.visit_id,
+            visit_status=row.visit_status,
+            patient_id=row.patient_id,
+            patient_name=patient_name,
+            patient_phone=row.phone,
+        ))
+    return list(doctors.values())
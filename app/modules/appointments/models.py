@@ -1,12 +1,20 @@
 """
 Appointments Models
 """
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, DateTime, Text, ForeignKey, Enum
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+from sqlalchemy import String, DateTime, Text, ForeignKey, Enum, Index, text
 from sqlalchemy.sql import func
+from datetime import datetime, timedelta
 from app.db.session import Base
 import enum
 
+DEFAULT_DURATION_MINUTES = 30
+
+
+def appointment_end(scheduled_date: datetime, duration_minutes: int) -> datetime:
+    """Время окончания приема"""
+    return scheduled_date + timedelta(minutes=duration_minutes)
+
 
 class AppointmentStatus(str, enum.Enum):
     """Статус записи"""
@@ -28,15 +36,59 @@ class AppointmentType(str, enum.Enum):
     EMERGENCY = "emergency"         # Экстренный случай
 
 
+class AppointmentSeries(Base):
+    """Серия повторяющихся записей (курс процедур): правило RRULE от первого приема"""
+    __tablename__ = "appointment_series"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+
+    # Связи
+    patient_id: Mapped[int] = mapped_column(ForeignKey("patients.id"), nullable=False)
+    doctor_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+
+    # Шаблон записей серии
+    appointment_type: Mapped[AppointmentType] = mapped_column(Enum(AppointmentType), nullable=False)
+    rrule: Mapped[str] = mapped_column(String(500), nullable=False)  # Например, FREQ=WEEKLY;BYDAY=MO,WE,FR;COUNT=10
+    starts_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False)  # Первый прием (DTSTART)
+    duration_minutes: Mapped[int] = mapped_column(default=DEFAULT_DURATION_MINUTES, nullable=False)
+    reason: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    # Системные поля
+    created_by: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), onupdate=func.now())
+
+    # Отношения
+    appointments = relationship("Appointment", back_populates="series", order_by="Appointment.scheduled_date")
+
+    def __repr__(self):
+        return f"<AppointmentSeries(id={self.id}, patient_id={self.patient_id}, doctor_id={self.doctor_id})>"
+
+
 class Appointment(Base):
     """Модель записи на прием"""
     __tablename__ = "appointments"
+    __table_args__ = (
+        # История пациента (лента событий)
+        Index("ix_appointments_patient_scheduled_date", "patient_id", "scheduled_date"),
+        # Расписание врача; двойную запись запрещает EXCLUDE-ограничение ex_appointments_doctor_period (в миграции)
+        Index("ix_appointments_doctor_scheduled_date", "doctor_id", "scheduled_date"),
+        # Записи серии начиная с даты ("эта и следующие")
+        Index("ix_appointments_series_scheduled_date", "series_id", "scheduled_date"),
+        # Только записи, ждущие пациента: предстоящие и поиск неявок (статусы - как LIVE_STATUSES в availability)
+        Index(
+            "ix_appointments_live_scheduled_date", "scheduled_date",
+            postgresql_where=text("status IN ('SCHEDULED', 'CONFIRMED')"),
+            postgresql_include=["doctor_id", "ends_at"],
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
     # Связи
     patient_id: Mapped[int] = mapped_column(ForeignKey("patients.id"), nullable=False)
     doctor_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    series_id: Mapped[int | None] = mapped_column(ForeignKey("appointment_series.id"), nullable=True)  # Серия повторяющихся записей
 
     # Информация о записи
     appointment_type: Mapped[AppointmentType] = mapped_column(Enum(AppointmentType), nullable=False)
@@ -44,7 +96,9 @@ class Appointment(Base):
 
     # Дата и время
     scheduled_date: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False)
-    duration_minutes: Mapped[int] = mapped_column(default=30, nullable=False)  # Продолжительность в минутах
+    duration_minutes: Mapped[int] = mapped_column(default=DEFAULT_DURATION_MINUTES, nullable=False)  # Продолжительность в минутах
+    # scheduled_date + duration_minutes, поддерживается при присваивании (см. _sync_ends_at)
+    ends_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False)
 
     # Описание и заметки
     reason: Mapped[str | None] = mapped_column(String(255), nullable=True)  # Причина обращения
@@ -60,6 +114,16 @@ class Appointment(Base):
     patient = relationship("Patient", backref="appointments")
     doctor = relationship("User", foreign_keys=[doctor_id], backref="doctor_appointments")
     creator = relationship("User", foreign_keys=[created_by], backref="created_appointments")
+    series = relationship("AppointmentSeries", back_populates="appointments")
+
+    @validates("scheduled_date", "duration_minutes")
+    def _sync_ends_at(self, key, value):
+        """Пересчитать время окончания при изменении начала или продолжительности"""
+        scheduled_date = value if key == "scheduled_date" else self.scheduled_date
+        duration_minutes = value if key == "duration_minutes" else self.duration_minutes
+        if scheduled_date is not None:
+            self.ends_at = appointment_end(scheduled_date, duration_minutes or DEFAULT_DURATION_MINUTES)
+        return value
 
     def __repr__(self):
         return f"<Appointment(id={self.id}, patient_id={self.patient_id}, doctor_id={self.doctor_id}, status={self.status})>"
@@ -2,10 +2,28 @@
 Appointments Repository (Data Access Layer)
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
-from typing import List, Optional
-from datetime import datetime
-from .models import Appointment, AppointmentStatus
+from sqlalchemy import exists, insert, select
+from sqlalchemy.orm import selectinload
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta, timezone
+from app.db.batch import iter_chunked_update
+from app.modules.auth.models import User, UserRole
+from app.modules.visits.models import Visit
+from .models import Appointment, AppointmentSeries, AppointmentStatus
+from .availability import build_busy_query, build_intervals_query, live_status_filter
+from .calendar import build_calendar_query
+from .series import Interval, build_following_update, series_rows
+
+
+def past_due_conditions(cutoff: datetime) -> List:
+    """Записи, ждущие пациента, закончившиеся до cutoff и без визита (условие по началу - для частичного индекса)"""
+    return [
+        live_status_filter(),
+        Appointment.scheduled_date < cutoff,
+        Appointment.ends_at < cutoff,
+        # Пациент пришел: визит открыт по записи, а ее статус не менялся
+        ~exists().where(Visit.appointment_id == Appointment.id),
+    ]
 
 
 class AppointmentsRepository:
@@ -48,9 +66,10 @@ class AppointmentsRepository:
 
     async def get_upcoming_appointments(self, doctor_id: Optional[int] = None, limit: int = 50) -> List[Appointment]:
         """Получить предстоящие записи"""
+        # Частичный индекс ix_appointments_live_scheduled_date: прошедшие и закрытые записи не читаются
         query = select(Appointment).filter(
-            Appointment.scheduled_date >= datetime.now(),
-            Appointment.status.in_([AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED])
+            Appointment.scheduled_date >= datetime.now(timezone.utc),
+            live_status_filter()
         )
 
         if doctor_id:
@@ -77,22 +96,76 @@ class AppointmentsRepository:
         await self.db.delete(appointment)
         await self.db.commit()
 
-    async def check_availability(self, doctor_id: int, scheduled_date: datetime, duration_minutes: int) -> bool:
-        """Проверить доступность времени для записи"""
-        end_time = scheduled_date  # Время окончания приема
+    async def get_doctor_intervals(
+        self, doctor_id: int, start: datetime, end: datetime
+    ) -> Sequence[Tuple[datetime, datetime, int]]:
+        """Интервалы (начало, окончание, id) активных записей врача, пересекающиеся с [start, end)"""
+        result = await self.db.execute(build_intervals_query(doctor_id, start, end))
+        return result.all()
+
+    async def get_busy_intervals(
+        self, doctor_ids: Sequence[int], start: datetime, end: datetime
+    ) -> Sequence[Tuple[int, datetime, datetime]]:
+        """Занятые интервалы (doctor_id, начало, окончание) врачей за период, по врачу и началу"""
+        result = await self.db.execute(build_busy_query(doctor_ids, start, end))
+        return result.all()
+
+    async def get_calendar_rows(self, doctor_ids: Sequence[int], start: datetime, end: datetime) -> Sequence:
+        """Записи и визиты без записи врачей за период с пациентом и врачом (один запрос)"""
+        result = await self.db.execute(build_calendar_query(doctor_ids, start, end))
+        return result.all()
+
+    async def get_active_doctor_ids(self) -> List[int]:
+        """id активных врачей"""
+        result = await self.db.execute(
+            select(User.id).where(User.role == UserRole.DOCTOR, User.is_active == "Y").order_by(User.id)
+        )
+        return result.scalars().all()
 
-        # Находим пересекающиеся записи
-        query = select(Appointment).filter(
-            Appointment.doctor_id == doctor_id,
-            Appointment.status.in_([AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED, AppointmentStatus.IN_PROGRESS]),
-            or_(
-                and_(Appointment.scheduled_date <= scheduled_date,
-                     Appointment.scheduled_date >= end_time),
-                and_(Appointment.scheduled_date >= scheduled_date,
-                     Appointment.scheduled_date <= end_time)
-            )
+    async def mark_no_show_batches(
+        self, cutoff: datetime, chunk_size: int = 1000
+    ) -> AsyncIterator[List[int]]:
+        """Перевести записи, закончившиеся до cutoff без приема, в NO_SHOW (порциями)"""
+        async for rows in iter_chunked_update(
+            self.db,
+            Appointment,
+            where=past_due_conditions(cutoff),
+            values={"status": AppointmentStatus.NO_SHOW},
+            returning=[Appointment.id],
+            chunk_size=chunk_size,
+        ):
+            yield [row.id for row in rows]
+
+    async def get_series(self, series_id: int) -> Optional[AppointmentSeries]:
+        """Получить серию с ее записями"""
+        result = await self.db.execute(
+            select(AppointmentSeries)
+            .where(AppointmentSeries.id == series_id)
+            .options(selectinload(AppointmentSeries.appointments))
         )
-        result = await self.db.execute(query)
-        overlapping = result.first()
+        return result.scalar_one_or_none()
 
-        return overlapping is None
+    async def create_series(
+        self, series: AppointmentSeries, values: Dict, intervals: List[Interval]
+    ) -> List[Appointment]:
+        """Создать серию и все ее записи одной пакетной вставкой в одной транзакции"""
+        self.db.add(series)
+        await self.db.flush()
+        result = await self.db.scalars(
+            insert(Appointment).returning(Appointment), series_rows(series.id, values, intervals)
+        )
+        appointments = result.all()
+        await self.db.commit()
+        return appointments
+
+    async def update_following(
+        self,
+        series_id: int,
+        from_date: datetime,
+        shift: Optional[timedelta] = None,
+        duration_minutes: Optional[int] = None,
+        values: Optional[Dict] = None,
+    ) -> Sequence[Tuple[int, int, datetime, datetime]]:
+        """Изменить записи серии начиная с from_date одним UPDATE (без коммита); (id, врач, начало, окончание)"""
+        result = await self.db.execute(build_following_update(series_id, from_date, shift, duration_minutes, values))
+        return result.all()
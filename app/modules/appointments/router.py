@@ -1,7 +1,7 @@
 """
 Appointments Router (API Endpoints)
 """
-from fastapi import APIRouter, Depends, Query, Path
+from fastapi import APIRouter, Depends, Header, Query, Path, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
@@ -9,7 +9,10 @@ from datetime import datetime
 from app.db.session import get_db
 from app.core.dependencies import get_current_user, require_role
 from .service import AppointmentsService
-from .schemas import Appointment, AppointmentCreate, AppointmentUpdate, AppointmentSummary
+from .schemas import (
+    Appointment, AppointmentCreate, AppointmentSeries, AppointmentSeriesChange, AppointmentSeriesCreate,
+    AppointmentSeriesUpdate, AppointmentSlot, AppointmentUpdate, AppointmentSummary, Calendar,
+)
 from .models import AppointmentStatus
 
 router = APIRouter()
@@ -44,6 +47,87 @@ async def get_upcoming_appointments(
     return await service.get_upcoming_appointments(doctor_id, limit)
 
 
+@router.get("/calendar", response_model=Calendar)
+async def get_calendar(
+    response: Response,
+    doctor_ids: List[int] = Query(..., min_length=1, max_length=100),
+    date_from: datetime = Query(..., alias="from"),
+    date_to: datetime = Query(..., alias="to"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Лист дня врачей: записи, визиты, пациенты и телефоны по врачам и времени (ETag / 304)"""
+    service = AppointmentsService(db)
+    calendar, etag = await service.get_calendar(doctor_ids, date_from, date_to, if_none_match)
+    if calendar is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return calendar
+
+
+@router.get("/slots", response_model=List[AppointmentSlot])
+async def get_free_slots(
+    date_from: datetime = Query(...),
+    date_to: datetime = Query(...),
+    duration: int = Query(30, ge=5, le=480),
+    doctor_id: Optional[List[int]] = Query(None),
+    limit: int = Query(20, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Найти ближайшие свободные слоты (несколько doctor_id или все активные врачи)"""
+    service = AppointmentsService(db)
+    return await service.find_free_slots(date_from, date_to, duration, doctor_id, limit)
+
+
+@router.post("/series", response_model=AppointmentSeries)
+async def create_series(
+    series_data: AppointmentSeriesCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Создать серию повторяющихся записей (курс процедур) по правилу RRULE"""
+    service = AppointmentsService(db)
+    return await service.create_series(series_data, current_user.id)
+
+
+@router.get("/series/{series_id}", response_model=AppointmentSeries)
+async def get_series(
+    series_id: int = Path(..., ge=1),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Получить серию с записями"""
+    service = AppointmentsService(db)
+    return await service.get_series(series_id)
+
+
+@router.put("/series/{series_id}/appointments/{appointment_id}", response_model=AppointmentSeriesChange)
+async def update_series_following(
+    series_data: AppointmentSeriesUpdate,
+    series_id: int = Path(..., ge=1),
+    appointment_id: int = Path(..., ge=1),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Изменить эту и следующие записи серии (новое время сдвигает все следующие на ту же величину)"""
+    service = AppointmentsService(db)
+    return await service.update_following(series_id, appointment_id, series_data)
+
+
+@router.post("/series/{series_id}/appointments/{appointment_id}/cancel", response_model=AppointmentSeriesChange)
+async def cancel_series_following(
+    series_id: int = Path(..., ge=1),
+    appointment_id: int = Path(..., ge=1),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Отменить эту и следующие записи серии"""
+    service = AppointmentsService(db)
+    return await service.cancel_following(series_id, appointment_id)
+
+
 @router.get("/{appointment_id}", response_model=Appointment)
 async def get_appointment(
     appointment_id: int = Path(..., ge=1),
@@ -3,7 +3,8 @@ Appointments Schemas (Pydantic)
 """
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+from app.modules.visits.models import VisitStatus
 from .models import AppointmentStatus, AppointmentType
 
 
@@ -38,6 +39,8 @@ class Appointment(AppointmentBase):
     """Полная схема записи"""
     id: int
     status: AppointmentStatus
+    ends_at: Optional[datetime] = None  # Время окончания приема
+    series_id: Optional[int] = None  # Серия повторяющихся записей
     created_by: int
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -51,6 +54,54 @@ class Appointment(AppointmentBase):
         from_attributes = True
 
 
+class AppointmentSeriesCreate(BaseModel):
+    """Схема для создания серии повторяющихся записей"""
+    patient_id: int = Field(..., description="ID пациента")
+    doctor_id: int = Field(..., description="ID врача")
+    appointment_type: AppointmentType = Field(..., description="Тип приема")
+    starts_at: datetime = Field(..., description="Первый прием")
+    rrule: str = Field(
+        ..., min_length=5, max_length=500,
+        description="Правило повторения RFC 5545 с COUNT или UNTIL, например FREQ=WEEKLY;BYDAY=MO,WE,FR;COUNT=10"
+    )
+    duration_minutes: int = Field(default=30, ge=5, le=480, description="Продолжительность в минутах")
+    reason: Optional[str] = Field(None, max_length=255, description="Причина обращения")
+    notes: Optional[str] = Field(None, description="Заметки врача")
+
+
+class AppointmentSeriesUpdate(BaseModel):
+    """Изменение записей серии: этот прием и следующие"""
+    scheduled_date: Optional[datetime] = Field(None, description="Новое время этого приема; следующие сдвигаются так же")
+    duration_minutes: Optional[int] = Field(None, ge=5, le=480)
+    appointment_type: Optional[AppointmentType] = None
+    reason: Optional[str] = Field(None, max_length=255)
+    notes: Optional[str] = None
+
+
+class AppointmentSeries(BaseModel):
+    """Серия повторяющихся записей"""
+    id: int
+    patient_id: int
+    doctor_id: int
+    appointment_type: AppointmentType
+    rrule: str
+    starts_at: datetime
+    duration_minutes: int
+    reason: Optional[str] = None
+    created_by: int
+    created_at: datetime
+    appointments: List[Appointment] = []
+
+    class Config:
+        from_attributes = True
+
+
+class AppointmentSeriesChange(BaseModel):
+    """Результат изменения записей серии"""
+    series_id: int
+    updated: int
+
+
 class AppointmentSummary(BaseModel):
     """Краткая информация о записи"""
     id: int
@@ -65,3 +116,51 @@ class AppointmentSummary(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class AppointmentSlot(BaseModel):
+    """Свободный слот для записи"""
+    doctor_id: int
+    start: datetime
+    end: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class CalendarEntry(BaseModel):
+    """Строка листа дня: запись на прием или визит без записи"""
+    kind: str  # appointment | visit
+    starts_at: datetime
+    ends_at: Optional[datetime] = None
+    appointment_id: Optional[int] = None
+    appointment_status: Optional[AppointmentStatus] = None
+    appointment_type: Optional[AppointmentType] = None
+    reason: Optional[str] = None  # Причина обращения или жалоба визита
+    visit_id: Optional[int] = None
+    visit_status: Optional[VisitStatus] = None
+    patient_id: int
+    patient_name: str
+    patient_phone: Optional[str] = None
+
+
+class CalendarDoctor(BaseModel):
+    """Расписание врача за период по времени"""
+    doctor_id: int
+    doctor_name: Optional[str] = None
+    entries: List[CalendarEntry]
+
+
+class Calendar(BaseModel):
+    """Лист дня врачей"""
+    date_from: datetime
+    date_to: datetime
+    doctors: List[CalendarDoctor]
+
+
+class NoShowSweepResult(BaseModel):
+    """Результат перевода прошедших записей в статус NO_SHOW"""
+    processed: int
+    batches: int
+    cutoff: datetime
+    duration_seconds: float
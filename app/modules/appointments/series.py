@@ -0,0 +1,103 @@
+"""
+Appointments Series (повторяющиеся записи: курсы процедур)
+
+Правило серии - RRULE (python-dateutil) от первого приема; повторения
+разворачиваются в часовом поясе клиники, чтобы время приема не сдвигалось
+при переходе на летнее время. Пересечения всех повторений проверяются по
+интервалам врача, загруженным одним запросом за весь период серии.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from dateutil.rrule import rrulestr
+from sqlalchemy import update
+from app.core.config import settings
+from .availability import DayIntervals, as_utc
+from .models import Appointment, AppointmentStatus, appointment_end
+
+# Больше повторений за одну серию не создается
+MAX_OCCURRENCES = 100
+
+# Статусы, которые еще можно менять операциями "эта и следующие"
+EDITABLE_STATUSES = (AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED)
+
+Interval = Tuple[datetime, datetime]
+
+
+def expand_rrule(rule: str, starts_at: datetime, tz: Optional[ZoneInfo] = None) -> List[datetime]:
+    """Даты приемов серии (UTC); ValueError, если правило некорректно, бесконечно или слишком длинно"""
+    tz = tz or ZoneInfo(settings.clinic_timezone)
+    rule = rule.strip()
+    if rule.upper().startswith("RRULE:"):
+        rule = rule[len("RRULE:"):]
+    if "COUNT=" not in rule.upper() and "UNTIL=" not in rule.upper():
+        raise ValueError("Recurrence rule must have COUNT or UNTIL")
+
+    dtstart = as_utc(starts_at).astimezone(tz).replace(tzinfo=None)
+    # UNTIL с часовым поясом (…Z) сравнивается с локальным временем без пояса
+    recurrence = rrulestr(rule, dtstart=dtstart, ignoretz=True)
+    occurrences = []
+    for local in recurrence:
+        if len(occurrences) == MAX_OCCURRENCES:
+            raise ValueError(f"Series cannot have more than {MAX_OCCURRENCES} occurrences")
+        occurrences.append(local.replace(tzinfo=tz).astimezone(timezone.utc))
+    if not occurrences:
+        raise ValueError("Recurrence rule produces no occurrences")
+    return occurrences
+
+
+def occurrence_intervals(occurrences: List[datetime], duration_minutes: int) -> List[Interval]:
+    """Интервалы приемов серии"""
+    return [(start, appointment_end(start, duration_minutes)) for start in occurrences]
+
+
+def self_overlaps(intervals: List[Interval]) -> bool:
+    """Пересекаются ли приемы серии между собой (интервалы по возрастанию начала)"""
+    return any(previous_end > start for (_, previous_end), (start, _) in zip(intervals, intervals[1:]))
+
+
+def find_conflicts(intervals: List[Interval], busy: DayIntervals) -> List[datetime]:
+    """Начала приемов серии, пересекающихся с занятыми интервалами врача"""
+    return [start for start, end in intervals if busy.find_overlap(start, end) is not None]
+
+
+def series_rows(series_id: int, values: Dict, intervals: List[Interval]) -> List[Dict]:
+    """Строки записей серии для пакетной вставки (ends_at считается здесь, а не в модели)"""
+    return [
+        {**values, "series_id": series_id, "scheduled_date": start, "ends_at": end}
+        for start, end in intervals
+    ]
+
+
+def build_following_update(
+    series_id: int,
+    from_date: datetime,
+    shift: Optional[timedelta] = None,
+    duration_minutes: Optional[int] = None,
+    values: Optional[Dict] = None,
+):
+    """
+    UPDATE записей серии начиная с from_date ("эта и следующие") одним запросом:
+    сдвиг времени, новая продолжительность и прочие поля; RETURNING id и интервалы
+    """
+    values = dict(values or {})
+    starts = Appointment.scheduled_date + shift if shift else Appointment.scheduled_date
+    if shift:
+        values["scheduled_date"] = starts
+    if duration_minutes is not None:
+        values["duration_minutes"] = duration_minutes
+        values["ends_at"] = starts + timedelta(minutes=duration_minutes)
+    elif shift:
+        values["ends_at"] = Appointment.ends_at + shift
+    return (
+        update(Appointment)
+        .where(
+            Appointment.series_id == series_id,
+            Appointment.scheduled_date >= from_date,
+            Appointment.status.in_(EDITABLE_STATUSES),
+        )
+        .values(**values)
+        .returning(Appointment.id, Appointment.doctor_id, Appointment.scheduled_date, Appointment.ends_at)
+        .execution_options(synchronize_session=False)
+    )
+
@@ -2,14 +2,44 @@
 Appointments Service (Business Logic Layer)
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
-from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import logging
+import time
 from fastapi import HTTPException, status
+from app.core.exceptions import ConflictException
+from app.core.config import settings
+from app.db.references import Reference, validate_references, foreign_key_errors
+from app.modules.auth.models import User
+from app.modules.patients.models import Patient
+from app.modules.stats.repository import StatsRepository
+from app.modules.stats.schemas import StatType
 from .repository import AppointmentsRepository
-from .models import Appointment, AppointmentStatus, AppointmentType
-from .schemas import AppointmentCreate, AppointmentUpdate
+from .availability import DayIntervals, as_utc, booking_conflicts
+from .models import Appointment, AppointmentSeries, AppointmentStatus, AppointmentType, appointment_end
+from .schemas import (
+    AppointmentCreate, AppointmentSeriesChange, AppointmentSeriesCreate, AppointmentSeriesUpdate,
+    AppointmentSlot, AppointmentUpdate, Calendar, NoShowSweepResult,
+)
+from .series import expand_rrule, find_conflicts, occurrence_intervals, self_overlaps
+from .calendar import calendar_etag, etag_matches, group_calendar
+from .slots import find_slots, group_busy
 from app.modules.visits.service import VisitsService
 from app.modules.visits.schemas import VisitCreate
+from app.modules.schedules.registry import reload_schedules, schedule_registry
+
+logger = logging.getLogger(__name__)
+
+# Максимальный период поиска свободных слотов
+MAX_SLOT_SEARCH_DAYS = 31
+# Максимальный период листа дня
+MAX_CALENDAR_DAYS = 31
+
+
+def _format_times(values: List[datetime], limit: int = 5) -> str:
+    """Первые значения времени для сообщения об ошибке"""
+    shown = ", ".join(value.isoformat() for value in values[:limit])
+    return shown + (f" (+{len(values) - limit} more)" if len(values) > limit else "")
 
 
 class AppointmentsService:
@@ -48,19 +78,82 @@ class AppointmentsService:
         """Получить предстоящие записи"""
         return await self.repository.get_upcoming_appointments(doctor_id, limit)
 
-    async def create_appointment(self, appointment_data: AppointmentCreate, created_by: int) -> Appointment:
-        """Создать новую запись"""
-        # Проверяем доступность времени
-        if not await self.repository.check_availability(
-            appointment_data.doctor_id,
-            appointment_data.scheduled_date,
-            appointment_data.duration_minutes
-        ):
+    async def get_calendar(
+        self, doctor_ids: List[int], date_from: datetime, date_to: datetime, if_none_match: Optional[str] = None
+    ) -> Tuple[Optional[Calendar], str]:
+        """Лист дня врачей и его ETag (None вместо листа - у клиента актуальная версия)"""
+        date_from, date_to = as_utc(date_from), as_utc(date_to)
+        if date_to <= date_from:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="to must be after from"
+            )
+        if date_to - date_from > timedelta(days=MAX_CALENDAR_DAYS):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Time slot is not available"
+                detail=f"Calendar period cannot exceed {MAX_CALENDAR_DAYS} days"
             )
 
+        doctor_ids = list(dict.fromkeys(doctor_ids))
+        rows = await self.repository.get_calendar_rows(doctor_ids, date_from, date_to)
+        etag = calendar_etag(rows)
+        if etag_matches(if_none_match, etag):
+            return None, etag
+        calendar = Calendar(date_from=date_from, date_to=date_to, doctors=group_calendar(rows, doctor_ids))
+        return calendar, etag
+
+    async def find_free_slots(
+        self,
+        date_from: datetime,
+        date_to: datetime,
+        duration_minutes: int,
+        doctor_ids: Optional[List[int]] = None,
+        limit: int = 20,
+    ) -> List[AppointmentSlot]:
+        """Ближайшие свободные слоты врачей (по умолчанию - всех активных врачей)"""
+        start = max(as_utc(date_from), datetime.now(timezone.utc))
+        end = as_utc(date_to)
+        if end <= start:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="date_to must be after date_from and in the future"
+            )
+        if end - start > timedelta(days=MAX_SLOT_SEARCH_DAYS):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Search period cannot exceed {MAX_SLOT_SEARCH_DAYS} days"
+            )
+
+        if not doctor_ids:
+            doctor_ids = await self.repository.get_active_doctor_ids()
+        if not doctor_ids:
+            return []
+
+        await self.load_schedules()
+
+        # Занятость всех врачей за период одним запросом, дальше - один проход по каждому врачу
+        rows = await self.repository.get_busy_intervals(doctor_ids, start, end)
+        slots = find_slots(
+            group_busy(rows),
+            sorted(set(doctor_ids)),
+            start,
+            end,
+            duration_minutes,
+            limit,
+            schedule_registry.windows,
+            settings.slot_step_minutes,
+        )
+        return [AppointmentSlot(doctor_id=slot.doctor_id, start=slot.start, end=slot.end) for slot in slots]
+
+    async def create_appointment(self, appointment_data: AppointmentCreate, created_by: int) -> Appointment:
+        """Создать новую запись"""
+        # Проверяем пациента и врача одним запросом
+        await validate_references(
+            self.db,
+            Reference(Patient, appointment_data.patient_id, "Patient"),
+            Reference(User, appointment_data.doctor_id, "Doctor"),
+        )
+
         # Проверяем, что дата в будущем
         if appointment_data.scheduled_date <= datetime.now():
             raise HTTPException(
@@ -68,6 +161,12 @@ class AppointmentsService:
                 detail="Appointment date must be in the future"
             )
 
+        await self.check_working_hours(
+            appointment_data.doctor_id,
+            appointment_data.scheduled_date,
+            appointment_end(appointment_data.scheduled_date, appointment_data.duration_minutes),
+        )
+
         # Создаем запись
         appointment = Appointment(
             patient_id=appointment_data.patient_id,
@@ -81,7 +180,24 @@ class AppointmentsService:
             created_by=created_by
         )
 
-        return await self.repository.create_appointment(appointment)
+        # Пересечение с другими записями врача отклоняет ограничение БД (409), без отдельной проверки
+        async with foreign_key_errors(self.db), booking_conflicts(self.db):
+            appointment = await self.repository.create_appointment(appointment)
+        return appointment
+
+    async def load_schedules(self) -> None:
+        """Загрузить расписания врачей, если фоновая загрузка еще не прошла"""
+        if not schedule_registry.ready:
+            await reload_schedules(self.db)
+
+    async def check_working_hours(self, doctor_id: int, start: datetime, end: datetime) -> None:
+        """Проверить, что прием целиком в рабочем времени врача (маска дня из памяти)"""
+        await self.load_schedules()
+        if not schedule_registry.is_working(doctor_id, as_utc(start), as_utc(end)):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Doctor is not working at this time"
+            )
 
     async def update_appointment(self, appointment_id: int, appointment_data: AppointmentUpdate) -> Appointment:
         """Обновить запись"""
@@ -92,25 +208,18 @@ class AppointmentsService:
                 detail="Appointment not found"
             )
 
-        # Если меняем время, проверяем доступность
-        if appointment_data.scheduled_date and appointment_data.scheduled_date != appointment.scheduled_date:
-            duration = appointment_data.duration_minutes or appointment.duration_minutes
-            if not await self.repository.check_availability(
-                appointment.doctor_id,
-                appointment_data.scheduled_date,
-                duration
-            ):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="New time slot is not available"
-                )
+        previous = (appointment.scheduled_date, appointment.ends_at)
 
-        # Обновляем поля
+        # Обновляем поля (новое время проверяет ограничение БД)
         update_data = appointment_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(appointment, field, value)
+        if (appointment.scheduled_date, appointment.ends_at) != previous:
+            await self.check_working_hours(appointment.doctor_id, appointment.scheduled_date, appointment.ends_at)
 
-        return await self.repository.update_appointment(appointment)
+        async with booking_conflicts(self.db):
+            appointment = await self.repository.update_appointment(appointment)
+        return appointment
 
     async def cancel_appointment(self, appointment_id: int) -> Appointment:
         """Отменить запись"""
@@ -130,6 +239,139 @@ class AppointmentsService:
         appointment.status = AppointmentStatus.CANCELLED
         return await self.repository.update_appointment(appointment)
 
+    async def get_series(self, series_id: int) -> AppointmentSeries:
+        """Получить серию с записями"""
+        series = await self.repository.get_series(series_id)
+        if not series:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Appointment series not found"
+            )
+        return series
+
+    async def create_series(self, series_data: AppointmentSeriesCreate, created_by: int) -> AppointmentSeries:
+        """Создать серию: все приемы проверяются одним запросом и вставляются одним пакетом"""
+        await validate_references(
+            self.db,
+            Reference(Patient, series_data.patient_id, "Patient"),
+            Reference(User, series_data.doctor_id, "Doctor"),
+        )
+
+        try:
+            occurrences = expand_rrule(series_data.rrule, series_data.starts_at)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+        if occurrences[0] <= datetime.now(timezone.utc):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Series must start in the future"
+            )
+        intervals = occurrence_intervals(occurrences, series_data.duration_minutes)
+        if self_overlaps(intervals):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Series occurrences overlap each other"
+            )
+
+        doctor_id = series_data.doctor_id
+        await self.load_schedules()
+        off_hours = [start for start, end in intervals if not schedule_registry.is_working(doctor_id, start, end)]
+        if off_hours:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Doctor is not working at: {_format_times(off_hours)}"
+            )
+
+        # Занятость врача за весь период серии - одним запросом по интервалам
+        rows = await self.repository.get_doctor_intervals(doctor_id, intervals[0][0], intervals[-1][1])
+        busy = DayIntervals((as_utc(begin), as_utc(finish), item_id) for begin, finish, item_id in rows)
+        conflicts = find_conflicts(intervals, busy)
+        if conflicts:
+            raise ConflictException(f"Time slots are not available: {_format_times(conflicts)}")
+
+        series = AppointmentSeries(
+            patient_id=series_data.patient_id,
+            doctor_id=doctor_id,
+            appointment_type=series_data.appointment_type,
+            rrule=series_data.rrule,
+            starts_at=occurrences[0],
+            duration_minutes=series_data.duration_minutes,
+            reason=series_data.reason,
+            created_by=created_by,
+        )
+        values = {
+            "patient_id": series_data.patient_id,
+            "doctor_id": doctor_id,
+            "appointment_type": series_data.appointment_type,
+            "status": AppointmentStatus.SCHEDULED,
+            "duration_minutes": series_data.duration_minutes,
+            "reason": series_data.reason,
+            "notes": series_data.notes,
+            "created_by": created_by,
+        }
+        # Гонку с параллельной записью по-прежнему закрывает ограничение БД (409)
+        async with foreign_key_errors(self.db), booking_conflicts(self.db):
+            await self.repository.create_series(series, values, intervals)
+        return await self.get_series(series.id)
+
+    async def get_series_appointment(self, series_id: int, appointment_id: int) -> Appointment:
+        """Запись серии, с которой начинаются изменения этой и следующих записей"""
+        appointment = await self.repository.get_appointment_by_id(appointment_id)
+        if not appointment or appointment.series_id != series_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Appointment not found in series"
+            )
+        return appointment
+
+    async def update_following(
+        self, series_id: int, appointment_id: int, series_data: AppointmentSeriesUpdate
+    ) -> AppointmentSeriesChange:
+        """Изменить эту и следующие записи серии одним UPDATE"""
+        appointment = await self.get_series_appointment(series_id, appointment_id)
+        update_data = series_data.dict(exclude_unset=True)
+        new_start = update_data.pop("scheduled_date", None)
+        duration_minutes = update_data.pop("duration_minutes", None)
+        shift = as_utc(new_start) - as_utc(appointment.scheduled_date) if new_start else None
+        if new_start and as_utc(new_start) <= datetime.now(timezone.utc):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Appointment date must be in the future"
+            )
+        if not shift and duration_minutes is None and not update_data:
+            return AppointmentSeriesChange(series_id=series_id, updated=0)
+
+        retimed = bool(shift) or duration_minutes is not None
+        if retimed:
+            await self.load_schedules()
+        # Пересечения с другими записями отклоняет ограничение БД (409)
+        async with booking_conflicts(self.db):
+            rows = await self.repository.update_following(
+                series_id, appointment.scheduled_date, shift or None, duration_minutes, update_data
+            )
+        if retimed:
+            off_hours = [
+                as_utc(start) for _, doctor_id, start, end in rows
+                if not schedule_registry.is_working(doctor_id, as_utc(start), as_utc(end))
+            ]
+            if off_hours:
+                await self.db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Doctor is not working at: {_format_times(sorted(off_hours))}"
+                )
+        await self.db.commit()
+        return AppointmentSeriesChange(series_id=series_id, updated=len(rows))
+
+    async def cancel_following(self, series_id: int, appointment_id: int) -> AppointmentSeriesChange:
+        """Отменить эту и следующие записи серии одним UPDATE"""
+        appointment = await self.get_series_appointment(series_id, appointment_id)
+        rows = await self.repository.update_following(
+            series_id, appointment.scheduled_date, values={"status": AppointmentStatus.CANCELLED}
+        )
+        await self.db.commit()
+        return AppointmentSeriesChange(series_id=series_id, updated=len(rows))
+
     async def confirm_appointment(self, appointment_id: int) -> Appointment:
         """Подтвердить запись"""
         appointment = await self.repository.get_appointment_by_id(appointment_id)
@@ -185,3 +427,35 @@ class AppointmentsService:
         appointment.visit_id = visit.id
 
         return appointment
+
+    async def mark_no_show(self, grace_minutes: Optional[int] = None, chunk_size: Optional[int] = None) -> NoShowSweepResult:
+        """Перевести записи, закончившиеся больше grace_minutes минут назад без приема, в статус NO_SHOW"""
+        grace_minutes = settings.appointment_no_show_grace_minutes if grace_minutes is None else grace_minutes
+        chunk_size = chunk_size or settings.batch_chunk_size
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=grace_minutes)
+
+        started = time.perf_counter()
+        processed = 0
+        batches = 0
+        async for ids in self.repository.mark_no_show_batches(cutoff, chunk_size):
+            processed += len(ids)
+            batches += 1
+        duration = time.perf_counter() - started
+
+        # Сохраняем результат последнего запуска в системную статистику
+        await StatsRepository(self.db).create_or_update_system_stat(
+            StatType.APPOINTMENTS, "no_show_sweep",
+            int_value=processed,
+            float_value=round(duration, 3),
+            period_end=datetime.now(timezone.utc),
+            description="Записи, переведенные в NO_SHOW последним запуском (float_value - секунды)"
+        )
+        await self.db.commit()
+
+        logger.info(f"No-show sweep: {processed} appointment(s) in {batches} batch(es), {duration:.3f}s")
+        return NoShowSweepResult(
+            processed=processed,
+            batches=batches,
+            cutoff=cutoff,
+            duration_seconds=duration
+        )
@@ -0,0 +1,94 @@
+"""
+Appointments Slots (поиск свободного времени врачей)
+
+Рабочие окна врача (из скомпилированного расписания, см. schedules.registry)
+и занятые интервалы (оба отсортированы по началу) сводятся одним проходом
+(sweep line) в свободные промежутки, которые режутся на слоты сетки. Слоты всех врачей сливаются лениво (heapq.merge), поэтому
+для первых N слотов не нужно считать весь период по каждому врачу.
+"""
+import heapq
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple
+from .availability import as_utc
+
+Interval = Tuple[datetime, datetime]
+
+# (doctor_id, начало, конец) -> рабочие окна врача (UTC) по порядку
+WindowsFor = Callable[[int, datetime, datetime], Iterable[Interval]]
+
+
+class Slot(NamedTuple):
+    """Свободный слот врача"""
+    start: datetime
+    doctor_id: int
+    end: datetime
+
+
+def free_intervals(windows: Iterable[Interval], busy: Sequence[Interval]) -> Iterator[Interval]:
+    """Вычесть занятые интервалы (отсортированы по началу, могут пересекаться) из рабочих окон"""
+    position = 0
+    for window_start, window_end in windows:
+        cursor = window_start
+        # Интервалы, закончившиеся до окна, больше не нужны ни этому, ни следующим окнам
+        while position < len(busy) and busy[position][1] <= cursor:
+            position += 1
+        index = position
+        while index < len(busy) and busy[index][0] < window_end:
+            busy_start, busy_end = busy[index]
+            if busy_start > cursor:
+                yield cursor, busy_start
+            cursor = max(cursor, busy_end)
+            index += 1
+        if cursor < window_end:
+            yield cursor, window_end
+
+
+def align(value: datetime, step: timedelta) -> datetime:
+    """Округлить время вверх до сетки слотов (от начала часа)"""
+    base = value.replace(minute=0, second=0, microsecond=0)
+    steps = -((base - value) // step)
+    return base + steps * step
+
+
+def iter_slots(
+    doctor_id: int, free: Iterable[Interval], duration: timedelta, step: timedelta
+) -> Iterator[Slot]:
+    """Слоты заданной длины по сетке step внутри свободных промежутков"""
+    for free_start, free_end in free:
+        slot_start = align(free_start, step)
+        while slot_start + duration <= free_end:
+            yield Slot(slot_start, doctor_id, slot_start + duration)
+            slot_start += step
+
+
+def find_slots(
+    busy_by_doctor: Dict[int, List[Interval]],
+    doctor_ids: Sequence[int],
+    start: datetime,
+    end: datetime,
+    duration_minutes: int,
+    limit: int,
+    windows_for: WindowsFor,
+    step_minutes: int,
+) -> List[Slot]:
+    """Первые limit слотов по всем врачам, по времени (при равенстве - по врачу)"""
+    duration, step = timedelta(minutes=duration_minutes), timedelta(minutes=step_minutes)
+    per_doctor = [
+        iter_slots(
+            doctor_id,
+            free_intervals(windows_for(doctor_id, start, end), busy_by_doctor.get(doctor_id, [])),
+            duration,
+            step,
+        )
+        for doctor_id in doctor_ids
+    ]
+    return list(islice(heapq.merge(*per_doctor), limit))
+
+
+def group_busy(rows: Iterable[Tuple[int, datetime, datetime]]) -> Dict[int, List[Interval]]:
+    """Строки (doctor_id, начало, окончание), упорядоченные по врачу и началу -> интервалы по врачам"""
+    busy: Dict[int, List[Interval]] = {}
+    for doctor_id, busy_start, busy_end in rows:
+        busy.setdefault(doctor_id, []).append((as_utc(busy_start), as_utc(busy_end)))
+    return busy
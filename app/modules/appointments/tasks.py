@@ -0,0 +1,14 @@
+"""
+Appointments Tasks (фоновые задачи)
+"""
+from typing import Optional
+from app.db.session import AsyncSessionLocal
+from .service import AppointmentsService
+from .schemas import NoShowSweepResult
+
+
+async def mark_no_show_job(grace_minutes: Optional[int] = None, chunk_size: Optional[int] = None) -> NoShowSweepResult:
+    """Перевести прошедшие записи без приема в NO_SHOW в отдельной сессии"""
+    async with AsyncSessionLocal() as db:
+        service = AppointmentsService(db)
+        return await service.mark_no_show(grace_minutes, chunk_size)
@@ -2,7 +2,7 @@
 Billing Models
 """
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, DateTime, ForeignKey, Numeric, Enum
+from sqlalchemy import String, DateTime, ForeignKey, Numeric, Enum, Index, text
 from sqlalchemy.sql import func
 from app.db.session import Base
 import enum
@@ -19,6 +19,12 @@ class BillingStatus(str, enum.Enum):
 class Billing(Base):
     """Модель счета"""
     __tablename__ = "billing"
+    __table_args__ = (
+        # Частичный индекс для поиска просроченных счетов
+        Index("ix_billing_pending_created_at", "created_at", postgresql_where=text("status = 'PENDING'")),
+        # История пациента (лента событий)
+        Index("ix_billing_patient_created_at", "patient_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
@@ -48,3 +54,21 @@ class Billing(Base):
 
     def __repr__(self):
         return f"<Billing(id={self.id}, patient_id={self.patient_id}, amount={self.amount}, status={self.status})>"
+
+
+class PatientBalance(Base):
+    """Материализованный баланс пациента (поддерживается BillingRepository)"""
+    __tablename__ = "patient_balances"
+
+    patient_id: Mapped[int] = mapped_column(ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True)
+
+    # Суммы по счетам
+    outstanding: Mapped[Numeric] = mapped_column(Numeric(12, 2), default=0, nullable=False, index=True)  # К оплате (PENDING + OVERDUE)
+    overdue: Mapped[Numeric] = mapped_column(Numeric(12, 2), default=0, nullable=False, index=True)  # Просрочено
+    paid: Mapped[Numeric] = mapped_column(Numeric(12, 2), default=0, nullable=False)  # Оплачено
+    invoices_count: Mapped[int] = mapped_column(default=0, nullable=False)
+
+    updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<PatientBalance(patient_id={self.patient_id}, outstanding={self.outstanding}, overdue={self.overdue})>"
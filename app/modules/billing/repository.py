@@ -2,9 +2,13 @@
 Billing Repository (Data Access Layer)
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
-from typing import List, Optional
-from .models import Billing
+from sqlalchemy import select, update, delete, insert, bindparam, any_, case, func, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+from app.db.batch import iter_chunked_update
+from app.modules.patients.models import Patient
+from .models import Billing, BillingStatus, PatientBalance
 
 
 class BillingRepository:
@@ -34,10 +38,54 @@ class BillingRepository:
     async def create(self, billing: Billing) -> Billing:
         """Создать новый счет"""
         self.db.add(billing)
+        await self.db.flush()
+        await self.refresh_balances([billing.patient_id])
         await self.db.commit()
         await self.db.refresh(billing)
         return billing
 
+    async def create_many(self, rows: List[dict]) -> List[Billing]:
+        """Создать несколько счетов одним INSERT ... RETURNING"""
+        if not rows:
+            return []
+        query = insert(Billing).values(rows).returning(Billing)
+        result = await self.db.execute(query)
+        created = list(result.scalars().all())
+        await self.refresh_balances(record.patient_id for record in created)
+        await self.db.commit()
+        return created
+
+    async def mark_paid_many(self, billing_ids: List[int], payment_date: datetime) -> List[Billing]:
+        """Отметить неоплаченные счета как оплаченные одним UPDATE ... WHERE id = ANY(:ids)"""
+        query = (
+            update(Billing)
+            .where(
+                Billing.id == any_(bindparam("ids", billing_ids, type_=ARRAY(Integer))),
+                Billing.status.in_([BillingStatus.PENDING, BillingStatus.OVERDUE])
+            )
+            .values(status=BillingStatus.PAID, payment_date=payment_date)
+            .returning(Billing)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(query)
+        paid = list(result.scalars().all())
+        await self.refresh_balances(record.patient_id for record in paid)
+        await self.db.commit()
+        return paid
+
+    async def get_statuses(self, billing_ids: List[int]) -> Dict[int, BillingStatus]:
+        """Получить статусы счетов по списку ID"""
+        query = select(Billing.id, Billing.status).where(Billing.id.in_(billing_ids))
+        result = await self.db.execute(query)
+        return {row.id: row.status for row in result}
+
+    async def get_existing_ids(self, model, ids: List[int]) -> set:
+        """Получить множество существующих ID из таблицы модели"""
+        if not ids:
+            return set()
+        result = await self.db.execute(select(model.id).where(model.id.in_(ids)))
+        return set(result.scalars().all())
+
     async def update(self, billing_id: int, update_data: dict) -> Optional[Billing]:
         """Обновить счет"""
         query = (
@@ -47,12 +95,98 @@ class BillingRepository:
             .returning(Billing)
         )
         result = await self.db.execute(query)
+        billing = result.scalar_one_or_none()
+        if billing:
+            await self.refresh_balances([billing.patient_id])
         await self.db.commit()
-        return result.scalar_one_or_none()
+        return billing
 
     async def delete(self, billing_id: int) -> bool:
         """Удалить счет"""
-        query = delete(Billing).where(Billing.id == billing_id)
+        query = delete(Billing).where(Billing.id == billing_id).returning(Billing.patient_id)
         result = await self.db.execute(query)
+        patient_id = result.scalar_one_or_none()
+        if patient_id is not None:
+            await self.refresh_balances([patient_id])
         await self.db.commit()
-        return result.rowcount > 0
+        return patient_id is not None
+
+    async def mark_overdue_batches(self, cutoff: datetime, chunk_size: int = 1000) -> AsyncIterator[List[int]]:
+        """Перевести неоплаченные счета, созданные до cutoff, в OVERDUE (порциями)"""
+        async for rows in iter_chunked_update(
+            self.db,
+            Billing,
+            where=[Billing.status == BillingStatus.PENDING, Billing.created_at < cutoff],
+            values={"status": BillingStatus.OVERDUE},
+            returning=[Billing.id, Billing.patient_id],
+            chunk_size=chunk_size,
+        ):
+            # Балансы пересчитываются в транзакции текущей порции
+            await self.refresh_balances(row.patient_id for row in rows)
+            yield [row.id for row in rows]
+
+    # Материализованные балансы пациентов
+    async def refresh_balances(self, patient_ids: Iterable[int]) -> None:
+        """Пересчитать балансы пациентов (INSERT ... SELECT ... ON CONFLICT DO UPDATE)"""
+        patient_ids = sorted(set(patient_ids))
+        if not patient_ids:
+            return
+
+        # Блокируем строки пациентов, чтобы параллельные транзакции
+        # не перезаписали баланс суммой из устаревшего снимка
+        await self.db.execute(
+            select(Patient.id)
+            .where(Patient.id.in_(patient_ids))
+            .order_by(Patient.id)
+            .with_for_update(key_share=True)
+        )
+
+        unpaid = [BillingStatus.PENDING, BillingStatus.OVERDUE]
+        totals = (
+            select(
+                Patient.id,
+                func.coalesce(func.sum(case((Billing.status.in_(unpaid), Billing.amount), else_=0)), 0),
+                func.coalesce(func.sum(case((Billing.status == BillingStatus.OVERDUE, Billing.amount), else_=0)), 0),
+                func.coalesce(func.sum(case((Billing.status == BillingStatus.PAID, Billing.amount), else_=0)), 0),
+                func.count(Billing.id),
+            )
+            .select_from(Patient)
+            .outerjoin(Billing, Billing.patient_id == Patient.id)
+            .where(Patient.id.in_(patient_ids))
+            .group_by(Patient.id)
+        )
+        query = pg_insert(PatientBalance).from_select(
+            ["patient_id", "outstanding", "overdue", "paid", "invoices_count"], totals
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[PatientBalance.patient_id],
+            set_={
+                "outstanding": query.excluded.outstanding,
+                "overdue": query.excluded.overdue,
+                "paid": query.excluded.paid,
+                "invoices_count": query.excluded.invoices_count,
+                "updated_at": func.now(),
+            }
+        )
+        await self.db.execute(query)
+
+    async def get_balance(self, patient_id: int) -> Optional[PatientBalance]:
+        """Получить баланс пациента"""
+        result = await self.db.execute(select(PatientBalance).where(PatientBalance.patient_id == patient_id))
+        return result.scalar_one_or_none()
+
+    async def get_top_debtors(
+        self, skip: int = 0, limit: int = 50, sort_by: str = "outstanding"
+    ) -> List[Tuple[PatientBalance, Patient]]:
+        """Получить пациентов с наибольшей задолженностью"""
+        sort_column = getattr(PatientBalance, sort_by)
+        query = (
+            select(PatientBalance, Patient)
+            .join(Patient, Patient.id == PatientBalance.patient_id)
+            .where(sort_column > 0)
+            .order_by(sort_column.desc(), PatientBalance.patient_id)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return [(row[0], row[1]) for row in result.all()]
@@ -1,14 +1,17 @@
 """
 Billing Router (API Endpoints)
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.db.session import get_db
 from app.core.dependencies import get_current_user
 from .service import BillingService
-from .schemas import BillingCreate, BillingUpdate, Billing
+from .schemas import (
+    BillingCreate, BillingUpdate, Billing, BillingBulkCreate, BillingBulkPay, BillingBulkResult,
+    PatientBalance, PatientDebtor
+)
 
 router = APIRouter()
 
@@ -23,6 +26,19 @@ async def get_all_billing(
     return await service.get_all_billing()
 
 
+@router.get("/debtors", response_model=List[PatientDebtor])
+async def get_top_debtors(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    sort_by: str = Query("outstanding", pattern="^(outstanding|overdue)$"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    """Получить пациентов с наибольшей задолженностью"""
+    service = BillingService(db)
+    return await service.get_top_debtors(skip, limit, sort_by)
+
+
 @router.get("/{billing_id}", response_model=Billing)
 async def get_billing(
     billing_id: int,
@@ -48,6 +64,20 @@ async def get_billing_by_patient(
     return await service.get_billing_by_patient(patient_id)
 
 
+@router.get("/patient/{patient_id}/balance", response_model=PatientBalance)
+async def get_patient_balance(
+    patient_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    """Получить баланс пациента"""
+    service = BillingService(db)
+    balance = await service.get_patient_balance(patient_id)
+    if not balance:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    return balance
+
+
 @router.post("/", response_model=Billing)
 async def create_billing(
     billing_data: BillingCreate,
@@ -59,6 +89,28 @@ async def create_billing(
     return await service.create_billing(billing_data, current_user.id)
 
 
+@router.post("/bulk", response_model=BillingBulkResult)
+async def create_billing_bulk(
+    bulk_data: BillingBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    """Создать несколько счетов одним запросом"""
+    service = BillingService(db)
+    return await service.create_billing_bulk(bulk_data, current_user.id)
+
+
+@router.post("/bulk-pay", response_model=BillingBulkResult)
+async def mark_billing_as_paid_bulk(
+    bulk_data: BillingBulkPay,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    """Отметить несколько счетов как оплаченные"""
+    service = BillingService(db)
+    return await service.mark_as_paid_bulk(bulk_data)
+
+
 @router.put("/{billing_id}", response_model=Billing)
 async def update_billing(
     billing_id: int,
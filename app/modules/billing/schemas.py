@@ -1,9 +1,9 @@
 """
 Billing Schemas (Pydantic)
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 from decimal import Decimal
 
 
@@ -35,3 +35,54 @@ class Billing(BillingBase):
 
     class Config:
         from_attributes = True
+
+
+class BillingBulkCreate(BaseModel):
+    """Пакет счетов для создания"""
+    items: List[BillingCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class BillingBulkPay(BaseModel):
+    """Пакетная оплата счетов"""
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+    payment_date: Optional[datetime] = None
+
+
+class BulkItemError(BaseModel):
+    """Ошибка обработки одного элемента пакета"""
+    index: Optional[int] = None  # Позиция элемента в запросе (для создания)
+    id: Optional[int] = None     # ID счета (для оплаты)
+    detail: str
+
+
+class BillingBulkResult(BaseModel):
+    """Результат пакетной операции со счетами"""
+    items: List[Billing]
+    errors: List[BulkItemError] = []
+
+
+class PatientBalance(BaseModel):
+    """Баланс пациента"""
+    patient_id: int
+    outstanding: Decimal = Decimal("0")  # К оплате (PENDING + OVERDUE)
+    overdue: Decimal = Decimal("0")
+    paid: Decimal = Decimal("0")
+    invoices_count: int = 0
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class PatientDebtor(PatientBalance):
+    """Пациент с задолженностью"""
+    patient_name: str
+    phone: Optional[str] = None
+
+
+class OverdueSweepResult(BaseModel):
+    """Результат перевода счетов в статус OVERDUE"""
+    processed: int
+    batches: int
+    cutoff: datetime
+    duration_seconds: float
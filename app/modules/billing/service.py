@@ -3,10 +3,22 @@ Billing Service (Business Logic Layer)
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+import logging
+import time
+from app.core.config import settings
+from app.db.references import Reference, validate_references, foreign_key_errors
+from app.modules.stats.repository import StatsRepository
+from app.modules.stats.schemas import StatType
 from .repository import BillingRepository
 from .models import Billing, BillingStatus
-from .schemas import BillingCreate, BillingUpdate, Billing as BillingSchema
+from .schemas import (
+    BillingCreate, BillingUpdate, Billing as BillingSchema, OverdueSweepResult,
+    BillingBulkCreate, BillingBulkPay, BillingBulkResult, BulkItemError,
+    PatientBalance, PatientDebtor
+)
+
+logger = logging.getLogger(__name__)
 
 
 class BillingService:
@@ -31,13 +43,48 @@ class BillingService:
         billing_records = await self.repository.get_by_patient_id(patient_id)
         return [BillingSchema.from_orm(record) for record in billing_records]
 
+    async def get_patient_balance(self, patient_id: int) -> Optional[PatientBalance]:
+        """Получить баланс пациента (нулевой, если счетов не было; None - пациент не найден)"""
+        from app.modules.patients.repository import PatientsRepository
+
+        balance = await self.repository.get_balance(patient_id)
+        if balance:
+            return PatientBalance.from_orm(balance)
+        if not await PatientsRepository(self.db).exists(patient_id):
+            return None
+        return PatientBalance(patient_id=patient_id)
+
+    async def get_top_debtors(self, skip: int = 0, limit: int = 50, sort_by: str = "outstanding") -> List[PatientDebtor]:
+        """Получить список должников"""
+        rows = await self.repository.get_top_debtors(skip, limit, sort_by)
+        return [
+            PatientDebtor(
+                **PatientBalance.from_orm(balance).dict(),
+                patient_name=patient.full_name,
+                phone=patient.phone
+            )
+            for balance, patient in rows
+        ]
+
     async def create_billing(self, billing_data: BillingCreate, created_by: int) -> BillingSchema:
         """Создать новый счет"""
+        from app.modules.patients.models import Patient
+        from app.modules.appointments.models import Appointment
+        from app.modules.prescriptions.models import Prescription
+
+        await validate_references(
+            self.db,
+            Reference(Patient, billing_data.patient_id, "Patient"),
+            Reference(Appointment, billing_data.appointment_id, "Appointment"),
+            Reference(Prescription, billing_data.prescription_id, "Prescription"),
+        )
+
         billing = Billing(
             **billing_data.dict(),
             created_by=created_by
         )
-        created_billing = await self.repository.create(billing)
+        async with foreign_key_errors(self.db):
+            created_billing = await self.repository.create(billing)
         return BillingSchema.from_orm(created_billing)
 
     async def update_billing(self, billing_id: int, update_data: BillingUpdate) -> Optional[BillingSchema]:
@@ -60,3 +107,96 @@ class BillingService:
             payment_date=datetime.utcnow()
         )
         return await self.update_billing(billing_id, update_data)
+
+    async def create_billing_bulk(self, bulk_data: BillingBulkCreate, created_by: int) -> BillingBulkResult:
+        """Создать несколько счетов в одной транзакции"""
+        from app.modules.patients.models import Patient
+        from app.modules.appointments.models import Appointment
+        from app.modules.prescriptions.models import Prescription
+
+        items = bulk_data.items
+
+        # Проверяем ссылки одним запросом на таблицу
+        patients = await self.repository.get_existing_ids(Patient, list({i.patient_id for i in items}))
+        appointments = await self.repository.get_existing_ids(
+            Appointment, list({i.appointment_id for i in items if i.appointment_id})
+        )
+        prescriptions = await self.repository.get_existing_ids(
+            Prescription, list({i.prescription_id for i in items if i.prescription_id})
+        )
+
+        rows = []
+        errors = []
+        for index, item in enumerate(items):
+            if item.patient_id not in patients:
+                errors.append(BulkItemError(index=index, detail="Patient not found"))
+            elif item.appointment_id and item.appointment_id not in appointments:
+                errors.append(BulkItemError(index=index, detail="Appointment not found"))
+            elif item.prescription_id and item.prescription_id not in prescriptions:
+                errors.append(BulkItemError(index=index, detail="Prescription not found"))
+            else:
+                rows.append({**item.dict(), "created_by": created_by})
+
+        created = await self.repository.create_many(rows)
+        return BillingBulkResult(
+            items=[BillingSchema.from_orm(record) for record in created],
+            errors=errors
+        )
+
+    async def mark_as_paid_bulk(self, bulk_data: BillingBulkPay) -> BillingBulkResult:
+        """Отметить несколько счетов как оплаченные в одной транзакции"""
+        billing_ids = list(dict.fromkeys(bulk_data.ids))
+        payment_date = bulk_data.payment_date or datetime.utcnow()
+
+        paid = await self.repository.mark_paid_many(billing_ids, payment_date)
+
+        errors = []
+        paid_ids = {record.id for record in paid}
+        skipped = [billing_id for billing_id in billing_ids if billing_id not in paid_ids]
+        if skipped:
+            statuses = await self.repository.get_statuses(skipped)
+            for billing_id in skipped:
+                if billing_id not in statuses:
+                    errors.append(BulkItemError(id=billing_id, detail="Billing record not found"))
+                else:
+                    errors.append(BulkItemError(
+                        id=billing_id,
+                        detail=f"Billing record cannot be paid in status '{statuses[billing_id].value}'"
+                    ))
+
+        return BillingBulkResult(
+            items=[BillingSchema.from_orm(record) for record in paid],
+            errors=errors
+        )
+
+    async def mark_overdue(self, due_days: Optional[int] = None, chunk_size: Optional[int] = None) -> OverdueSweepResult:
+        """Перевести неоплаченные счета старше due_days дней в статус OVERDUE"""
+        due_days = settings.billing_overdue_days if due_days is None else due_days
+        chunk_size = chunk_size or settings.batch_chunk_size
+        cutoff = datetime.now(timezone.utc) - timedelta(days=due_days)
+
+        started = time.perf_counter()
+        processed = 0
+        batches = 0
+        async for ids in self.repository.mark_overdue_batches(cutoff, chunk_size):
+            processed += len(ids)
+            batches += 1
+        duration = time.perf_counter() - started
+
+        # Сохраняем результат последнего запуска в системную статистику
+        await StatsRepository(self.db).create_or_update_system_stat(
+            StatType.BILLING, "overdue_sweep",
+            int_value=processed,
+            float_value=round(duration, 3),
+            period_end=datetime.now(timezone.utc),
+            description="Счета, переведенные в OVERDUE последним запуском (float_value - секунды)"
+        )
+        await self.db.commit()
+
+        logger.info(f"Overdue sweep: {processed} invoice(s) in {batches} batch(es), {duration:.3f}s")
+        return OverdueSweepResult(
+            processed=processed,
+            batches=batches,
+            cutoff=cutoff,
+            duration_seconds=duration
+        )
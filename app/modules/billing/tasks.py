@@ -0,0 +1,14 @@
+"""
+Billing Tasks (фоновые задачи)
+"""
+from typing import Optional
+from app.db.session import AsyncSessionLocal
+from .service import BillingService
+from .schemas import OverdueSweepResult
+
+
+async def mark_overdue_job(due_days: Optional[int] = None, chunk_size: Optional[int] = None) -> OverdueSweepResult:
+    """Перевести просроченные счета в OVERDUE в отдельной сессии"""
+    async with AsyncSessionLocal() as db:
+        service = BillingService(db)
+        return await service.mark_overdue(due_days, chunk_size)
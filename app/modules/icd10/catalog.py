@@ -0,0 +1,144 @@
+"""
+ICD-10 Catalog (справочник МКБ-10 в памяти: поиск по префиксу кода и словам названия)
+"""
+import logging
+import re
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.prefix_index import PrefixIndex
+from .models import Icd10Code
+
+logger = logging.getLogger(__name__)
+
+# Сколько позиций индекса просматривать на один запрос (ограничивает задержку для коротких префиксов)
+MAX_SCAN = 5000
+
+# Буква и две цифры, затем необязательное уточнение: J06, J06.9, J069, S72.00
+_CODE = re.compile(r"^[A-Z]\d{2}(\.?[0-9A-Z]{0,4})?$")
+_CODE_PREFIX = re.compile(r"^[A-Z]\d{0,2}(\.?[0-9A-Z]{0,4})?$")
+_WORD = re.compile(r"\w+")
+
+
+class Icd10Entry(NamedTuple):
+    """Код и название"""
+    code: str
+    title: str
+
+
+def normalize_code(value: Optional[str]) -> str:
+    """Привести код к виду справочника: заглавные буквы, точка после категории (j069 -> J06.9)"""
+    if not value:
+        return ""
+    code = value.strip().upper().replace(" ", "").replace(",", ".")
+    if len(code) > 3 and code[3] != "." and _CODE.match(code):
+        code = f"{code[:3]}.{code[3:]}"
+    return code.rstrip(".")
+
+
+def is_code(value: str) -> bool:
+    """Похоже ли значение на код МКБ-10 (целиком)"""
+    return bool(_CODE.match(normalize_code(value)))
+
+
+def normalize_word(value: str) -> str:
+    """Нормализовать слово названия для индекса"""
+    return value.lower().replace("ё", "е")
+
+
+def title_words(title: str) -> List[str]:
+    """Слова названия (без однобуквенных)"""
+    return [normalize_word(word) for word in _WORD.findall(title) if len(word) > 1]
+
+
+class Icd10Catalog:
+    """Справочник в памяти процесса; позиция записи в отсортированном по коду списке - ее id в индексах"""
+
+    def __init__(self):
+        self._entries: List[Icd10Entry] = []
+        self._positions: Dict[str, int] = {}
+        self._codes = PrefixIndex()
+        self._words = PrefixIndex()
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, code: str) -> bool:
+        return normalize_code(code) in self._positions
+
+    def get(self, code: str) -> Optional[Icd10Entry]:
+        """Запись по коду"""
+        position = self._positions.get(normalize_code(code))
+        return self._entries[position] if position is not None else None
+
+    def build(self, entries: List[Icd10Entry]) -> None:
+        """Построить справочник заново"""
+        ordered = sorted(
+            (Icd10Entry(sys.intern(normalize_code(entry.code)), entry.title) for entry in entries),
+            key=lambda entry: entry.code,
+        )
+        positions = {entry.code: position for position, entry in enumerate(ordered)}
+        codes, words = PrefixIndex(), PrefixIndex()
+        # Код индексируется с точкой и без нее: "j06.9" и "j069"
+        codes.build(
+            (key, position)
+            for position, entry in enumerate(ordered)
+            for key in {entry.code.lower(), entry.code.lower().replace(".", "")}
+        )
+        words.build(
+            (word, position)
+            for position, entry in enumerate(ordered)
+            for word in set(title_words(entry.title))
+        )
+
+        # Подмена одной операцией: запросы не видят полупостроенный справочник
+        self._entries, self._positions, self._codes, self._words = ordered, positions, codes, words
+        self.ready = True
+
+    def search(self, query: str, limit: int = 10) -> List[Icd10Entry]:
+        """Найти записи по префиксу кода или по префиксам всех слов названия; результат упорядочен по коду"""
+        query = query.strip()
+        if not query:
+            return []
+
+        code = normalize_code(query)
+        if _CODE_PREFIX.match(code):
+            positions = self._codes.search(code.lower(), limit, max_scan=MAX_SCAN)
+            if positions:
+                return [self._entries[position] for position in sorted(positions)]
+
+        terms = [normalize_word(word) for word in _WORD.findall(query)]
+        if not terms:
+            return []
+
+        # Ищем по самому избирательному слову, остальные проверяем по названию
+        terms.sort(key=self._words.count)
+        lead, rest = terms[0], terms[1:]
+
+        def accept(position: int) -> bool:
+            words = title_words(self._entries[position].title)
+            return all(any(word.startswith(term) for word in words) for term in rest)
+
+        positions = self._words.search(lead, limit, accept=accept if rest else None, max_scan=MAX_SCAN)
+        return [self._entries[position] for position in sorted(positions)]
+
+
+async def load_entries(db: AsyncSession, chunk_size: int = 10000) -> List[Icd10Entry]:
+    """Загрузить справочник потоково"""
+    query = select(Icd10Code.code, Icd10Code.title).execution_options(yield_per=chunk_size)
+    result = await db.stream(query)
+    return [Icd10Entry(*row) async for row in result]
+
+
+async def reload_catalog(db: AsyncSession) -> int:
+    """Перечитать справочник из базы данных; количество кодов"""
+    started = time.monotonic()
+    icd10_catalog.build(await load_entries(db))
+    logger.info("ICD-10 catalog loaded: %s codes in %.2fs", len(icd10_catalog), time.monotonic() - started)
+    return len(icd10_catalog)
+
+
+icd10_catalog = Icd10Catalog()
@@ -0,0 +1,98 @@
+"""
+ICD-10 Loader (загрузка справочника из файла через COPY)
+"""
+import csv
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from .catalog import is_code, normalize_code
+
+# Промежуточная таблица живет до конца транзакции
+CREATE_STAGING = """
+CREATE TEMP TABLE icd10_staging (
+    code VARCHAR(10) NOT NULL,
+    title VARCHAR(500) NOT NULL
+) ON COMMIT DROP
+"""
+
+# Новые коды вставляются, у существующих меняется только изменившееся название
+MERGE_STAGING = """
+INSERT INTO icd10_codes (code, title)
+SELECT code, title FROM icd10_staging
+ON CONFLICT (code) DO UPDATE
+SET title = EXCLUDED.title, updated_at = now()
+WHERE icd10_codes.title IS DISTINCT FROM EXCLUDED.title
+"""
+
+TITLE_MAX_LENGTH = 500
+
+
+class Icd10LoadResult(NamedTuple):
+    """Итог загрузки справочника"""
+    rows: int
+    skipped: int
+    changed: int
+    duration_seconds: float
+
+
+def iter_rows(stream: TextIO, delimiter: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Строки (код, название) из CSV/TSV; без delimiter строки вида "A00.0 Холера ..."
+    делятся по первому пробелу, иначе разделитель определяется по первой строке
+    """
+    first = stream.readline()
+    if not first:
+        return
+    head = first.split(None, 1)
+    if delimiter is None and not (head and is_code(head[0])):
+        delimiter = next((candidate for candidate in ("\t", ";", ",") if candidate in first), None)
+
+    def lines() -> Iterator[str]:
+        yield first
+        yield from stream
+
+    if delimiter is None:
+        for line in lines():
+            parts = line.strip().split(None, 1)
+            if parts:
+                yield parts[0], parts[1] if len(parts) > 1 else ""
+        return
+    for row in csv.reader(lines(), delimiter=delimiter):
+        if len(row) >= 2:
+            yield row[0], row[1]
+        elif row:
+            yield row[0], ""
+
+
+def parse_entries(rows: Iterable[Tuple[str, str]]) -> Tuple[List[Tuple[str, str]], int]:
+    """Нормализовать коды и отбросить заголовок, пустые и некорректные строки; повторный код заменяет прежний"""
+    entries: Dict[str, str] = {}
+    skipped = 0
+    for raw_code, raw_title in rows:
+        code, title = normalize_code(raw_code), " ".join(raw_title.split())
+        if not title or not is_code(code):
+            skipped += 1
+            continue
+        entries[code] = title[:TITLE_MAX_LENGTH]
+    return list(entries.items()), skipped
+
+
+async def copy_entries(conn: AsyncConnection, entries: List[Tuple[str, str]]) -> int:
+    """COPY во временную таблицу и слияние с icd10_codes (в транзакции conn); количество измененных строк"""
+    await conn.execute(text(CREATE_STAGING))
+    raw = await conn.get_raw_connection()
+    # Протокол COPY asyncpg вместо многострочных INSERT
+    await raw.driver_connection.copy_records_to_table(
+        "icd10_staging", records=entries, columns=("code", "title")
+    )
+    result = await conn.execute(text(MERGE_STAGING))
+    return result.rowcount
+
+
+async def load_icd10(conn: AsyncConnection, stream: TextIO, delimiter: Optional[str] = None) -> Icd10LoadResult:
+    """Загрузить справочник из файла"""
+    started = time.monotonic()
+    entries, skipped = parse_entries(iter_rows(stream, delimiter))
+    changed = await copy_entries(conn, entries) if entries else 0
+    return Icd10LoadResult(len(entries), skipped, changed, time.monotonic() - started)
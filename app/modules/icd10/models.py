@@ -0,0 +1,20 @@
+"""
+ICD-10 Models
+"""
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, DateTime
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+
+class Icd10Code(Base):
+    """Справочник кодов МКБ-10"""
+    __tablename__ = "icd10_codes"
+
+    code: Mapped[str] = mapped_column(String(10), primary_key=True)  # Например, J06.9
+    title: Mapped[str] = mapped_column(String(500), nullable=False)
+
+    updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<Icd10Code(code={self.code})>"
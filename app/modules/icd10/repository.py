@@ -0,0 +1,46 @@
+"""
+ICD-10 Repository (Data Access Layer)
+"""
+from typing import List, Optional, Sequence
+from sqlalchemy import select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import Icd10Code
+
+
+def _escape_like(value: str) -> str:
+    """Экранировать спецсимволы LIKE"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class Icd10Repository:
+    """Репозиторий справочника МКБ-10"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_code(self, code: str) -> Optional[Icd10Code]:
+        """Получить код"""
+        return await self.db.get(Icd10Code, code)
+
+    async def get_existing_codes(self, codes: Sequence[str]) -> List[str]:
+        """Какие из кодов есть в справочнике"""
+        if not codes:
+            return []
+        result = await self.db.execute(select(Icd10Code.code).where(Icd10Code.code.in_(set(codes))))
+        return result.scalars().all()
+
+    async def search(self, query: str, limit: int = 10) -> List[Icd10Code]:
+        """Поиск по префиксу кода или по сходству названия (pg_trgm, индекс ix_icd10_codes_title_trgm)"""
+        similarity = func.similarity(Icd10Code.title, query)
+        statement = (
+            select(Icd10Code)
+            .where(or_(
+                Icd10Code.code.like(f"{_escape_like(query.upper())}%"),
+                Icd10Code.title.op("%")(query),
+                Icd10Code.title.ilike(f"%{_escape_like(query)}%"),
+            ))
+            .order_by(similarity.desc(), Icd10Code.code)
+            .limit(limit)
+        )
+        result = await self.db.execute(statement)
+        return result.scalars().all()
@@ -0,0 +1,46 @@
+"""
+ICD-10 Router (API Endpoints)
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app.db.session import get_db
+from app.core.dependencies import get_current_user, require_role
+from .service import Icd10Service
+from .schemas import Icd10Code, Icd10ReloadResult
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=List[Icd10Code])
+async def search_codes(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Автодополнение диагнозов по началу кода или слов названия (из памяти)"""
+    service = Icd10Service(db)
+    return await service.search(q, limit)
+
+
+@router.post("/reload", response_model=Icd10ReloadResult)
+async def reload_codes(
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(require_role("admin"))
+):
+    """Перечитать справочник в память (после manage.py load-icd10)"""
+    service = Icd10Service(db)
+    return await service.reload()
+
+
+@router.get("/{code}", response_model=Icd10Code)
+async def get_code(
+    code: str,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Получить код МКБ-10"""
+    service = Icd10Service(db)
+    return await service.get_code(code)
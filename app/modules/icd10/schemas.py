@@ -0,0 +1,19 @@
+"""
+ICD-10 Schemas (Pydantic)
+"""
+from pydantic import BaseModel
+
+
+class Icd10Code(BaseModel):
+    """Код МКБ-10"""
+    code: str
+    title: str
+
+    class Config:
+        from_attributes = True
+
+
+class Icd10ReloadResult(BaseModel):
+    """Результат перезагрузки справочника в память"""
+    codes: int
+    duration_seconds: float
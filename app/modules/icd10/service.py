@@ -0,0 +1,45 @@
+"""
+ICD-10 Service (Business Logic Layer)
+"""
+import time
+from typing import List
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from .catalog import icd10_catalog, normalize_code, reload_catalog
+from .repository import Icd10Repository
+from .schemas import Icd10Code, Icd10ReloadResult
+
+
+class Icd10Service:
+    """Сервис справочника МКБ-10"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repository = Icd10Repository(db)
+
+    async def search(self, query: str, limit: int = 10) -> List[Icd10Code]:
+        """Подсказки по началу кода или словам названия"""
+        if icd10_catalog.ready:
+            entries = icd10_catalog.search(query, limit)
+            if entries:
+                return [Icd10Code(**entry._asdict()) for entry in entries]
+
+        # Справочник еще загружается или префиксы ничего не дали (опечатка) - нечеткий поиск в БД
+        codes = await self.repository.search(query, limit)
+        return [Icd10Code.from_orm(code) for code in codes]
+
+    async def get_code(self, code: str) -> Icd10Code:
+        """Получить код"""
+        entry = icd10_catalog.get(code)
+        if entry:
+            return Icd10Code(**entry._asdict())
+        found = await self.repository.get_code(normalize_code(code))
+        if not found:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="ICD-10 code not found")
+        return Icd10Code.from_orm(found)
+
+    async def reload(self) -> Icd10ReloadResult:
+        """Перечитать справочник в память процесса"""
+        started = time.monotonic()
+        codes = await reload_catalog(self.db)
+        return Icd10ReloadResult(codes=codes, duration_seconds=round(time.monotonic() - started, 3))
@@ -0,0 +1,11 @@
+"""
+ICD-10 Tasks (фоновые задачи)
+"""
+from app.db.session import AsyncSessionLocal
+from .catalog import reload_catalog
+
+
+async def reload_icd10_job() -> None:
+    """Перечитать справочник МКБ-10 в отдельной сессии"""
+    async with AsyncSessionLocal() as db:
+        await reload_catalog(db)
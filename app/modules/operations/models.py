@@ -2,7 +2,7 @@
 Operations Models
 """
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import String, DateTime, Text, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from app.db.session import Base
 
@@ -10,6 +10,10 @@ from app.db.session import Base
 class Surgery(Base):
     """Модель операции"""
     __tablename__ = "surgeries"
+    __table_args__ = (
+        # История пациента (лента событий)
+        Index("ix_surgeries_patient_operation_date", "patient_id", "operation_date"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
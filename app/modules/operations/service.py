@@ -5,6 +5,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Sequence
 from datetime import datetime
 from fastapi import HTTPException, status
+from app.db.references import Reference, validate_references, foreign_key_errors
+from app.modules.auth.models import User
+from app.modules.patients.models import Patient
 from .repository import OperationsRepository
 from .models import Surgery
 from .schemas import SurgeryCreate, SurgeryUpdate
@@ -44,8 +47,7 @@ class OperationsService:
     async def get_patient_surgeries(self, patient_id: int, skip: int = 0, limit: int = 50) -> Sequence[Surgery]:
         """Получить операции пациента"""
         # Проверяем, существует ли пациент
-        patient = await self.patients_repository.get_patient_by_id(patient_id)
-        if not patient:
+        if not await self.patients_repository.exists(patient_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Patient not found"
@@ -59,13 +61,12 @@ class OperationsService:
 
     async def create_surgery(self, surgery_data: SurgeryCreate, created_by: int) -> Surgery:
         """Создать новую операцию"""
-        # Проверяем, существует ли пациент
-        patient = await self.patients_repository.get_patient_by_id(surgery_data.patient_id)
-        if not patient:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Patient not found"
-            )
+        # Проверяем пациента и хирурга одним запросом
+        await validate_references(
+            self.db,
+            Reference(Patient, surgery_data.patient_id, "Patient"),
+            Reference(User, surgery_data.surgeon_id, "Surgeon"),
+        )
 
         # Проверяем, что время окончания не раньше времени начала
         if surgery_data.end_time and surgery_data.end_time <= surgery_data.start_time:
@@ -91,7 +92,8 @@ class OperationsService:
             created_by=created_by
         )
 
-        return await self.repository.create_surgery(surgery)
+        async with foreign_key_errors(self.db):
+            return await self.repository.create_surgery(surgery)
 
     async def update_surgery(self, surgery_id: int, surgery_data: SurgeryUpdate) -> Surgery:
         """Обновить операцию"""
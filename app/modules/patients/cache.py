@@ -0,0 +1,37 @@
+"""
+Patients Cache (кэш карточек пациентов для горячих чтений)
+"""
+from app.core.cache import TTLCache
+from app.core.config import settings
+from .models import Patient
+
+# Колонки пациента, которые хранятся в кэше
+CACHED_FIELDS = (
+    "id", "first_name", "last_name", "middle_name", "date_of_birth", "gender", "phone", "address",
+    "blood_type", "allergies", "chronic_diseases", "emergency_contact_name", "emergency_contact_phone",
+    "is_active", "created_at", "updated_at",
+)
+
+
+class CachedPatient:
+    """Компактная копия строки пациента (без состояния ORM)"""
+
+    __slots__ = CACHED_FIELDS
+
+    def __init__(self, **values):
+        for field in CACHED_FIELDS:
+            setattr(self, field, values.get(field))
+
+    @classmethod
+    def from_model(cls, patient: Patient) -> "CachedPatient":
+        """Снять копию с ORM-объекта"""
+        return cls(**{field: getattr(patient, field) for field in CACHED_FIELDS})
+
+    def __repr__(self):
+        return f"<CachedPatient(id={self.id})>"
+
+
+patient_cache: TTLCache[CachedPatient] = TTLCache(
+    maxsize=settings.patient_cache_size,
+    ttl=settings.patient_cache_ttl_seconds,
+)
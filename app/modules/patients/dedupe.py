@@ -0,0 +1,206 @@
+"""
+Patients Dedupe (поиск дубликатов пациентов)
+
+Пары сравниваются только внутри блоков с общим ключом (телефон или
+дата рождения + soundex фамилии), поэтому сложность близка к O(n).
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+from .search import normalize_phone
+from .typeahead import normalize_name
+
+# Блоки больше этого размера (например, общий телефон регистратуры) не сравниваются попарно
+MAX_BLOCK_SIZE = 200
+
+# Одинаковые ФИО и дата рождения без телефона дают 0.75, совпадение всего - 1.0
+DEFAULT_THRESHOLD = 0.6
+
+PHONE_MIN_DIGITS = 7
+LOCAL_PHONE_DIGITS = 10
+
+_TRANSLIT = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ж": "zh", "з": "z", "и": "i",
+    "й": "i", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r", "с": "s",
+    "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch",
+    "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "iu", "я": "ia",
+})
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"), **dict.fromkeys("dt", "3"),
+    "l": "4", **dict.fromkeys("mn", "5"), "r": "6",
+}
+
+
+class DedupeRecord(NamedTuple):
+    """Проекция пациента для поиска дубликатов"""
+    id: int
+    last_name: str
+    first_name: str
+    middle_name: Optional[str]
+    date_of_birth: date
+    phone: Optional[str]
+
+
+class DuplicateMatch(NamedTuple):
+    """Пара вероятных дубликатов (patient_id < duplicate_id)"""
+    patient_id: int
+    duplicate_id: int
+    score: float
+    reasons: Tuple[str, ...]
+
+
+def soundex(value: str) -> str:
+    """Soundex фамилии (кириллица предварительно транслитерируется)"""
+    letters = [ch for ch in normalize_name(value).translate(_TRANSLIT) if "a" <= ch <= "z"]
+    if not letters:
+        return ""
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], "")
+    for ch in letters[1:]:
+        digit = _SOUNDEX_CODES.get(ch, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if ch not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def _trigrams(value: str) -> Set[str]:
+    """Триграммы слова как в pg_trgm (с отступами по краям)"""
+    padded = f"  {value} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def name_similarity(a: Optional[str], b: Optional[str]) -> float:
+    """Похожесть двух частей имени по триграммам (0..1)"""
+    a, b = normalize_name(a), normalize_name(b)
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    left, right = _trigrams(a), _trigrams(b)
+    return len(left & right) / len(left | right)
+
+
+def local_phone(phone: Optional[str]) -> str:
+    """Номер без кода страны"""
+    digits = normalize_phone(phone)
+    return digits[-LOCAL_PHONE_DIGITS:] if len(digits) >= PHONE_MIN_DIGITS else ""
+
+
+def blocking_keys(record: DedupeRecord) -> List[tuple]:
+    """Ключи блоков, в которых ищутся дубликаты записи"""
+    keys = []
+    phone = local_phone(record.phone)
+    if phone:
+        keys.append(("phone", phone))
+    name_code = soundex(record.last_name)
+    if name_code and record.date_of_birth:
+        keys.append(("dob", record.date_of_birth, name_code))
+    return keys
+
+
+def score_pair(a: DedupeRecord, b: DedupeRecord) -> Tuple[float, Tuple[str, ...]]:
+    """Оценка вероятности того, что записи описывают одного пациента"""
+    score = 0.0
+    reasons = []
+
+    phone_a, phone_b = local_phone(a.phone), local_phone(b.phone)
+    if phone_a and phone_a == phone_b:
+        score += 0.25
+        reasons.append("phone")
+    if a.date_of_birth == b.date_of_birth:
+        score += 0.3
+        reasons.append("date_of_birth")
+
+    last = name_similarity(a.last_name, b.last_name)
+    first = name_similarity(a.first_name, b.first_name)
+    score += 0.25 * last + 0.15 * first
+    if last >= 0.5:
+        reasons.append("last_name")
+    if first >= 0.5:
+        reasons.append("first_name")
+
+    if a.middle_name and b.middle_name:
+        middle = name_similarity(a.middle_name, b.middle_name)
+        score += 0.05 * middle
+        if middle >= 0.5:
+            reasons.append("middle_name")
+    elif not a.middle_name and not b.middle_name:
+        score += 0.05
+    else:
+        # Отчество часто не заполняют - не штрафуем за пропуск в одной из карт
+        score += 0.025
+
+    # Разные имена при общем телефоне и фамилии - скорее родственники (в т.ч. близнецы)
+    if first < 0.3:
+        score *= 0.7
+
+    return round(score, 3), tuple(reasons)
+
+
+def build_blocks(records: Iterable[DedupeRecord]) -> List[List[DedupeRecord]]:
+    """Сгруппировать записи по ключам блоков (только блоки из 2+ записей)"""
+    blocks: Dict[tuple, List[DedupeRecord]] = defaultdict(list)
+    for record in records:
+        for key in blocking_keys(record):
+            blocks[key].append(record)
+    return [block for block in blocks.values() if 1 < len(block) <= MAX_BLOCK_SIZE]
+
+
+def score_blocks(blocks: Sequence[Sequence[DedupeRecord]], threshold: float) -> List[DuplicateMatch]:
+    """Сравнить записи попарно внутри каждого блока"""
+    matches: Dict[Tuple[int, int], DuplicateMatch] = {}
+    for block in blocks:
+        for i, a in enumerate(block):
+            for b in block[i + 1:]:
+                pair = (a.id, b.id) if a.id < b.id else (b.id, a.id)
+                if pair in matches:
+                    continue
+                score, reasons = score_pair(a, b)
+                if score >= threshold:
+                    matches[pair] = DuplicateMatch(pair[0], pair[1], score, reasons)
+    return list(matches.values())
+
+
+def merge_matches(*groups: Iterable[DuplicateMatch]) -> List[DuplicateMatch]:
+    """Объединить найденные пары без повторов, по убыванию оценки"""
+    unique: Dict[Tuple[int, int], DuplicateMatch] = {}
+    for group in groups:
+        for match in group:
+            unique.setdefault((match.patient_id, match.duplicate_id), match)
+    return sorted(unique.values(), key=lambda match: (-match.score, match.patient_id, match.duplicate_id))
+
+
+def find_duplicates(records: Iterable[DedupeRecord], threshold: float = DEFAULT_THRESHOLD) -> List[DuplicateMatch]:
+    """Найти вероятные дубликаты в наборе записей"""
+    return merge_matches(score_blocks(build_blocks(records), threshold))
+
+
+def match_patient(
+    record: DedupeRecord, candidates: Iterable[DedupeRecord], threshold: float = DEFAULT_THRESHOLD
+) -> List[DuplicateMatch]:
+    """Оценить кандидатов в дубликаты одного пациента"""
+    matches = []
+    for candidate in candidates:
+        if candidate.id == record.id:
+            continue
+        score, reasons = score_pair(record, candidate)
+        if score >= threshold:
+            matches.append(DuplicateMatch(record.id, candidate.id, score, reasons))
+    return sorted(matches, key=lambda match: (-match.score, match.duplicate_id))
+
+
+def chunk_blocks(blocks: List[List[DedupeRecord]], chunks: int) -> List[List[List[DedupeRecord]]]:
+    """Разбить блоки на порции примерно равной стоимости (число пар)"""
+    chunks = max(1, chunks)
+    buckets: List[List[List[DedupeRecord]]] = [[] for _ in range(chunks)]
+    costs = [0] * chunks
+    for block in sorted(blocks, key=len, reverse=True):
+        target = costs.index(min(costs))
+        buckets[target].append(block)
+        costs[target] += len(block) * (len(block) - 1) // 2
+    return [bucket for bucket in buckets if bucket]
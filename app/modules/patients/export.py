@@ -0,0 +1,96 @@
+"""
+Patients Export (потоковая выгрузка реестра пациентов)
+"""
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import select
+from app.db.session import AsyncSessionLocal
+from .models import Patient
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+EXPORT_COLUMNS = (
+    "id", "last_name", "first_name", "middle_name", "date_of_birth", "gender", "phone", "address",
+    "blood_type", "allergies", "chronic_diseases", "emergency_contact_name", "emergency_contact_phone",
+    "is_active", "created_at", "updated_at",
+)
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def parse_columns(columns: Optional[str]) -> List[str]:
+    """Разобрать список колонок через запятую (по умолчанию - все)"""
+    if not columns:
+        return list(EXPORT_COLUMNS)
+    selected = [column.strip() for column in columns.split(",") if column.strip()]
+    unknown = [column for column in selected if column not in EXPORT_COLUMNS]
+    if unknown or not selected:
+        raise ValueError(f"Unknown columns: {', '.join(unknown) or '(empty)'}")
+    return selected
+
+
+def _to_plain(value):
+    """Привести значение к виду для CSV/JSON"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(rows, header: Optional[List[str]] = None) -> bytes:
+    """Закодировать порцию строк в CSV"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows([_to_plain(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _encode_ndjson(rows, columns: List[str]) -> bytes:
+    """Закодировать порцию строк в NDJSON"""
+    lines = [
+        json.dumps({column: _to_plain(value) for column, value in zip(columns, row)}, ensure_ascii=False)
+        for row in rows
+    ]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+async def iter_export(
+    columns: List[str],
+    file_format: str = "csv",
+    active_only: bool = False,
+    chunk_size: int = 1000,
+) -> AsyncIterator[bytes]:
+    """Выгрузить пациентов порциями через серверный курсор (в отдельной сессии)"""
+    query = select(*(getattr(Patient, column) for column in columns)).order_by(Patient.id)
+    if active_only:
+        query = query.where(Patient.is_active == "Y")
+    query = query.execution_options(yield_per=chunk_size)
+
+    # Сессия живет столько же, сколько поток: зависимость get_db закрывается раньше тела ответа
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        if file_format == "csv":
+            yield _encode_csv([], header=columns)
+        async for rows in result.partitions():
+            if file_format == "csv":
+                yield _encode_csv(rows)
+            else:
+                yield _encode_ndjson(rows, columns)
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Сжимать поток в gzip на лету"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,187 @@
+"""
+Patients Import (пакетная загрузка пациентов из CSV/NDJSON)
+"""
+import asyncio
+import csv
+import json
+import logging
+import time
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import Patient
+from .schemas import PatientCreate, PatientImportError, PatientImportResult
+from .search import normalize_phone, phone_digits_expr
+from .typeahead import patient_index
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Номер строки файла и сама строка (или ошибка разбора)
+ParsedRow = Tuple[int, Union[dict, str]]
+ProgressCallback = Callable[[PatientImportResult], None]
+
+
+def iter_csv_rows(stream: TextIO) -> Iterator[ParsedRow]:
+    """Потоково разобрать CSV с заголовком (пустые ячейки -> None)"""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        if None in row:
+            yield reader.line_num, "Too many columns"
+            continue
+        yield reader.line_num, {key: (value if value != "" else None) for key, value in row.items()}
+
+
+def iter_ndjson_rows(stream: TextIO) -> Iterator[ParsedRow]:
+    """Потоково разобрать NDJSON (один JSON-объект на строку)"""
+    for line_num, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_num, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield line_num, "Expected a JSON object"
+            continue
+        yield line_num, row
+
+
+def iter_rows(stream: TextIO, file_format: str) -> Iterator[ParsedRow]:
+    """Выбрать парсер по формату"""
+    if file_format == "csv":
+        return iter_csv_rows(stream)
+    if file_format == "ndjson":
+        return iter_ndjson_rows(stream)
+    raise ValueError(f"Unsupported import format: {file_format}")
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    """Определить формат по расширению файла"""
+    if not filename:
+        return None
+    name = filename.lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    """Короткое описание ошибки валидации строки"""
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+
+class PatientImporter:
+    """Загрузка пациентов порциями: валидация, дедупликация, INSERT ... RETURNING"""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        chunk_size: int = 1000,
+        dedupe: bool = True,
+        max_errors: int = 1000,
+        on_progress: Optional[ProgressCallback] = None,
+    ):
+        # Пустая порция означает конец файла: с chunk_size < 1 импорт завершился бы без единой строки
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.db = db
+        self.chunk_size = chunk_size
+        self.dedupe = dedupe
+        self.max_errors = max_errors
+        self.on_progress = on_progress
+        self.result = PatientImportResult()
+        # Ключи (телефон, дата рождения), уже встреченные в этом файле
+        self._seen: Set[Tuple[str, object]] = set()
+
+    async def run(self, rows: Iterable[ParsedRow]) -> PatientImportResult:
+        """Импортировать все строки, фиксируя каждую порцию отдельной транзакцией"""
+        started = time.monotonic()
+        rows = iter(rows)
+        while True:
+            # Чтение и разбор файла - синхронный ввод-вывод, не блокируем цикл событий
+            chunk = await asyncio.to_thread(list, islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            await self._import_chunk(chunk)
+            self.result.duration_seconds = time.monotonic() - started
+            if self.on_progress:
+                self.on_progress(self.result)
+
+        self.result.duration_seconds = time.monotonic() - started
+        logger.info(
+            "Patient import: %s processed, %s imported, %s duplicates, %s failed in %.2fs",
+            self.result.processed, self.result.imported, self.result.duplicates,
+            self.result.failed, self.result.duration_seconds
+        )
+        return self.result
+
+    async def _import_chunk(self, chunk: List[ParsedRow]) -> None:
+        """Провалидировать, отсеять дубликаты и вставить одну порцию"""
+        valid: List[Tuple[int, PatientCreate]] = []
+        for line_num, row in chunk:
+            self.result.processed += 1
+            if isinstance(row, str):
+                self.result.failed += 1
+                self._add_error(line_num, row)
+                continue
+            try:
+                valid.append((line_num, PatientCreate(**row)))
+            except ValidationError as e:
+                self.result.failed += 1
+                self._add_error(line_num, _format_validation_error(e))
+
+        if self.dedupe:
+            valid = await self._drop_duplicates(valid)
+        if not valid:
+            return
+
+        values = [patient_data.dict() for _, patient_data in valid]
+        result = await self.db.scalars(insert(Patient).returning(Patient), values)
+        patients = list(result.all())
+        await self.db.commit()
+
+        self.result.imported += len(patients)
+        for patient in patients:
+            patient_index.upsert(patient)
+
+    async def _drop_duplicates(self, valid: List[Tuple[int, PatientCreate]]) -> List[Tuple[int, PatientCreate]]:
+        """Отсеять строки, совпадающие по телефону и дате рождения с базой или файлом"""
+        keys: Dict[int, Tuple[str, object]] = {}
+        for line_num, patient_data in valid:
+            digits = normalize_phone(patient_data.phone)
+            if digits:
+                keys[line_num] = (digits, patient_data.date_of_birth)
+
+        existing: Set[Tuple[str, object]] = set()
+        if keys:
+            query = select(phone_digits_expr(), Patient.date_of_birth).where(
+                tuple_(phone_digits_expr(), Patient.date_of_birth).in_(set(keys.values()))
+            )
+            existing = {tuple(row) for row in await self.db.execute(query)}
+
+        unique = []
+        for line_num, patient_data in valid:
+            key = keys.get(line_num)
+            if key is not None and (key in existing or key in self._seen):
+                self.result.duplicates += 1
+                self._add_error(line_num, "Duplicate patient (same phone and date of birth)")
+                continue
+            if key is not None:
+                self._seen.add(key)
+            unique.append((line_num, patient_data))
+        return unique
+
+    def _add_error(self, line_num: int, detail: str) -> None:
+        """Запомнить ошибку строки (список ограничен max_errors)"""
+        if len(self.result.errors) < self.max_errors:
+            self.result.errors.append(PatientImportError(row=line_num, detail=detail))
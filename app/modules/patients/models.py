@@ -35,7 +35,7 @@ class Patient(Base):
     first_name: Mapped[str] = mapped_column(String(50), nullable=False)
     last_name: Mapped[str] = mapped_column(String(50), nullable=False)
     middle_name: Mapped[str | None] = mapped_column(String(50), nullable=True)
-    date_of_birth: Mapped[Date] = mapped_column(Date, nullable=False)
+    date_of_birth: Mapped[Date] = mapped_column(Date, nullable=False, index=True)
     gender: Mapped[Gender] = mapped_column(Enum(Gender), nullable=False)
     phone: Mapped[str | None] = mapped_column(String(20), nullable=True)
     address: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -2,9 +2,33 @@
 Patients Repository (Data Access Layer)
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional
+from sqlalchemy import select, update, or_, literal
+from typing import AsyncIterator, Dict, List, Optional
+from app.modules.appointments.models import Appointment, AppointmentSeries
+from app.modules.billing.models import Billing
+from app.modules.operations.models import Surgery
+from app.modules.prescriptions.models import Prescription
+from app.modules.visits.models import Visit
 from .models import Patient
+from .search import apply_search, phone_digits_expr
+from .dedupe import DedupeRecord, local_phone
+from .cache import CachedPatient, patient_cache
+
+# Таблицы, ссылающиеся на пациента, которые переносятся при слиянии
+PATIENT_REFERENCES = {
+    "appointments": Appointment,
+    "appointment_series": AppointmentSeries,
+    "visits": Visit,
+    "prescriptions": Prescription,
+    "surgeries": Surgery,
+    "billing": Billing,
+}
+
+# Поля карты, которые при слиянии заполняются из дубликата, если пусты
+MERGE_FILL_FIELDS = (
+    "middle_name", "phone", "address", "blood_type", "allergies", "chronic_diseases",
+    "emergency_contact_name", "emergency_contact_phone",
+)
 
 
 class PatientsRepository:
@@ -18,18 +42,32 @@ class PatientsRepository:
         result = await self.db.execute(select(Patient).filter(Patient.id == patient_id))
         return result.scalar_one_or_none()
 
+    async def get_cached(self, patient_id: int) -> Optional[CachedPatient]:
+        """Получить карточку пациента из кэша или БД (read-through)"""
+        cached = patient_cache.get(patient_id)
+        if cached is not None:
+            return cached
+        patient = await self.get_patient_by_id(patient_id)
+        if patient is None:
+            return None
+        cached = CachedPatient.from_model(patient)
+        patient_cache.set(patient_id, cached)
+        return cached
+
+    async def exists(self, patient_id: int) -> bool:
+        """Проверить существование пациента (кэш или SELECT 1)"""
+        if patient_cache.get(patient_id) is not None:
+            return True
+        result = await self.db.execute(select(literal(1)).where(Patient.id == patient_id))
+        return result.scalar() is not None
+
     async def get_patients(self, skip: int = 0, limit: int = 100, search: Optional[str] = None) -> List[Patient]:
         """Получить список пациентов с пагинацией и поиском"""
         query = select(Patient)
 
         if search:
-            # Поиск по имени, фамилии или телефону
-            search_filter = f"%{search}%"
-            query = query.filter(
-                (Patient.first_name.ilike(search_filter)) |
-                (Patient.last_name.ilike(search_filter)) |
-                (Patient.phone.ilike(search_filter))
-            )
+            # Поиск по ФИО или телефону с сортировкой по релевантности
+            query = apply_search(query, search)
 
         result = await self.db.execute(query.offset(skip).limit(limit))
         return result.scalars().all()
@@ -49,6 +87,7 @@ class PatientsRepository:
     async def update_patient(self, patient: Patient) -> Patient:
         """Обновить пациента"""
         await self.db.commit()
+        patient_cache.delete(patient.id)
         await self.db.refresh(patient)
         return patient
 
@@ -56,12 +95,66 @@ class PatientsRepository:
         """Удалить пациента (мягкое удаление)"""
         patient.is_active = "N"
         await self.db.commit()
+        patient_cache.delete(patient.id)
 
     async def search_patients_by_name(self, name: str, limit: int = 10) -> List[Patient]:
         """Поиск пациентов по имени"""
-        search_filter = f"%{name}%"
-        result = await self.db.execute(select(Patient).filter(
-            (Patient.first_name.ilike(search_filter)) |
-            (Patient.last_name.ilike(search_filter))
-        ).limit(limit))
+        result = await self.db.execute(apply_search(select(Patient), name).limit(limit))
         return result.scalars().all()
+
+    async def iter_dedupe_records(self, chunk_size: int = 10000) -> AsyncIterator[DedupeRecord]:
+        """Потоково получить проекцию активных пациентов для поиска дубликатов"""
+        query = (
+            select(
+                Patient.id, Patient.last_name, Patient.first_name, Patient.middle_name,
+                Patient.date_of_birth, Patient.phone
+            )
+            .where(Patient.is_active == "Y")
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self.db.stream(query)
+        async for row in result:
+            yield DedupeRecord(*row)
+
+    async def get_duplicate_candidates(self, patient: Patient, limit: int = 500) -> List[DedupeRecord]:
+        """Кандидаты в дубликаты пациента: тот же телефон или та же дата рождения"""
+        conditions = [Patient.date_of_birth == patient.date_of_birth]
+        digits = phone_digits_expr()
+        phone = local_phone(patient.phone)
+        if phone:
+            conditions.append(digits.like(f"%{phone}"))
+
+        query = (
+            select(
+                Patient.id, Patient.last_name, Patient.first_name, Patient.middle_name,
+                Patient.date_of_birth, Patient.phone
+            )
+            .where(Patient.is_active == "Y", Patient.id != patient.id, or_(*conditions))
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return [DedupeRecord(*row) for row in result]
+
+    async def lock_patients(self, patient_ids: List[int]) -> Dict[int, Patient]:
+        """Заблокировать строки пациентов (в порядке id, чтобы избежать взаимоблокировок)"""
+        query = (
+            select(Patient)
+            .where(Patient.id.in_(patient_ids))
+            .order_by(Patient.id)
+            .with_for_update()
+        )
+        result = await self.db.execute(query)
+        return {patient.id: patient for patient in result.scalars().all()}
+
+    async def reassign_references(self, from_patient_id: int, to_patient_id: int) -> Dict[str, int]:
+        """Перенести все связанные записи на другого пациента (по одному UPDATE на таблицу)"""
+        moved = {}
+        for name, model in PATIENT_REFERENCES.items():
+            result = await self.db.execute(
+                update(model)
+                .where(model.patient_id == from_patient_id)
+                .values(patient_id=to_patient_id)
+                .execution_options(synchronize_session=False)
+            )
+            moved[name] = result.rowcount
+        return moved
@@ -1,14 +1,23 @@
 """
 Patients Router (API Endpoints)
 """
-from fastapi import APIRouter, Depends, Query
+import io
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, Query, UploadFile, File, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from app.db.session import get_db
 from app.core.dependencies import get_current_user, require_role
 from .service import PatientsService
-from .schemas import Patient, PatientCreate, PatientUpdate, PatientSummary
+from .schemas import (
+    Patient, PatientCreate, PatientUpdate, PatientSummary, PatientDetail, PatientTypeahead,
+    PatientImportResult, PatientDuplicate, PatientMergeRequest, PatientMergeResult, TimelinePage, VitalsSeries
+)
+from .importer import IMPORT_FORMATS, detect_format
+from .export import MEDIA_TYPES, iter_export, gzip_stream, parse_columns
+from .dedupe import DEFAULT_THRESHOLD
 
 router = APIRouter()
 
@@ -38,15 +47,102 @@ async def get_active_patients(
     return await service.get_active_patients(skip, limit)
 
 
-@router.get("/{patient_id}", response_model=Patient)
+@router.get("/typeahead", response_model=List[PatientTypeahead])
+async def typeahead_patients(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Автодополнение пациентов по началу фамилии, имени или телефона (из памяти)"""
+    service = PatientsService(db)
+    return await service.typeahead(q, limit)
+
+
+@router.get("/export")
+async def export_patients(
+    file_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    columns: Optional[str] = Query(None, description="Колонки через запятую (по умолчанию все)"),
+    active_only: bool = Query(False),
+    gzip: bool = Query(False, description="Сжать выгрузку gzip на лету"),
+    current_user = Depends(require_role("admin"))
+):
+    """Потоковая выгрузка реестра пациентов (CSV/NDJSON)"""
+    try:
+        selected = parse_columns(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    body = iter_export(selected, file_format, active_only)
+    filename = f"patients-{date.today().isoformat()}.{file_format}"
+    media_type = MEDIA_TYPES[file_format]
+    if gzip:
+        body = gzip_stream(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/duplicates", response_model=List[PatientDuplicate])
+async def find_duplicate_patients(
+    patient_id: int = Query(..., description="Пациент, для которого ищутся дубликаты (весь реестр - manage.py find-duplicates)"),
+    threshold: float = Query(DEFAULT_THRESHOLD, ge=0, le=1),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(require_role("admin", "doctor"))
+):
+    """Найти вероятные дубликаты пациентов"""
+    service = PatientsService(db)
+    return await service.find_duplicates(patient_id, threshold, limit)
+
+
+@router.get("/{patient_id}", response_model=PatientDetail)
 async def get_patient(
     patient_id: int,
     db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    """Получить пациента по ID"""
+    """Получить пациента по ID (с балансом по счетам)"""
+    service = PatientsService(db)
+    return await service.get_patient_detail(patient_id)
+
+
+@router.get("/{patient_id}/timeline", response_model=TimelinePage)
+async def get_patient_timeline(
+    patient_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
+    types: Optional[str] = Query(
+        None, pattern="^(appointment|visit|prescription|surgery|billing)(,(appointment|visit|prescription|surgery|billing))*$",
+        description="Типы событий через запятую"
+    ),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """История пациента: записи, визиты, рецепты, операции и счета от новых к старым"""
+    service = PatientsService(db)
+    kinds = types.split(",") if types else None
+    return await service.get_timeline(patient_id, limit, cursor, kinds)
+
+
+@router.get("/{patient_id}/vitals", response_model=VitalsSeries)
+async def get_patient_vitals(
+    patient_id: int,
+    metric: str = Query(..., pattern="^(blood_pressure|heart_rate|temperature|weight|height|bmi)$"),
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    bucket: Optional[str] = Query(None, pattern="^(day|week)$", description="Без bucket - сырые точки или автоматическое прореживание"),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Динамика показателя пациента (массивы t и values по колонкам)"""
     service = PatientsService(db)
-    return await service.get_patient(patient_id)
+    return await service.get_vitals(patient_id, metric, date_from, date_to, bucket)
 
 
 @router.post("/", response_model=Patient)
@@ -60,6 +156,29 @@ async def create_patient(
     return await service.create_patient(patient_data)
 
 
+@router.post("/import", response_model=PatientImportResult)
+async def import_patients(
+    file: UploadFile = File(..., description="CSV с заголовком или NDJSON"),
+    file_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    dedupe: bool = Query(True, description="Пропускать пациентов с тем же телефоном и датой рождения"),
+    chunk_size: int = Query(1000, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(require_role("admin"))
+):
+    """Пакетный импорт пациентов (построчные ошибки в ответе)"""
+    file_format = file_format or detect_format(file.filename)
+    if file_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot detect file format, pass format=csv or format=ndjson"
+        )
+
+    # Файл читается порциями в пуле потоков (см. PatientImporter.run)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    service = PatientsService(db)
+    return await service.import_patients(stream, file_format, dedupe=dedupe, chunk_size=chunk_size)
+
+
 @router.put("/{patient_id}", response_model=Patient)
 async def update_patient(
     patient_id: int,
@@ -84,6 +203,18 @@ async def delete_patient(
     return {"message": "Patient deleted successfully"}
 
 
+@router.post("/{patient_id}/merge", response_model=PatientMergeResult)
+async def merge_patients(
+    patient_id: int,
+    merge_data: PatientMergeRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(require_role("admin"))
+):
+    """Слить дубликат с пациентом (записи, визиты, рецепты, операции и счета переносятся)"""
+    service = PatientsService(db)
+    return await service.merge_patients(patient_id, merge_data.duplicate_id)
+
+
 @router.get("/search/", response_model=List[PatientSummary])
 async def search_patients(
     query: str = Query(..., min_length=1, max_length=100),
@@ -3,8 +3,9 @@ Patients Schemas (Pydantic)
 """
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime, date
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from .models import Gender, BloodType
+from app.modules.billing.schemas import PatientBalance
 
 
 class PatientBase(BaseModel):
@@ -58,6 +59,11 @@ class Patient(PatientBase):
         from_attributes = True
 
 
+class PatientDetail(Patient):
+    """Пациент с балансом по счетам"""
+    balance: Optional[PatientBalance] = None
+
+
 class PatientSummary(BaseModel):
     """Краткая информация о пациенте"""
     id: int
@@ -78,3 +84,83 @@ class PatientSummary(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class PatientTypeahead(BaseModel):
+    """Пациент в подсказках автодополнения"""
+    id: int
+    last_name: str
+    first_name: str
+    middle_name: Optional[str] = None
+    phone: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class PatientImportError(BaseModel):
+    """Ошибка импорта одной строки файла"""
+    row: int
+    detail: str
+
+
+class PatientImportResult(BaseModel):
+    """Итог импорта пациентов"""
+    processed: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    duration_seconds: float = 0.0
+    errors: List[PatientImportError] = []  # Первые max_errors ошибок и дубликатов
+
+    @property
+    def rows_per_second(self) -> float:
+        """Скорость обработки"""
+        return self.processed / self.duration_seconds if self.duration_seconds else 0.0
+
+
+class PatientDuplicate(BaseModel):
+    """Пара вероятных дубликатов"""
+    patient_id: int
+    duplicate_id: int
+    score: float
+    reasons: List[str] = []
+
+
+class PatientMergeRequest(BaseModel):
+    """Запрос на слияние дубликата с пациентом"""
+    duplicate_id: int
+
+
+class PatientMergeResult(BaseModel):
+    """Итог слияния пациентов"""
+    patient: Patient
+    merged_id: int
+    moved: Dict[str, int]  # Сколько записей перенесено по таблицам
+
+
+class TimelineEvent(BaseModel):
+    """Событие в истории пациента"""
+    kind: str  # appointment, visit, prescription, surgery, billing
+    id: int
+    occurred_at: datetime
+    title: Optional[str] = None
+    status: Optional[str] = None
+    doctor_id: Optional[int] = None
+    details: Dict[str, Any] = {}
+
+
+class TimelinePage(BaseModel):
+    """Страница истории пациента"""
+    items: List[TimelineEvent]
+    next_cursor: Optional[str] = None  # Передать в cursor для следующей страницы
+
+
+class VitalsSeries(BaseModel):
+    """Ряд жизненных показателей в колоночном виде"""
+    patient_id: int
+    metric: str
+    bucket: Optional[str] = None  # None - сырые измерения, day/week - агрегаты за период
+    t: List[datetime]  # Время измерения или начало периода
+    # Колонка -> значения по t; для агрегатов - <колонка>_min, <колонка>_avg, <колонка>_max
+    values: Dict[str, List[Optional[float]]]
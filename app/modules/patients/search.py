@@ -0,0 +1,87 @@
+"""
+Patients Search (нечеткий поиск по pg_trgm)
+"""
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import Select, and_, or_, func, literal, literal_column
+from .models import Patient
+
+# Минимальная длина цифровой части, при которой токен считается телефоном
+PHONE_MIN_DIGITS = 3
+
+_TOKEN_RE = re.compile(r"[^\W_]+(?:[-'][^\W_]+)*", re.UNICODE)
+_NON_DIGIT_RE = re.compile(r"\D")
+
+
+def normalize_phone(value: Optional[str]) -> str:
+    """Оставить в телефоне только цифры"""
+    if not value:
+        return ""
+    return _NON_DIGIT_RE.sub("", value)
+
+
+def tokenize(query: str) -> Tuple[List[str], List[str]]:
+    """Разбить запрос на токены имени и цифровые токены телефона"""
+    names: List[str] = []
+    phones: List[str] = []
+
+    # Телефон часто вводят с пробелами и дефисами: "+7 999 123-45-67"
+    stripped = query.strip()
+    if stripped and re.fullmatch(r"[\d\s()+\-.]+", stripped):
+        digits = normalize_phone(stripped)
+        if len(digits) >= PHONE_MIN_DIGITS:
+            return names, [digits]
+
+    for token in _TOKEN_RE.findall(query.lower()):
+        if token.isdigit():
+            if len(token) >= PHONE_MIN_DIGITS:
+                phones.append(token)
+        else:
+            names.append(token)
+    return names, phones
+
+
+def phone_digits_expr():
+    """SQL-выражение телефона без форматирования (совпадает с индексом)"""
+    # Константы встраиваются в SQL, иначе планировщик не сопоставит выражение с индексом
+    empty = literal_column("''")
+    return func.regexp_replace(func.coalesce(Patient.phone, empty), literal_column(r"'\D'"), empty, literal_column("'g'"))
+
+
+def _escape_like(value: str) -> str:
+    """Экранировать спецсимволы LIKE"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def apply_search(query: Select, search: str) -> Select:
+    """Добавить к запросу фильтр и сортировку по релевантности"""
+    names, phones = tokenize(search)
+    if not names and not phones:
+        return query
+
+    name_columns = (Patient.last_name, Patient.first_name, Patient.middle_name)
+    conditions = []
+    rank = literal(0.0)
+
+    # Каждый токен должен совпасть хотя бы с одной частью имени:
+    # "Иванов Петр" найдет пациента независимо от порядка слов
+    for token in names:
+        pattern = f"%{_escape_like(token)}%"
+        conditions.append(or_(*(
+            or_(column.ilike(pattern), column.op("%")(token))
+            for column in name_columns
+        )))
+        rank = rank + func.greatest(*(
+            func.coalesce(func.similarity(column, token), 0) for column in name_columns
+        ))
+
+    digits = phone_digits_expr()
+    for token in phones:
+        conditions.append(digits.like(f"%{token}%"))
+        rank = rank + func.similarity(digits, token)
+
+    return (
+        query
+        .where(and_(*conditions))
+        .order_by(rank.desc(), Patient.last_name, Patient.first_name, Patient.id)
+    )
@@ -2,11 +2,23 @@
 Patients Service (Business Logic Layer)
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, TextIO
 from fastapi import HTTPException, status
-from .repository import PatientsRepository
+from .repository import PatientsRepository, MERGE_FILL_FIELDS
 from .models import Patient
-from .schemas import PatientCreate, PatientUpdate
+from .schemas import (
+    PatientCreate, PatientUpdate, PatientDetail, PatientTypeahead, PatientImportResult,
+    PatientDuplicate, PatientMergeResult, TimelinePage, VitalsSeries
+)
+from .timeline import PatientTimeline
+from .vitals import PatientVitals
+from .cache import patient_cache
+from .importer import PatientImporter, ProgressCallback, iter_rows
+from .dedupe import DedupeRecord, DEFAULT_THRESHOLD, match_patient
+from .typeahead import patient_index
+from app.modules.billing.repository import BillingRepository
+from app.modules.billing.schemas import PatientBalance
 
 
 class PatientsService:
@@ -26,6 +38,59 @@ class PatientsService:
             )
         return patient
 
+    async def get_patient_detail(self, patient_id: int) -> PatientDetail:
+        """Получить пациента с балансом по счетам"""
+        patient = await self.repository.get_cached(patient_id)
+        if not patient:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Patient not found"
+            )
+        balance = await BillingRepository(self.db).get_balance(patient_id)
+
+        detail = PatientDetail.from_orm(patient)
+        detail.balance = PatientBalance.from_orm(balance) if balance else PatientBalance(patient_id=patient_id)
+        return detail
+
+    async def get_timeline(
+        self, patient_id: int, limit: int = 50, cursor: Optional[str] = None, kinds: Optional[List[str]] = None
+    ) -> TimelinePage:
+        """Получить историю пациента (страница по курсору)"""
+        if not await self.repository.exists(patient_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Patient not found"
+            )
+        try:
+            return await PatientTimeline(self.db).get_page(patient_id, limit, cursor, kinds)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+    async def get_vitals(
+        self,
+        patient_id: int,
+        metric: str,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        bucket: Optional[str] = None,
+    ) -> VitalsSeries:
+        """Получить ряд жизненных показателей пациента"""
+        if not await self.repository.exists(patient_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Patient not found"
+            )
+        try:
+            return await PatientVitals(self.db).get_series(patient_id, metric, date_from, date_to, bucket)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
     async def get_patients(self, skip: int = 0, limit: int = 100, search: Optional[str] = None) -> List[Patient]:
         """Получить список пациентов"""
         return await self.repository.get_patients(skip, limit, search)
@@ -61,7 +126,9 @@ class PatientsService:
             emergency_contact_phone=patient_data.emergency_contact_phone
         )
 
-        return await self.repository.create_patient(patient)
+        patient = await self.repository.create_patient(patient)
+        patient_index.upsert(patient)
+        return patient
 
     async def update_patient(self, patient_id: int, patient_data: PatientUpdate) -> Patient:
         """Обновить пациента"""
@@ -77,7 +144,9 @@ class PatientsService:
         for field, value in update_data.items():
             setattr(patient, field, value)
 
-        return await self.repository.update_patient(patient)
+        patient = await self.repository.update_patient(patient)
+        patient_index.upsert(patient)
+        return patient
 
     async def delete_patient(self, patient_id: int) -> None:
         """Удалить пациента (мягкое удаление)"""
@@ -89,7 +158,97 @@ class PatientsService:
             )
 
         await self.repository.delete_patient(patient)
+        patient_index.remove(patient_id)
 
     async def search_patients(self, query: str, limit: int = 10) -> List[Patient]:
         """Поиск пациентов"""
         return await self.repository.search_patients_by_name(query, limit)
+
+    async def typeahead(self, query: str, limit: int = 10) -> List[PatientTypeahead]:
+        """Подсказки пациентов по префиксу ФИО или телефона"""
+        if patient_index.ready:
+            return [PatientTypeahead(**record._asdict()) for record in patient_index.search(query, limit)]
+
+        # Индекс еще строится - ищем в БД
+        patients = await self.repository.search_patients_by_name(query, limit)
+        return [PatientTypeahead.from_orm(patient) for patient in patients]
+
+    async def import_patients(
+        self,
+        stream: TextIO,
+        file_format: str,
+        dedupe: bool = True,
+        chunk_size: int = 1000,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> PatientImportResult:
+        """Импортировать пациентов из CSV/NDJSON потоком"""
+        importer = PatientImporter(self.db, chunk_size=chunk_size, dedupe=dedupe, on_progress=on_progress)
+        return await importer.run(iter_rows(stream, file_format))
+
+    async def find_duplicates(
+        self, patient_id: int, threshold: float = DEFAULT_THRESHOLD, limit: int = 100
+    ) -> List[PatientDuplicate]:
+        """Найти вероятные дубликаты пациента (весь реестр - manage.py find-duplicates)"""
+        patient = await self.get_patient(patient_id)
+        record = DedupeRecord(
+            patient.id, patient.last_name, patient.first_name, patient.middle_name,
+            patient.date_of_birth, patient.phone
+        )
+        candidates = await self.repository.get_duplicate_candidates(patient)
+        matches = match_patient(record, candidates, threshold)
+
+        return [
+            PatientDuplicate(
+                patient_id=match.patient_id, duplicate_id=match.duplicate_id,
+                score=match.score, reasons=list(match.reasons)
+            )
+            for match in matches[:limit]
+        ]
+
+    async def merge_patients(self, patient_id: int, duplicate_id: int) -> PatientMergeResult:
+        """Слить дубликат с пациентом в одной транзакции"""
+        if patient_id == duplicate_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot merge patient with itself"
+            )
+
+        locked = await self.repository.lock_patients([patient_id, duplicate_id])
+        patient, duplicate = locked.get(patient_id), locked.get(duplicate_id)
+        if not patient or not duplicate:
+            await self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Patient not found"
+            )
+        if patient.is_active != "Y":
+            await self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Patient is already merged or deleted"
+            )
+        if duplicate.is_active != "Y":
+            await self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Duplicate patient is already merged or deleted"
+            )
+
+        # Переносим связанные записи одним UPDATE на таблицу
+        moved = await self.repository.reassign_references(duplicate_id, patient_id)
+
+        # Заполняем пустые поля карты данными дубликата
+        for field in MERGE_FILL_FIELDS:
+            if not getattr(patient, field) and getattr(duplicate, field):
+                setattr(patient, field, getattr(duplicate, field))
+        duplicate.is_active = "N"
+
+        await BillingRepository(self.db).refresh_balances([patient_id, duplicate_id])
+        await self.db.commit()
+        await self.db.refresh(patient)
+
+        patient_cache.delete(patient_id)
+        patient_cache.delete(duplicate_id)
+        patient_index.remove(duplicate_id)
+        patient_index.upsert(patient)
+        return PatientMergeResult(patient=patient, merged_id=duplicate_id, moved=moved)
@@ -0,0 +1,11 @@
+"""
+Patients Tasks (фоновые задачи)
+"""
+from app.db.session import AsyncSessionLocal
+from .typeahead import rebuild_index
+
+
+async def rebuild_typeahead_job() -> None:
+    """Перестроить индекс автодополнения в отдельной сессии"""
+    async with AsyncSessionLocal() as db:
+        await rebuild_index(db)
@@ -0,0 +1,195 @@
+"""
+Patients Timeline (история пациента одной лентой событий)
+"""
+import base64
+import enum
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import String, select, union_all, literal_column, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.modules.appointments.models import Appointment
+from app.modules.billing.models import Billing
+from app.modules.operations.models import Surgery
+from app.modules.prescriptions.models import Prescription
+from app.modules.visits.models import Visit
+from .schemas import TimelineEvent, TimelinePage
+
+# Тип события -> (модель, колонка даты события)
+TIMELINE_SOURCES = {
+    "appointment": (Appointment, Appointment.scheduled_date),
+    "billing": (Billing, Billing.created_at),
+    "prescription": (Prescription, Prescription.prescription_date),
+    "surgery": (Surgery, Surgery.operation_date),
+    "visit": (Visit, Visit.visit_date),
+}
+
+# Связанные данные, подгружаемые для событий страницы (по одному запросу на связь)
+TIMELINE_RELATIONS = {
+    "prescription": ("medications",),
+    "visit": ("diagnoses", "treatments", "vital_signs"),
+}
+
+Cursor = Tuple[datetime, str, int]
+
+
+def encode_cursor(occurred_at: datetime, kind: str, item_id: int) -> str:
+    """Закодировать позицию в ленте"""
+    raw = f"{occurred_at.isoformat()}|{kind}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Разобрать курсор (ValueError, если он поврежден)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        occurred_at, kind, item_id = raw.split("|")
+        if kind not in TIMELINE_SOURCES:
+            raise ValueError(kind)
+        return datetime.fromisoformat(occurred_at), kind, int(item_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _before_cursor(kind: str, date_column, id_column, cursor: Cursor):
+    """Условие "раньше курсора" в порядке (дата, тип, id) по убыванию для одной ветки"""
+    cursor_at, cursor_kind, cursor_id = cursor
+    if kind < cursor_kind:
+        return date_column <= cursor_at
+    if kind > cursor_kind:
+        return date_column < cursor_at
+    return or_(date_column < cursor_at, and_(date_column == cursor_at, id_column < cursor_id))
+
+
+def build_timeline_query(
+    patient_id: int, limit: int, cursor: Optional[Cursor] = None, kinds: Optional[Sequence[str]] = None
+):
+    """UNION ALL по всем источникам; каждая ветка сама ограничена limit (индекс patient_id + дата)"""
+    branches = []
+    for kind, (model, date_column) in TIMELINE_SOURCES.items():
+        if kinds and kind not in kinds:
+            continue
+        branch = select(
+            literal_column(f"'{kind}'", String).label("kind"),
+            model.id.label("id"),
+            date_column.label("occurred_at"),
+        ).where(model.patient_id == patient_id, date_column.isnot(None))
+        if cursor:
+            branch = branch.where(_before_cursor(kind, date_column, model.id, cursor))
+        branches.append(branch.order_by(date_column.desc(), model.id.desc()).limit(limit).subquery().select())
+
+    events = union_all(*branches).subquery()
+    return (
+        select(events.c.kind, events.c.id, events.c.occurred_at)
+        .order_by(events.c.occurred_at.desc(), events.c.kind.desc(), events.c.id.desc())
+        .limit(limit)
+    )
+
+
+def _value(value):
+    """Значение enum для ответа"""
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def describe(kind: str, item) -> Tuple[Optional[str], Optional[str], Optional[int], dict]:
+    """Заголовок, статус, врач и детали события"""
+    if kind == "appointment":
+        return item.reason or _value(item.appointment_type), _value(item.status), item.doctor_id, {
+            "appointment_type": _value(item.appointment_type),
+            "duration_minutes": item.duration_minutes,
+            "symptoms": item.symptoms,
+            "notes": item.notes,
+        }
+    if kind == "visit":
+        return item.chief_complaint, _value(item.status), item.doctor_id, {
+            "appointment_id": item.appointment_id,
+            "assessment": item.assessment,
+            "plan": item.plan,
+            "diagnoses": [
+                {"icd_code": d.icd_code, "diagnosis_name": d.diagnosis_name, "is_primary": d.is_primary == "Y"}
+                for d in item.diagnoses
+            ],
+            "treatments": [
+                {"treatment_name": t.treatment_name, "dosage": t.dosage,
+                 "frequency": t.frequency, "duration_days": t.duration_days}
+                for t in item.treatments
+            ],
+            "vital_signs": [
+                {"blood_pressure_systolic": v.blood_pressure_systolic,
+                 "blood_pressure_diastolic": v.blood_pressure_diastolic,
+                 "heart_rate": v.heart_rate, "temperature": v.temperature,
+                 "weight": v.weight, "height": v.height, "bmi": v.bmi, "measured_at": v.measured_at}
+                for v in item.vital_signs
+            ],
+        }
+    if kind == "prescription":
+        return None, _value(item.status), item.doctor_id, {
+            "visit_id": item.visit_id,
+            "notes": item.notes,
+            "follow_up_date": item.follow_up_date,
+            "medications": [
+                {"medication_name": m.medication_name, "dosage": m.dosage,
+                 "frequency": m.frequency, "duration_days": m.duration_days}
+                for m in item.medications
+            ],
+        }
+    if kind == "surgery":
+        return item.operation_name, item.outcome, item.surgeon_id, {
+            "start_time": item.start_time,
+            "end_time": item.end_time,
+            "complications": item.complications,
+        }
+    return item.description, _value(item.status), None, {
+        "amount": item.amount,
+        "payment_date": item.payment_date,
+    }
+
+
+class PatientTimeline:
+    """Сборка ленты: 1 запрос на страницу + по одному запросу на тип и связь"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_page(
+        self,
+        patient_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        kinds: Optional[Sequence[str]] = None,
+    ) -> TimelinePage:
+        """Страница событий от новых к старым"""
+        position = decode_cursor(cursor) if cursor else None
+        result = await self.db.execute(build_timeline_query(patient_id, limit + 1, position, kinds))
+        rows = result.all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        ids_by_kind: Dict[str, List[int]] = {}
+        for row in rows:
+            ids_by_kind.setdefault(row.kind, []).append(row.id)
+
+        items = {}
+        for kind, ids in ids_by_kind.items():
+            model, _ = TIMELINE_SOURCES[kind]
+            options = [selectinload(getattr(model, name)) for name in TIMELINE_RELATIONS.get(kind, ())]
+            query = select(model).where(model.id.in_(ids)).options(*options)
+            for item in (await self.db.execute(query)).scalars().all():
+                items[(kind, item.id)] = item
+
+        events = []
+        for row in rows:
+            item = items.get((row.kind, row.id))
+            if item is None:
+                continue
+            title, item_status, doctor_id, details = describe(row.kind, item)
+            events.append(TimelineEvent(
+                kind=row.kind, id=row.id, occurred_at=row.occurred_at,
+                title=title, status=item_status, doctor_id=doctor_id, details=details
+            ))
+
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            next_cursor = encode_cursor(last.occurred_at, last.kind, last.id)
+        return TimelinePage(items=events, next_cursor=next_cursor)
@@ -0,0 +1,192 @@
+"""
+Patients Typeahead (префиксный индекс для автодополнения в регистратуре)
+"""
+import gc
+import logging
+import sys
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.prefix_index import PrefixIndex
+from .models import Patient
+from .search import normalize_phone, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Сколько позиций индекса просматривать на один запрос (ограничивает задержку для коротких префиксов)
+MAX_SCAN = 5000
+
+# Номер без кода страны (последние 10 цифр) тоже индексируется
+LOCAL_PHONE_DIGITS = 10
+
+
+class TypeaheadRecord(NamedTuple):
+    """Облегченная проекция пациента"""
+    id: int
+    last_name: str
+    first_name: str
+    middle_name: Optional[str]
+    phone: Optional[str]
+
+
+def normalize_name(value: Optional[str]) -> str:
+    """Нормализовать часть имени для индекса"""
+    if not value:
+        return ""
+    return value.strip().lower().replace("ё", "е")
+
+
+def record_keys(record: TypeaheadRecord) -> List[str]:
+    """Ключи индекса для пациента: фамилия, имя и цифры телефона"""
+    keys = [normalize_name(record.last_name), normalize_name(record.first_name)]
+    digits = normalize_phone(record.phone)
+    if digits:
+        keys.append(digits)
+        if len(digits) > LOCAL_PHONE_DIGITS:
+            keys.append(digits[-LOCAL_PHONE_DIGITS:])
+    return [key for key in keys if key]
+
+
+class PatientTypeaheadIndex:
+    """Индекс активных пациентов в памяти процесса"""
+
+    def __init__(self):
+        self._index = PrefixIndex()
+        self._records: Dict[int, TypeaheadRecord] = {}
+        # Изменения, пришедшие во время перестроения (id -> пациент или None при удалении)
+        self._pending: Optional[Dict[int, Optional[Patient]]] = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def begin_rebuild(self) -> None:
+        """Начать запоминать изменения, чтобы применить их поверх нового снимка"""
+        self._pending = {}
+
+    def cancel_rebuild(self) -> None:
+        """Прекратить запоминать изменения (перестроение не удалось)"""
+        self._pending = None
+
+    def build(self, records: Iterable[TypeaheadRecord]) -> None:
+        """Построить индекс заново"""
+        index = PrefixIndex()
+        stored: Dict[int, TypeaheadRecord] = {}
+        pairs = []
+        for record in records:
+            record = _intern(record)
+            stored[record.id] = record
+            pairs.extend((key, record.id) for key in record_keys(record))
+        index.build(pairs)
+
+        # Подмена одной операцией: запросы не видят полупостроенный индекс
+        first_build = not self.ready
+        self._index, self._records = index, stored
+        self.ready = True
+        # Миллионы долгоживущих объектов не должны обходиться полной сборкой мусора.
+        # Замораживаем один раз при старте: повторная заморозка при каждом перестроении
+        # навсегда оставляла бы в памяти накопившийся к тому моменту мусор
+        if first_build:
+            gc.freeze()
+
+        pending, self._pending = self._pending, None
+        for patient_id, patient in (pending or {}).items():
+            if patient is None:
+                self._discard(patient_id)
+            else:
+                self.upsert(patient)
+
+    def upsert(self, patient: Patient) -> None:
+        """Добавить или обновить пациента"""
+        if self._pending is not None:
+            self._pending[patient.id] = patient
+        self._discard(patient.id)
+        if patient.is_active != "Y":
+            return
+        record = _intern(TypeaheadRecord(
+            patient.id, patient.last_name, patient.first_name, patient.middle_name, patient.phone
+        ))
+        self._records[record.id] = record
+        for key in record_keys(record):
+            self._index.add(key, record.id)
+
+    def remove(self, patient_id: int) -> None:
+        """Убрать пациента из индекса"""
+        if self._pending is not None:
+            self._pending[patient_id] = None
+        self._discard(patient_id)
+
+    def _discard(self, patient_id: int) -> None:
+        """Убрать записи пациента из текущего индекса (без учета перестроения)"""
+        record = self._records.pop(patient_id, None)
+        if record is None:
+            return
+        for key in record_keys(record):
+            self._index.remove(key, patient_id)
+
+    def search(self, query: str, limit: int = 10) -> List[TypeaheadRecord]:
+        """Найти пациентов, у которых все слова запроса являются префиксами частей имени/телефона"""
+        names, phones = tokenize(query)
+        terms = [normalize_name(name) for name in names] + phones
+        if not terms:
+            return []
+
+        # Ищем по самому избирательному слову, остальные проверяем по записи
+        terms.sort(key=self._index.count)
+        lead = terms[0]
+        rest_names = [term for term in terms[1:] if not term.isdigit()]
+        rest_phones = [term for term in terms[1:] if term.isdigit()]
+
+        def accept(patient_id: int) -> bool:
+            record = self._records[patient_id]
+            if rest_names:
+                parts = (normalize_name(record.last_name), normalize_name(record.first_name))
+                if not all(any(part.startswith(term) for part in parts) for term in rest_names):
+                    return False
+            if rest_phones:
+                digits = normalize_phone(record.phone)
+                if not all(digits.startswith(term) or digits[-LOCAL_PHONE_DIGITS:].startswith(term) for term in rest_phones):
+                    return False
+            return True
+
+        ids = self._index.search(lead, limit, accept=accept if len(terms) > 1 else None, max_scan=MAX_SCAN)
+        return [self._records[patient_id] for patient_id in ids]
+
+
+def _intern(record: TypeaheadRecord) -> TypeaheadRecord:
+    """Одинаковые фамилии и имена хранятся в одном экземпляре строки"""
+    return record._replace(
+        last_name=sys.intern(record.last_name),
+        first_name=sys.intern(record.first_name),
+        middle_name=sys.intern(record.middle_name) if record.middle_name else None,
+    )
+
+
+async def load_records(db: AsyncSession, chunk_size: int = 10000) -> List[TypeaheadRecord]:
+    """Загрузить проекцию активных пациентов потоково"""
+    query = (
+        select(Patient.id, Patient.last_name, Patient.first_name, Patient.middle_name, Patient.phone)
+        .where(Patient.is_active == "Y")
+        .execution_options(yield_per=chunk_size)
+    )
+    result = await db.stream(query)
+    return [TypeaheadRecord(*row) async for row in result]
+
+
+async def rebuild_index(db: AsyncSession) -> None:
+    """Перестроить индекс из базы данных"""
+    started = time.monotonic()
+    patient_index.begin_rebuild()
+    try:
+        records = await load_records(db)
+    except Exception:
+        patient_index.cancel_rebuild()
+        raise
+    patient_index.build(records)
+    logger.info(
+        "Typeahead index built: %s patients in %.2fs", len(patient_index), time.monotonic() - started
+    )
+
+
+patient_index = PatientTypeaheadIndex()
@@ -0,0 +1,131 @@
+"""
+Patients Vitals (история жизненных показателей пациента как временной ряд)
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Float, select, func, literal_column, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.modules.visits.models import Visit, VitalSigns
+from .schemas import VitalsSeries
+
+# Показатель -> колонки vital_signs
+VITAL_METRICS: Dict[str, Tuple[str, ...]] = {
+    "blood_pressure": ("blood_pressure_systolic", "blood_pressure_diastolic"),
+    "heart_rate": ("heart_rate",),
+    "temperature": ("temperature",),
+    "weight": ("weight",),
+    "height": ("height",),
+    "bmi": ("bmi",),
+}
+
+# Колонки, включенные в покрывающий индекс vital_signs (visit_id, measured_at)
+VITAL_COLUMNS = tuple(column for columns in VITAL_METRICS.values() for column in columns)
+
+BUCKETS = ("day", "week")
+
+# Больше точек на графике не нужно: длинная история прореживается до дней, затем недель
+MAX_POINTS = 500
+
+
+def _base_query(columns, patient_id: int, date_from: Optional[datetime], date_to: Optional[datetime]):
+    """vital_signs JOIN visits по пациенту, период и хотя бы одно заполненное значение"""
+    query = (
+        select(*columns)
+        .select_from(VitalSigns)
+        .join(Visit, Visit.id == VitalSigns.visit_id)
+        .where(Visit.patient_id == patient_id, VitalSigns.measured_at.isnot(None))
+    )
+    if date_from:
+        query = query.where(VitalSigns.measured_at >= date_from)
+    if date_to:
+        query = query.where(VitalSigns.measured_at < date_to)
+    return query
+
+
+def build_raw_query(
+    metric: str, patient_id: int, date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None, limit: int = MAX_POINTS
+):
+    """Сырые измерения, от новых к старым"""
+    metric_columns = [getattr(VitalSigns, name) for name in VITAL_METRICS[metric]]
+    return (
+        _base_query([VitalSigns.measured_at.label("ts"), *metric_columns], patient_id, date_from, date_to)
+        .where(or_(*[column.isnot(None) for column in metric_columns]))
+        .order_by(VitalSigns.measured_at.desc(), VitalSigns.id.desc())
+        .limit(limit)
+    )
+
+
+def build_bucket_query(
+    metric: str, bucket: str, patient_id: int, date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None, limit: int = MAX_POINTS
+):
+    """min/avg/max по дням или неделям (date_trunc), от новых к старым"""
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket: {bucket}")
+    metric_columns = [getattr(VitalSigns, name) for name in VITAL_METRICS[metric]]
+    # Единица усечения - литерал, чтобы выражение в SELECT и GROUP BY совпадало
+    period = func.date_trunc(literal_column(f"'{bucket}'"), VitalSigns.measured_at)
+    aggregates = []
+    for column in metric_columns:
+        aggregates += [
+            func.min(column).label(f"{column.key}_min"),
+            func.avg(column).cast(Float).label(f"{column.key}_avg"),
+            func.max(column).label(f"{column.key}_max"),
+        ]
+    return (
+        _base_query([period.label("ts"), *aggregates], patient_id, date_from, date_to)
+        .where(or_(*[column.isnot(None) for column in metric_columns]))
+        .group_by(period)
+        .order_by(period.desc())
+        .limit(limit)
+    )
+
+
+def to_columns(rows, names: List[str]) -> Dict[str, List]:
+    """Строки -> массивы по колонкам"""
+    return {name: [row._mapping[name] for row in rows] for name in names}
+
+
+class PatientVitals:
+    """Временные ряды показателей: сырые точки или агрегаты, если точек слишком много"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_series(
+        self,
+        patient_id: int,
+        metric: str,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        bucket: Optional[str] = None,
+    ) -> VitalsSeries:
+        """Ряд показателя; bucket=None - сырые точки с автоматическим прореживанием"""
+        if metric not in VITAL_METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+
+        candidates = [bucket] if bucket else [None, *BUCKETS]
+        for index, candidate in enumerate(candidates):
+            last = index == len(candidates) - 1
+            # Запрашиваем на одну точку больше, чтобы понять, что ряд надо прореживать
+            limit = MAX_POINTS if last else MAX_POINTS + 1
+            if candidate is None:
+                query = build_raw_query(metric, patient_id, date_from, date_to, limit)
+            else:
+                query = build_bucket_query(metric, candidate, patient_id, date_from, date_to, limit)
+            result = await self.db.execute(query)
+            rows = result.all()
+            if len(rows) <= MAX_POINTS or last:
+                break
+
+        # Выбираются последние точки, в ответе - по возрастанию времени
+        rows.reverse()
+        names = [name for name in result.keys() if name != "ts"]
+        return VitalsSeries(
+            patient_id=patient_id,
+            metric=metric,
+            bucket=candidate,
+            t=[row.ts for row in rows],
+            values=to_columns(rows, names),
+        )
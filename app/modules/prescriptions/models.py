@@ -2,7 +2,7 @@
 Prescriptions Models
 """
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import String, DateTime, Text, ForeignKey, Enum, Index
 from sqlalchemy.sql import func
 from app.db.session import Base
 import enum
@@ -21,7 +21,7 @@ class Medication(Base):
     __tablename__ = "medications"
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    prescription_id: Mapped[int] = mapped_column(ForeignKey("prescriptions.id"), nullable=False)
+    prescription_id: Mapped[int] = mapped_column(ForeignKey("prescriptions.id"), nullable=False, index=True)
 
     # Информация о препарате
     medication_name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -44,6 +44,10 @@ class Medication(Base):
 class Prescription(Base):
     """Модель рецепта"""
     __tablename__ = "prescriptions"
+    __table_args__ = (
+        # История пациента (лента событий)
+        Index("ix_prescriptions_patient_prescription_date", "patient_id", "prescription_date"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
@@ -5,6 +5,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
 from fastapi import HTTPException, status
+from app.db.references import Reference, validate_references, foreign_key_errors
+from app.modules.auth.models import User
+from app.modules.patients.models import Patient
 from .repository import PrescriptionsRepository
 from .models import Prescription, Medication, PrescriptionStatus
 from .schemas import PrescriptionCreate, PrescriptionUpdate, MedicationBase
@@ -32,27 +35,14 @@ class PrescriptionsService:
 
     async def create_prescription(self, prescription_data: PrescriptionCreate, created_by: int) -> Prescription:
         """Создать новый рецепт"""
-        # Проверяем, что пациент существует
-        from app.modules.patients.models import Patient
-        result = await self.db.execute(select(Patient).filter(Patient.id == prescription_data.patient_id))
-        patient = result.scalar_one_or_none()
-        if not patient:
-            raise HTTPException(status_code=404, detail="Patient not found")
-
-        # Проверяем, что врач существует
-        from app.modules.auth.models import User
-        result = await self.db.execute(select(User).filter(User.id == prescription_data.doctor_id))
-        doctor = result.scalar_one_or_none()
-        if not doctor:
-            raise HTTPException(status_code=404, detail="Doctor not found")
-
-        # Проверяем визит, если указан
-        if prescription_data.visit_id:
-            from app.modules.visits.models import Visit
-            result = await self.db.execute(select(Visit).filter(Visit.id == prescription_data.visit_id))
-            visit = result.scalar_one_or_none()
-            if not visit:
-                raise HTTPException(status_code=404, detail="Visit not found")
+        # Проверяем пациента, врача и визит (если указан) одним запросом
+        from app.modules.visits.models import Visit
+        await validate_references(
+            self.db,
+            Reference(Patient, prescription_data.patient_id, "Patient"),
+            Reference(User, prescription_data.doctor_id, "Doctor"),
+            Reference(Visit, prescription_data.visit_id, "Visit"),
+        )
 
         # Создаем рецепт
         prescription = Prescription(
@@ -64,7 +54,8 @@ class PrescriptionsService:
             created_by=created_by
         )
 
-        prescription = await self.repository.create_prescription(prescription)
+        async with foreign_key_errors(self.db):
+            prescription = await self.repository.create_prescription(prescription)
 
         # Добавляем лекарства
         for medication_data in prescription_data.medications:
@@ -111,15 +102,14 @@ class PrescriptionsService:
 
     async def add_medication(self, prescription_id: int, medication_data: MedicationBase) -> Medication:
         """Добавить лекарство к рецепту"""
-        prescription = await self.repository.get_prescription_by_id(prescription_id)
-        if not prescription:
-            raise HTTPException(status_code=404, detail="Prescription not found")
+        await validate_references(self.db, Reference(Prescription, prescription_id, "Prescription"))
 
         medication = Medication(
             prescription_id=prescription_id,
             **medication_data.dict()
         )
-        return await self.repository.add_medication(medication)
+        async with foreign_key_errors(self.db):
+            return await self.repository.add_medication(medication)
 
     async def update_medication(self, medication_id: int, medication_data: MedicationBase) -> Medication:
         """Обновить лекарство"""
@@ -0,0 +1,39 @@
+"""
+Schedules Models
+"""
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, DateTime, Date, Time, ForeignKey, Index, CheckConstraint
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+
+class DoctorSchedule(Base):
+    """Правило расписания врача: недельный шаблон (weekday) или исключение на дату (schedule_date)"""
+    __tablename__ = "doctor_schedules"
+    __table_args__ = (
+        CheckConstraint("(weekday IS NULL) <> (schedule_date IS NULL)", name="ck_doctor_schedules_weekday_or_date"),
+        # Пересборка расписания врача по одному дню недели или одной дате
+        Index("ix_doctor_schedules_doctor_weekday", "doctor_id", "weekday"),
+        Index("ix_doctor_schedules_doctor_date", "doctor_id", "schedule_date"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    doctor_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+
+    # Когда действует правило: день недели (0 - понедельник) или конкретная дата
+    weekday: Mapped[int | None] = mapped_column(nullable=True)
+    schedule_date: Mapped[Date | None] = mapped_column(Date, nullable=True)
+
+    # Интервал в часовом поясе клиники; пустой интервал у исключения - весь день
+    start_time: Mapped[Time | None] = mapped_column(Time, nullable=True)
+    end_time: Mapped[Time | None] = mapped_column(Time, nullable=True)
+    is_available: Mapped[str] = mapped_column(String(1), default="Y", nullable=False)  # Y - прием, N - перерыв/выходной
+    note: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), onupdate=func.now())
+
+    doctor = relationship("User", backref="schedule_rules")
+
+    def __repr__(self):
+        return f"<DoctorSchedule(id={self.id}, doctor_id={self.doctor_id}, weekday={self.weekday}, date={self.schedule_date})>"
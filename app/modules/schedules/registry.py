@@ -0,0 +1,263 @@
+"""
+Schedules Registry (скомпилированное расписание врачей в памяти)
+
+День врача - битовая маска из 288 пятиминутных слотов (int), бит i - время
+[i*5, i*5 + 5) минут по часам клиники. Маски недельного шаблона и исключений
+на даты собираются один раз; проверка приема - одна операция над маской дня.
+При изменении правила пересобирается только его день недели или дата.
+"""
+import logging
+import time as timer
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from .models import DoctorSchedule
+
+logger = logging.getLogger(__name__)
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+
+Interval = Tuple[datetime, datetime]
+
+
+class ScheduleRule(NamedTuple):
+    """Правило расписания (строка doctor_schedules)"""
+    doctor_id: int
+    weekday: Optional[int]
+    schedule_date: Optional[date]
+    start_time: Optional[time]
+    end_time: Optional[time]
+    is_available: str
+
+
+def range_mask(first: int, last: int) -> int:
+    """Маска слотов [first, last)"""
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def minutes_of(value: time) -> int:
+    """Минуты от начала дня"""
+    return value.hour * 60 + value.minute + (1 if value.second or value.microsecond else 0)
+
+
+def time_mask(start_time: Optional[time], end_time: Optional[time]) -> int:
+    """Слоты интервала времени (неполные слоты на краях включаются); пустой интервал - весь день"""
+    if start_time is None or end_time is None:
+        return FULL_DAY
+    first = start_time.hour * 60 // SLOT_MINUTES + start_time.minute // SLOT_MINUTES
+    return range_mask(first, -(-minutes_of(end_time) // SLOT_MINUTES))
+
+
+def apply_rules(base: int, rules: Iterable[ScheduleRule]) -> int:
+    """Интервалы приема заменяют base, затем вычитаются перерывы"""
+    available = blocked = 0
+    has_available = False
+    for rule in rules:
+        mask = time_mask(rule.start_time, rule.end_time)
+        if rule.is_available == "Y":
+            available |= mask
+            has_available = True
+        else:
+            blocked |= mask
+    return (available if has_available else base) & ~blocked
+
+
+def mask_runs(mask: int) -> Iterator[Tuple[int, int]]:
+    """Непрерывные отрезки слотов [first, last) маски по порядку"""
+    while mask:
+        first = (mask & -mask).bit_length() - 1
+        shifted = mask >> first
+        length = ((shifted + 1) & ~shifted).bit_length() - 1
+        yield first, first + length
+        mask &= ~range_mask(first, first + length)
+
+
+def working_hours_weekly() -> List[int]:
+    """Недельный шаблон клиники из настроек (для врачей без своего шаблона)"""
+    day = time_mask(settings.working_hours_start, settings.working_hours_end)
+    return [day if weekday in settings.working_days else 0 for weekday in range(7)]
+
+
+class CompiledSchedule:
+    """Маски дней врача: 7 масок недельного шаблона и маски дат с исключениями"""
+
+    __slots__ = ("weekly", "dates", "_default", "_template", "_exceptions")
+
+    def __init__(self, default_weekly: Sequence[int]):
+        self._default = list(default_weekly)
+        self._template: Dict[int, List[ScheduleRule]] = {}
+        self._exceptions: Dict[date, List[ScheduleRule]] = {}
+        self.weekly: List[int] = list(default_weekly)
+        self.dates: Dict[date, int] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._template or self._exceptions)
+
+    def mask(self, day: date) -> int:
+        """Маска дня: исключение на дату или недельный шаблон"""
+        mask = self.dates.get(day)
+        return self.weekly[day.weekday()] if mask is None else mask
+
+    def set_weekday(self, weekday: int, rules: List[ScheduleRule]) -> None:
+        """Заменить правила дня недели и пересобрать его маску (и маски дат этого дня недели)"""
+        had_template = bool(self._template)
+        if rules:
+            self._template[weekday] = rules
+        else:
+            self._template.pop(weekday, None)
+        # Появление или исчезновение шаблона меняет все дни (шаблон клиники <-> свой)
+        weekdays = range(7) if bool(self._template) != had_template else (weekday,)
+        for day_of_week in weekdays:
+            self.weekly[day_of_week] = (
+                apply_rules(0, self._template.get(day_of_week, ())) if self._template else self._default[day_of_week]
+            )
+        for day in self._exceptions:
+            if day.weekday() in weekdays:
+                self.dates[day] = apply_rules(self.weekly[day.weekday()], self._exceptions[day])
+
+    def set_date(self, day: date, rules: List[ScheduleRule]) -> None:
+        """Заменить исключения на дату и пересобрать ее маску"""
+        if rules:
+            self._exceptions[day] = rules
+            self.dates[day] = apply_rules(self.weekly[day.weekday()], rules)
+        else:
+            self._exceptions.pop(day, None)
+            self.dates.pop(day, None)
+
+    def covers(self, start: datetime, end: datetime, tz: ZoneInfo) -> bool:
+        """Попадает ли [start, end) целиком в рабочее время"""
+        local_start, local_end = start.astimezone(tz), end.astimezone(tz)
+        day, last_day = local_start.date(), (local_end - timedelta(microseconds=1)).date()
+        while day <= last_day:
+            first = minutes_of(local_start.time()) // SLOT_MINUTES if day == local_start.date() else 0
+            last = -(-minutes_of(local_end.time()) // SLOT_MINUTES) if day == local_end.date() else SLOTS_PER_DAY
+            need = range_mask(first, last)
+            if self.mask(day) & need != need:
+                return False
+            day += timedelta(days=1)
+        return True
+
+    def windows(self, start: datetime, end: datetime, tz: ZoneInfo) -> Iterator[Interval]:
+        """Рабочие окна (UTC) в пределах [start, end), по порядку"""
+        day, last_day = start.astimezone(tz).date(), end.astimezone(tz).date()
+        while day <= last_day:
+            midnight = datetime.combine(day, time.min, tzinfo=tz)
+            for first, last in mask_runs(self.mask(day)):
+                opens = (midnight + timedelta(minutes=first * SLOT_MINUTES)).astimezone(timezone.utc)
+                closes = (midnight + timedelta(minutes=last * SLOT_MINUTES)).astimezone(timezone.utc)
+                opens, closes = max(opens, start), min(closes, end)
+                if opens < closes:
+                    yield opens, closes
+            day += timedelta(days=1)
+
+
+class ScheduleRegistry:
+    """Скомпилированные расписания врачей процесса; врач без недельного шаблона работает по часам клиники"""
+
+    def __init__(self):
+        self._doctors: Dict[int, CompiledSchedule] = {}
+        self._default_weekly: List[int] = working_hours_weekly()
+        # Расписание врачей без правил (только для чтения)
+        self._clinic = CompiledSchedule(self._default_weekly)
+        self.tz = ZoneInfo(settings.clinic_timezone)
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._doctors)
+
+    def __contains__(self, doctor_id: int) -> bool:
+        return doctor_id in self._doctors
+
+    def build(self, rules: Iterable[ScheduleRule]) -> None:
+        """Собрать расписания всех врачей заново"""
+        weekly: Dict[int, Dict[int, List[ScheduleRule]]] = {}
+        dated: Dict[int, Dict[date, List[ScheduleRule]]] = {}
+        for rule in rules:
+            if rule.weekday is not None:
+                weekly.setdefault(rule.doctor_id, {}).setdefault(rule.weekday, []).append(rule)
+            else:
+                dated.setdefault(rule.doctor_id, {}).setdefault(rule.schedule_date, []).append(rule)
+
+        doctors: Dict[int, CompiledSchedule] = {}
+        for doctor_id in weekly.keys() | dated.keys():
+            compiled = doctors[doctor_id] = CompiledSchedule(self._default_weekly)
+            # Сначала шаблон, затем даты (маски дат строятся поверх шаблона)
+            for weekday, weekday_rules in weekly.get(doctor_id, {}).items():
+                compiled.set_weekday(weekday, weekday_rules)
+            for day, day_rules in dated.get(doctor_id, {}).items():
+                compiled.set_date(day, day_rules)
+
+        # Подмена одной операцией: проверки не видят полусобранный реестр
+        self._doctors = doctors
+        self.ready = True
+
+    def get(self, doctor_id: int) -> Optional[CompiledSchedule]:
+        """Расписание врача (None - правил нет)"""
+        return self._doctors.get(doctor_id)
+
+    def _update(self, doctor_id: int, apply) -> None:
+        compiled = self._doctors.get(doctor_id) or CompiledSchedule(self._default_weekly)
+        apply(compiled)
+        if compiled:
+            self._doctors[doctor_id] = compiled
+        else:
+            self._doctors.pop(doctor_id, None)
+
+    def set_weekday(self, doctor_id: int, weekday: int, rules: List[ScheduleRule]) -> None:
+        """Обновить день недели врача после изменения его правил"""
+        self._update(doctor_id, lambda compiled: compiled.set_weekday(weekday, rules))
+
+    def set_date(self, doctor_id: int, day: date, rules: List[ScheduleRule]) -> None:
+        """Обновить дату врача после изменения ее исключений"""
+        self._update(doctor_id, lambda compiled: compiled.set_date(day, rules))
+
+    def _schedule(self, doctor_id: int) -> CompiledSchedule:
+        return self._doctors.get(doctor_id) or self._clinic
+
+    def is_working(self, doctor_id: int, start: datetime, end: datetime) -> bool:
+        """Работает ли врач весь интервал [start, end)"""
+        return self._schedule(doctor_id).covers(start, end, self.tz)
+
+    def windows(self, doctor_id: int, start: datetime, end: datetime) -> Iterator[Interval]:
+        """Рабочие окна врача"""
+        return self._schedule(doctor_id).windows(start, end, self.tz)
+
+
+def rule_of(row) -> ScheduleRule:
+    """Правило из строки запроса"""
+    return ScheduleRule(row.doctor_id, row.weekday, row.schedule_date, row.start_time, row.end_time, row.is_available)
+
+
+def rules_query():
+    """Поля правил расписания"""
+    return select(
+        DoctorSchedule.doctor_id,
+        DoctorSchedule.weekday,
+        DoctorSchedule.schedule_date,
+        DoctorSchedule.start_time,
+        DoctorSchedule.end_time,
+        DoctorSchedule.is_available,
+    )
+
+
+async def reload_schedules(db: AsyncSession) -> int:
+    """Перечитать все правила из базы данных; количество врачей с расписанием"""
+    started = timer.monotonic()
+    # Прошедшие исключения не влияют на запись
+    today = datetime.now(schedule_registry.tz).date()
+    result = await db.execute(rules_query().where(
+        or_(DoctorSchedule.weekday.is_not(None), DoctorSchedule.schedule_date >= today)
+    ))
+    schedule_registry.build(rule_of(row) for row in result)
+    logger.info("Doctor schedules loaded: %s doctors in %.2fs", len(schedule_registry), timer.monotonic() - started)
+    return len(schedule_registry)
+
+
+schedule_registry = ScheduleRegistry()
@@ -0,0 +1,66 @@
+"""
+Schedules Repository (Data Access Layer)
+"""
+from typing import List, Optional
+from datetime import date
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import DoctorSchedule
+from .registry import ScheduleRule, rule_of, rules_query
+
+
+class SchedulesRepository:
+    """Репозиторий правил расписания врачей"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_rule_by_id(self, rule_id: int) -> Optional[DoctorSchedule]:
+        """Получить правило по ID"""
+        return await self.db.get(DoctorSchedule, rule_id)
+
+    async def get_doctor_rules(self, doctor_id: int) -> List[DoctorSchedule]:
+        """Правила врача: сначала шаблон по дням недели, затем исключения по датам"""
+        result = await self.db.execute(
+            select(DoctorSchedule)
+            .where(DoctorSchedule.doctor_id == doctor_id)
+            .order_by(
+                DoctorSchedule.schedule_date.is_not(None),
+                DoctorSchedule.weekday,
+                DoctorSchedule.schedule_date,
+                DoctorSchedule.start_time,
+            )
+        )
+        return result.scalars().all()
+
+    async def get_weekday_rules(self, doctor_id: int, weekday: int) -> List[ScheduleRule]:
+        """Правила шаблона врача на день недели"""
+        result = await self.db.execute(
+            rules_query().where(DoctorSchedule.doctor_id == doctor_id, DoctorSchedule.weekday == weekday)
+        )
+        return [rule_of(row) for row in result]
+
+    async def get_date_rules(self, doctor_id: int, day: date) -> List[ScheduleRule]:
+        """Исключения врача на дату"""
+        result = await self.db.execute(
+            rules_query().where(DoctorSchedule.doctor_id == doctor_id, DoctorSchedule.schedule_date == day)
+        )
+        return [rule_of(row) for row in result]
+
+    async def create_rule(self, rule: DoctorSchedule) -> DoctorSchedule:
+        """Создать правило"""
+        self.db.add(rule)
+        await self.db.commit()
+        await self.db.refresh(rule)
+        return rule
+
+    async def update_rule(self, rule: DoctorSchedule) -> DoctorSchedule:
+        """Обновить правило"""
+        await self.db.commit()
+        await self.db.refresh(rule)
+        return rule
+
+    async def delete_rule(self, rule: DoctorSchedule) -> None:
+        """Удалить правило"""
+        await self.db.delete(rule)
+        await self.db.commit()
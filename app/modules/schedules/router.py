@@ -0,0 +1,69 @@
+"""
+Schedules Router (API Endpoints)
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app.db.session import get_db
+from app.core.dependencies import get_current_user, require_role
+from .service import SchedulesService
+from .schemas import ScheduleReloadResult, ScheduleRule, ScheduleRuleCreate, ScheduleRuleUpdate
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[ScheduleRule])
+async def get_doctor_rules(
+    doctor_id: int = Query(..., ge=1),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Правила расписания врача (шаблон по дням недели и исключения по датам)"""
+    service = SchedulesService(db)
+    return await service.get_doctor_rules(doctor_id)
+
+
+@router.post("/", response_model=ScheduleRule)
+async def create_rule(
+    rule_data: ScheduleRuleCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(require_role("admin"))
+):
+    """Добавить правило расписания"""
+    service = SchedulesService(db)
+    return await service.create_rule(rule_data)
+
+
+@router.post("/reload", response_model=ScheduleReloadResult)
+async def reload_schedules(
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(require_role("admin"))
+):
+    """Перечитать расписания в память (после изменений напрямую в БД)"""
+    service = SchedulesService(db)
+    return await service.reload()
+
+
+@router.put("/{rule_id}", response_model=ScheduleRule)
+async def update_rule(
+    rule_id: int,
+    rule_data: ScheduleRuleUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(require_role("admin"))
+):
+    """Обновить правило расписания"""
+    service = SchedulesService(db)
+    return await service.update_rule(rule_id, rule_data)
+
+
+@router.delete("/{rule_id}")
+async def delete_rule(
+    rule_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(require_role("admin"))
+):
+    """Удалить правило расписания"""
+    service = SchedulesService(db)
+    await service.delete_rule(rule_id)
+    return {"message": "Schedule rule deleted successfully"}
@@ -0,0 +1,48 @@
+"""
+Schedules Schemas (Pydantic)
+"""
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import date, datetime, time
+
+
+class ScheduleRuleBase(BaseModel):
+    """Правило расписания: weekday - недельный шаблон, schedule_date - исключение на дату"""
+    weekday: Optional[int] = Field(None, ge=0, le=6, description="День недели (0 - понедельник)")
+    schedule_date: Optional[date] = Field(None, description="Дата исключения")
+    start_time: Optional[time] = Field(None, description="Начало (часовой пояс клиники)")
+    end_time: Optional[time] = Field(None, description="Окончание (часовой пояс клиники)")
+    is_available: str = Field("Y", pattern="^[YN]$", description="Y - прием, N - перерыв/выходной")
+    note: Optional[str] = Field(None, max_length=255)
+
+
+class ScheduleRuleCreate(ScheduleRuleBase):
+    """Создание правила"""
+    doctor_id: int = Field(..., ge=1)
+
+
+class ScheduleRuleUpdate(BaseModel):
+    """Обновление правила"""
+    weekday: Optional[int] = Field(None, ge=0, le=6)
+    schedule_date: Optional[date] = None
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    is_available: Optional[str] = Field(None, pattern="^[YN]$")
+    note: Optional[str] = Field(None, max_length=255)
+
+
+class ScheduleRule(ScheduleRuleBase):
+    """Правило расписания"""
+    id: int
+    doctor_id: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ScheduleReloadResult(BaseModel):
+    """Результат перезагрузки расписаний в память"""
+    doctors: int
+    duration_seconds: float
@@ -0,0 +1,113 @@
+"""
+Schedules Service (Business Logic Layer)
+"""
+import time
+from datetime import date
+from typing import List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.references import Reference, validate_references
+from app.modules.auth.models import User
+from .models import DoctorSchedule
+from .registry import reload_schedules, schedule_registry
+from .repository import SchedulesRepository
+from .schemas import ScheduleReloadResult, ScheduleRuleCreate, ScheduleRuleUpdate
+
+
+class SchedulesService:
+    """Сервис расписаний врачей"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repository = SchedulesRepository(db)
+
+    async def get_doctor_rules(self, doctor_id: int) -> List[DoctorSchedule]:
+        """Правила расписания врача"""
+        return await self.repository.get_doctor_rules(doctor_id)
+
+    async def create_rule(self, rule_data: ScheduleRuleCreate) -> DoctorSchedule:
+        """Создать правило и пересобрать его день в памяти"""
+        await validate_references(self.db, Reference(User, rule_data.doctor_id, "Doctor"))
+        rule = DoctorSchedule(**rule_data.dict())
+        self.validate_rule(rule)
+        rule = await self.repository.create_rule(rule)
+        await self.refresh(rule.doctor_id, rule.weekday, rule.schedule_date)
+        return rule
+
+    async def update_rule(self, rule_id: int, rule_data: ScheduleRuleUpdate) -> DoctorSchedule:
+        """Обновить правило; пересобираются прежний и новый день"""
+        rule = await self.get_rule(rule_id)
+        previous = (rule.weekday, rule.schedule_date)
+
+        update_data = rule_data.dict(exclude_unset=True)
+        # День недели и дата взаимоисключающие: новое значение одного сбрасывает другое
+        if update_data.get("weekday") is not None:
+            update_data["schedule_date"] = None
+        elif update_data.get("schedule_date") is not None:
+            update_data["weekday"] = None
+        for field, value in update_data.items():
+            setattr(rule, field, value)
+        self.validate_rule(rule)
+
+        rule = await self.repository.update_rule(rule)
+        await self.refresh(rule.doctor_id, *previous)
+        if (rule.weekday, rule.schedule_date) != previous:
+            await self.refresh(rule.doctor_id, rule.weekday, rule.schedule_date)
+        return rule
+
+    async def delete_rule(self, rule_id: int) -> None:
+        """Удалить правило"""
+        rule = await self.get_rule(rule_id)
+        doctor_id, weekday, schedule_date = rule.doctor_id, rule.weekday, rule.schedule_date
+        await self.repository.delete_rule(rule)
+        await self.refresh(doctor_id, weekday, schedule_date)
+
+    async def get_rule(self, rule_id: int) -> DoctorSchedule:
+        """Получить правило по ID"""
+        rule = await self.repository.get_rule_by_id(rule_id)
+        if not rule:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Schedule rule not found"
+            )
+        return rule
+
+    @staticmethod
+    def validate_rule(rule: DoctorSchedule) -> None:
+        """Проверить согласованность правила"""
+        if (rule.weekday is None) == (rule.schedule_date is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Exactly one of weekday or schedule_date must be set"
+            )
+        if (rule.start_time is None) != (rule.end_time is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="start_time and end_time must be set together"
+            )
+        if rule.start_time is None and (rule.weekday is not None or rule.is_available == "Y"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only a date exception marking a day off may omit the time"
+            )
+        if rule.start_time is not None and rule.end_time <= rule.start_time:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="end_time must be after start_time (split overnight shifts in two)"
+            )
+
+    async def refresh(self, doctor_id: int, weekday: Optional[int], schedule_date: Optional[date]) -> None:
+        """Пересобрать в памяти один день недели или одну дату врача"""
+        if not schedule_registry.ready:
+            # Полная загрузка еще не прошла и подхватит изменение сама
+            return
+        if weekday is not None:
+            schedule_registry.set_weekday(doctor_id, weekday, await self.repository.get_weekday_rules(doctor_id, weekday))
+        elif schedule_date is not None:
+            schedule_registry.set_date(doctor_id, schedule_date, await self.repository.get_date_rules(doctor_id, schedule_date))
+
+    async def reload(self) -> ScheduleReloadResult:
+        """Перечитать все расписания в память процесса"""
+        started = time.monotonic()
+        doctors = await reload_schedules(self.db)
+        return ScheduleReloadResult(doctors=doctors, duration_seconds=round(time.monotonic() - started, 3))
@@ -0,0 +1,11 @@
+"""
+Schedules Tasks (фоновые задачи)
+"""
+from app.db.session import AsyncSessionLocal
+from .registry import reload_schedules
+
+
+async def reload_schedules_job() -> None:
+    """Перечитать расписания врачей в отдельной сессии"""
+    async with AsyncSessionLocal() as db:
+        await reload_schedules(db)
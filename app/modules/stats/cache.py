@@ -0,0 +1,12 @@
+"""
+Stats Cache (кэш частотной статистики по набору параметров)
+"""
+from app.core.cache import TTLCache
+from app.core.config import settings
+from .schemas import FrequencyStats
+
+# Сбрасывается ежедневным пересчетом статистики (update_cached_stats)
+frequency_cache: TTLCache[FrequencyStats] = TTLCache(
+    maxsize=settings.stats_cache_size,
+    ttl=settings.stats_cache_ttl_seconds,
+)
@@ -0,0 +1,104 @@
+"""
+Stats Frequency (частота диагнозов и назначений по месяцам, врачам, возрасту и полу)
+"""
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import case, func, literal_column, select
+from app.modules.patients.models import Patient
+from app.modules.visits.models import Diagnosis, Treatment, Visit
+
+# Что считаем: модель, ключ группировки и название
+KINDS = {
+    "diagnoses": (Diagnosis, Diagnosis.icd_code, func.max(Diagnosis.diagnosis_name)),
+    "treatments": (Treatment, Treatment.treatment_name, Treatment.treatment_name),
+}
+
+DIMENSIONS = ("month", "doctor", "age_band", "gender")
+
+# Возрастные группы на дату визита: (нижняя граница, метка)
+AGE_BANDS = ((0, "0-17"), (18, "18-29"), (30, "30-44"), (45, "45-59"), (60, "60-74"), (75, "75+"))
+
+DEFAULT_TOP = 10
+
+
+def age_band_expr():
+    """Возрастная группа пациента на дату визита"""
+    age = func.date_part(literal_column("'year'"), func.age(Visit.visit_date, Patient.date_of_birth))
+    return case(
+        *[(age >= literal_column(str(low)), literal_column(f"'{label}'")) for low, label in reversed(AGE_BANDS)],
+    )
+
+
+def dimension_expr(dimension: str):
+    """Выражение группы (константы встроены, чтобы SELECT и GROUP BY совпадали)"""
+    if dimension == "month":
+        return func.date_trunc(literal_column("'month'"), Visit.visit_date)
+    if dimension == "doctor":
+        return Visit.doctor_id
+    if dimension == "age_band":
+        return age_band_expr()
+    if dimension == "gender":
+        return Patient.gender
+    raise ValueError(f"Unknown dimension: {dimension}")
+
+
+def build_frequency_query(
+    kind: str,
+    dimension: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    doctor_id: Optional[int] = None,
+    top: int = DEFAULT_TOP,
+):
+    """
+    Топ-N ключей (код МКБ-10 или название назначения) в каждой группе:
+    <дочерние строки> JOIN visits [JOIN patients], GROUP BY группа, ключ,
+    затем row_number() по убыванию частоты внутри группы
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind: {kind}")
+    model, key, name = KINDS[kind]
+    group = dimension_expr(dimension) if dimension else literal_column("NULL")
+
+    counts = (
+        select(
+            group.label("grp"),
+            key.label("key"),
+            name.label("name"),
+            func.count().label("count"),
+            func.count(Visit.patient_id.distinct()).label("patients"),
+        )
+        .select_from(model)
+        .join(Visit, Visit.id == model.visit_id)
+    )
+    if dimension in ("age_band", "gender"):
+        counts = counts.join(Patient, Patient.id == Visit.patient_id)
+    if date_from:
+        counts = counts.where(Visit.visit_date >= date_from)
+    if date_to:
+        counts = counts.where(Visit.visit_date < date_to)
+    if doctor_id is not None:
+        counts = counts.where(Visit.doctor_id == doctor_id)
+    counts = counts.group_by(group, key) if dimension else counts.group_by(key)
+    counts = counts.subquery("counts")
+
+    rank = func.row_number().over(
+        partition_by=counts.c.grp, order_by=(counts.c["count"].desc(), counts.c.key)
+    ).label("rank")
+    ranked = select(counts, rank).subquery("ranked")
+    return (
+        select(ranked.c.grp, ranked.c.key, ranked.c.name, ranked.c["count"], ranked.c.patients)
+        .where(ranked.c.rank <= top)
+        .order_by(ranked.c.grp, ranked.c.rank)
+    )
+
+
+def format_group(dimension: Optional[str], value) -> Optional[str]:
+    """Значение группы для ответа"""
+    if value is None:
+        return None
+    if dimension == "month" and isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m")
+    if hasattr(value, "value"):
+        return value.value
+    return str(value)
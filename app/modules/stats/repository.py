@@ -7,6 +7,7 @@ from typing import List, Optional, Dict, Any, Sequence
 from datetime import datetime, timedelta
 from .models import SystemStats, DashboardStats
 from .schemas import StatType
+from .frequency import build_frequency_query
 
 
 class StatsRepository:
@@ -162,15 +163,16 @@ class StatsRepository:
     async def get_appointment_stats(self) -> Dict[str, int]:
         """Получить статистику записей"""
         from app.modules.appointments.models import Appointment
+        from app.modules.appointments.availability import live_status_filter
 
         # Общее количество записей
         result = await self.db.execute(select(func.count(Appointment.id)))
         total_appointments = result.scalar()
 
-        # Предстоящих записей
+        # Предстоящих записей (отмененные и неявки не считаются; частичный индекс)
         now = datetime.utcnow()
         result = await self.db.execute(
-            select(func.count(Appointment.id)).filter(Appointment.scheduled_date >= now)
+            select(func.count(Appointment.id)).filter(Appointment.scheduled_date >= now, live_status_filter())
         )
         upcoming_appointments = result.scalar()
 
@@ -273,3 +275,16 @@ class StatsRepository:
             "visits_count": visits_count or 0,
             "surgeries_count": surgeries_count or 0
         }
+
+    async def get_frequency(
+        self,
+        kind: str,
+        dimension: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        doctor_id: Optional[int] = None,
+        top: int = 10
+    ) -> Sequence[Any]:
+        """Топ-N диагнозов или назначений в каждой группе (одним запросом)"""
+        result = await self.db.execute(build_frequency_query(kind, dimension, date_from, date_to, doctor_id, top))
+        return result.all()
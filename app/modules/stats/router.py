@@ -12,7 +12,7 @@ from .service import StatsService
 from .schemas import (
     StatType, SystemStats, SystemStatsCreate, SystemStatsUpdate,
     DashboardStats, DashboardStatsCreate, DashboardStatsUpdate,
-    StatsSummary, ChartData, MonthlyStats
+    StatsSummary, ChartData, MonthlyStats, FrequencyDimension, FrequencyStats
 )
 
 router = APIRouter()
@@ -84,6 +84,36 @@ async def get_surgeries_chart(
     return await service.get_surgeries_chart_data(months)
 
 
+@router.get("/diagnoses", response_model=FrequencyStats)
+async def get_diagnoses_frequency(
+    group_by: Optional[FrequencyDimension] = Query(None, description="month, doctor, age_band или gender"),
+    date_from: Optional[datetime] = Query(None, alias="from", description="Визиты с (включительно)"),
+    date_to: Optional[datetime] = Query(None, alias="to", description="Визиты до (не включительно)"),
+    doctor_id: Optional[int] = Query(None),
+    top: int = Query(10, ge=1, le=100, description="Кодов в каждой группе"),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Самые частые диагнозы (коды МКБ-10) по месяцам, врачам, возрастным группам или полу"""
+    service = StatsService(db)
+    return await service.get_frequency("diagnoses", group_by, date_from, date_to, doctor_id, top)
+
+
+@router.get("/treatments", response_model=FrequencyStats)
+async def get_treatments_frequency(
+    group_by: Optional[FrequencyDimension] = Query(None, description="month, doctor, age_band или gender"),
+    date_from: Optional[datetime] = Query(None, alias="from", description="Визиты с (включительно)"),
+    date_to: Optional[datetime] = Query(None, alias="to", description="Визиты до (не включительно)"),
+    doctor_id: Optional[int] = Query(None),
+    top: int = Query(10, ge=1, le=100, description="Назначений в каждой группе"),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Самые частые назначения по месяцам, врачам, возрастным группам или полу"""
+    service = StatsService(db)
+    return await service.get_frequency("treatments", group_by, date_from, date_to, doctor_id, top)
+
+
 # SystemStats эндпоинты
 @router.get("/system", response_model=List[SystemStats])
 async def get_system_stats(
@@ -18,6 +18,14 @@ class StatType(str, Enum):
     BILLING = "billing"
 
 
+class FrequencyDimension(str, Enum):
+    """Группировка частотной статистики"""
+    MONTH = "month"
+    DOCTOR = "doctor"
+    AGE_BAND = "age_band"
+    GENDER = "gender"
+
+
 class SystemStatsBase(BaseModel):
     """Базовая схема системной статистики"""
     stat_type: StatType = Field(..., description="Тип статистики")
@@ -116,3 +124,23 @@ class MonthlyStats(BaseModel):
     appointments_count: int = Field(default=0, description="Количество записей")
     visits_count: int = Field(default=0, description="Количество визитов")
     surgeries_count: int = Field(default=0, description="Количество операций")
+
+
+class FrequencyItem(BaseModel):
+    """Частота кода диагноза или назначения в группе"""
+    group: Optional[str] = Field(None, description="Группа: месяц (YYYY-MM), id врача, возрастная группа или пол")
+    key: str = Field(..., description="Код МКБ-10 или название назначения")
+    name: Optional[str] = Field(None, description="Название")
+    count: int = Field(..., description="Количество")
+    patients: int = Field(..., description="Количество разных пациентов")
+
+
+class FrequencyStats(BaseModel):
+    """Топ диагнозов или назначений по группам"""
+    kind: str = Field(..., description="diagnoses или treatments")
+    group_by: Optional[FrequencyDimension] = Field(None, description="Группировка")
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    doctor_id: Optional[int] = None
+    top: int = Field(..., description="Записей в каждой группе")
+    items: List[FrequencyItem] = Field(default_factory=list)
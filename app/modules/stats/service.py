@@ -7,10 +7,13 @@ from datetime import datetime
 import json
 from .repository import StatsRepository
 from .models import SystemStats, DashboardStats
+from .cache import frequency_cache
+from .frequency import format_group
 from .schemas import (
     StatType, SystemStatsCreate, SystemStatsUpdate,
     DashboardStatsCreate, DashboardStatsUpdate,
-    StatsSummary, ChartData, MonthlyStats
+    StatsSummary, ChartData, MonthlyStats,
+    FrequencyDimension, FrequencyItem, FrequencyStats
 )
 
 
@@ -212,6 +215,41 @@ class StatsService:
 
         return ChartData(labels=labels, datasets=datasets)
 
+    async def get_frequency(
+        self,
+        kind: str,
+        group_by: Optional[FrequencyDimension] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        doctor_id: Optional[int] = None,
+        top: int = 10
+    ) -> FrequencyStats:
+        """Топ диагнозов или назначений по группам (кэшируется до следующего пересчета статистики)"""
+        key = (kind, group_by, date_from, date_to, doctor_id, top)
+        cached = frequency_cache.get(key)
+        if cached is not None:
+            return cached
+
+        dimension = group_by.value if group_by else None
+        rows = await self.repository.get_frequency(kind, dimension, date_from, date_to, doctor_id, top)
+        stats = FrequencyStats(
+            kind=kind,
+            group_by=group_by,
+            date_from=date_from,
+            date_to=date_to,
+            doctor_id=doctor_id,
+            top=top,
+            items=[
+                FrequencyItem(
+                    group=format_group(dimension, row.grp), key=row.key, name=row.name,
+                    count=row.count, patients=row.patients
+                )
+                for row in rows
+            ],
+        )
+        frequency_cache.set(key, stats)
+        return stats
+
     async def update_cached_stats(self) -> None:
         """Обновить кэшированную статистику в базе данных"""
         summary = await self.get_stats_summary()
@@ -266,3 +304,6 @@ class StatsService:
             StatType.SURGERIES, "recent", int_value=summary.recent_surgeries,
             description="Количество недавних операций (30 дней)"
         )
+
+        # Частотная статистика считается заново по свежим данным
+        frequency_cache.clear()
@@ -0,0 +1,11 @@
+"""
+Stats Tasks (фоновые задачи)
+"""
+from app.db.session import AsyncSessionLocal
+from .service import StatsService
+
+
+async def refresh_stats_job() -> None:
+    """Пересчитать сводную статистику в отдельной сессии"""
+    async with AsyncSessionLocal() as db:
+        await StatsService(db).update_cached_stats()
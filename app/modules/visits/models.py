@@ -1,13 +1,17 @@
 """
 Visits Models
 """
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, DateTime, Text, Float, ForeignKey, Enum
+from sqlalchemy.orm import Mapped, mapped_column, relationship, synonym
+from sqlalchemy import String, DateTime, Text, Float, ForeignKey, Enum, Index, Computed, text
 from sqlalchemy.sql import func
 from app.db.session import Base
 import enum
 
 
+# ИМТ = вес (кг) / рост (м)^2 с точностью 0.1; выражение переносимо (PostgreSQL и SQLite)
+BMI_EXPRESSION = "CASE WHEN height > 0 THEN round(weight * 100000.0 / (height * height)) / 10.0 END"
+
+
 class VisitStatus(str, enum.Enum):
     """Статус визита"""
     SCHEDULED = "scheduled"      # Запланирован
@@ -19,12 +23,16 @@ class VisitStatus(str, enum.Enum):
 class Diagnosis(Base):
     """Модель диагноза"""
     __tablename__ = "diagnoses"
+    __table_args__ = (
+        # Диагнозы визита и частота кодов по визитам (index-only scan при соединении с visits)
+        Index("ix_diagnoses_visit_id_icd_code", "visit_id", "icd_code"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     visit_id: Mapped[int] = mapped_column(ForeignKey("visits.id"), nullable=False)
 
     # Диагноз по МКБ-10
-    icd_code: Mapped[str] = mapped_column(String(10), nullable=False)  # Код по МКБ-10
+    icd_code: Mapped[str] = mapped_column(String(10), nullable=False, index=True)  # Ключ справочника icd10_codes
     diagnosis_name: Mapped[str] = mapped_column(String(255), nullable=False)
     is_primary: Mapped[str] = mapped_column(String(1), default="Y", nullable=False)  # Основной диагноз Y/N
 
@@ -34,6 +42,10 @@ class Diagnosis(Base):
 class Treatment(Base):
     """Модель лечения"""
     __tablename__ = "treatments"
+    __table_args__ = (
+        # Назначения визита и их частота по визитам
+        Index("ix_treatments_visit_id_treatment_name", "visit_id", "treatment_name"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     visit_id: Mapped[int] = mapped_column(ForeignKey("visits.id"), nullable=False)
@@ -46,10 +58,23 @@ class Treatment(Base):
 
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
+    # В API назначение называется medication_name
+    medication_name = synonym("treatment_name")
+
 
 class VitalSigns(Base):
     """Модель жизненных показателей"""
     __tablename__ = "vital_signs"
+    __table_args__ = (
+        # Временной ряд показателей пациента (index-only scan по визитам пациента)
+        Index(
+            "ix_vital_signs_visit_measured_at", "visit_id", "measured_at",
+            postgresql_include=[
+                "blood_pressure_systolic", "blood_pressure_diastolic", "heart_rate",
+                "temperature", "weight", "height", "bmi",
+            ],
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     visit_id: Mapped[int] = mapped_column(ForeignKey("visits.id"), nullable=False)
@@ -61,7 +86,10 @@ class VitalSigns(Base):
     temperature: Mapped[float | None] = mapped_column(Float, nullable=True)  # Температура
     weight: Mapped[float | None] = mapped_column(Float, nullable=True)  # Вес
     height: Mapped[float | None] = mapped_column(Float, nullable=True)  # Рост
-    bmi: Mapped[float | None] = mapped_column(Float, nullable=True)  # ИМТ
+    # ИМТ вычисляется БД (generated column)
+    bmi: Mapped[float | None] = mapped_column(
+        Float, Computed(BMI_EXPRESSION, persisted=True), nullable=True
+    )
 
     measured_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
@@ -69,6 +97,16 @@ class VitalSigns(Base):
 class Visit(Base):
     """Модель визита пациента"""
     __tablename__ = "visits"
+    __table_args__ = (
+        # История пациента (лента событий)
+        Index("ix_visits_patient_visit_date", "patient_id", "visit_date"),
+        # Визиты пациента для соединения с vital_signs без чтения таблицы
+        Index("ix_visits_patient_id_id", "patient_id", "id"),
+        # Визиты за период для частотной статистики
+        Index("ix_visits_visit_date", "visit_date", postgresql_include=["doctor_id", "patient_id"]),
+        # Визит по записи: лист дня и проверка, что пациент пришел (поиск неявок)
+        Index("ix_visits_appointment_id", "appointment_id", postgresql_where=text("appointment_id IS NOT NULL")),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
@@ -1,13 +1,43 @@
 """
 Visits Repository (Data Access Layer)
 """
+from functools import lru_cache
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional
+from sqlalchemy import select, insert, delete, bindparam
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import joinedload, selectinload
+from typing import List, Optional, Sequence
 from datetime import datetime
 from .models import Visit, Diagnosis, Treatment, VitalSigns, VisitStatus
 
 
+def _build_visit_detail_query():
+    """Визит + пациент и врач (JOIN) + по одному запросу на каждую коллекцию"""
+    from app.modules.auth.models import User
+    from app.modules.patients.models import Patient
+    return (
+        select(Visit)
+        .where(Visit.id == bindparam("visit_id"))
+        .options(
+            joinedload(Visit.patient).load_only(Patient.last_name, Patient.first_name, Patient.middle_name),
+            joinedload(Visit.doctor).load_only(User.full_name),
+            selectinload(Visit.vital_signs),
+            selectinload(Visit.diagnoses),
+            selectinload(Visit.treatments),
+        )
+        # Объекты из identity map (например, только что созданные) перечитываются целиком
+        .execution_options(populate_existing=True)
+    )
+
+
+_cached_visit_detail_query = lru_cache(maxsize=1)(_build_visit_detail_query)
+
+
+def visit_detail_query(cached: bool = True):
+    """Запрос детальной карточки визита (по умолчанию строится один раз и переиспользуется)"""
+    return _cached_visit_detail_query() if cached else _build_visit_detail_query()
+
+
 class VisitsRepository:
     """Repository для работы с визитами"""
 
@@ -19,6 +49,11 @@ class VisitsRepository:
         result = await self.db.execute(select(Visit).filter(Visit.id == visit_id))
         return result.scalar_one_or_none()
 
+    async def get_visit_detail(self, visit_id: int) -> Optional[Visit]:
+        """Получить визит со всеми связанными данными (4 запроса, без ленивых загрузок)"""
+        result = await self.db.execute(visit_detail_query(), {"visit_id": visit_id})
+        return result.unique().scalar_one_or_none()
+
     async def get_visits(self, skip: int = 0, limit: int = 100, patient_id: Optional[int] = None,
                    doctor_id: Optional[int] = None, status: Optional[VisitStatus] = None) -> List[Visit]:
         """Получить список визитов с фильтрами"""
@@ -48,7 +83,7 @@ class VisitsRepository:
         return result.scalars().all()
 
     async def create_visit(self, visit: Visit) -> Visit:
-        """Создать новый визит"""
+        """Создать новый визит (связанные записи из коллекций вставляются в той же транзакции)"""
         self.db.add(visit)
         await self.db.commit()
         await self.db.refresh(visit)
@@ -65,6 +100,14 @@ class VisitsRepository:
         await self.db.delete(visit)
         await self.db.commit()
 
+    async def get_child_rows(self, model, visit_id: int, fields: Sequence[str]) -> List[Row]:
+        """Получить id и указанные поля дочерних строк визита (без загрузки объектов в сессию)"""
+        columns = [getattr(model, field) for field in fields]
+        result = await self.db.execute(
+            select(model.id, *columns).where(model.visit_id == visit_id).order_by(model.id)
+        )
+        return list(result.all())
+
     # Методы для работы с диагнозами
     async def add_diagnosis(self, diagnosis: Diagnosis) -> Diagnosis:
         """Добавить диагноз к визиту"""
@@ -99,7 +142,32 @@ class VisitsRepository:
         await self.db.refresh(vital_signs)
         return vital_signs
 
+    async def add_vital_signs_many(self, rows: List[dict]) -> List[VitalSigns]:
+        """Добавить несколько измерений одним INSERT ... RETURNING"""
+        if not rows:
+            return []
+        result = await self.db.execute(insert(VitalSigns).values(rows).returning(VitalSigns))
+        created = list(result.scalars().all())
+        await self.db.commit()
+        return created
+
+    async def get_existing_visit_ids(self, visit_ids: List[int]) -> set:
+        """Получить множество существующих ID визитов"""
+        if not visit_ids:
+            return set()
+        result = await self.db.execute(select(Visit.id).where(Visit.id.in_(visit_ids)))
+        return set(result.scalars().all())
+
     async def get_vital_signs_by_visit(self, visit_id: int) -> Optional[VitalSigns]:
-        """Получить жизненные показатели визита"""
-        result = await self.db.execute(select(VitalSigns).filter(VitalSigns.visit_id == visit_id))
+        """Получить последнее измерение жизненных показателей визита"""
+        result = await self.db.execute(
+            select(VitalSigns)
+            .filter(VitalSigns.visit_id == visit_id)
+            .order_by(VitalSigns.measured_at.desc(), VitalSigns.id.desc())
+            .limit(1)
+        )
         return result.scalar_one_or_none()
+
+    async def delete_vital_signs_by_visit(self, visit_id: int) -> None:
+        """Удалить все измерения визита (без коммита)"""
+        await self.db.execute(delete(VitalSigns).where(VitalSigns.visit_id == visit_id))
@@ -9,7 +9,7 @@ from datetime import datetime
 from app.db.session import get_db
 from app.core.dependencies import get_current_user, require_role
 from .service import VisitsService
-from .schemas import Visit, VisitCreate, VisitUpdate, VisitSummary, Diagnosis, Treatment, VitalSigns, DiagnosisBase, TreatmentBase, VitalSignsBase
+from .schemas import Visit, VisitCreate, VisitUpdate, VisitSummary, Diagnosis, Treatment, VitalSigns, DiagnosisBase, TreatmentBase, VitalSignsBase, VitalSignsBulkCreate, VitalSignsBulkResult
 from .models import VisitStatus
 
 router = APIRouter()
@@ -23,7 +23,8 @@ async def create_visit(
 ):
     """Создать новый визит"""
     service = VisitsService(db)
-    return await service.create_visit(visit_data, current_user.id)
+    visit = await service.create_visit(visit_data, current_user.id)
+    return await service.get_visit_detail(visit.id)
 
 
 @router.get("/", response_model=List[VisitSummary])
@@ -84,6 +85,17 @@ async def get_upcoming_visits(
     return result
 
 
+@router.post("/vital-signs/bulk", response_model=VitalSignsBulkResult)
+async def add_vital_signs_bulk(
+    bulk_data: VitalSignsBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Принять пакет измерений с прикроватных мониторов (ошибки - по элементам)"""
+    service = VisitsService(db)
+    return await service.add_vital_signs_bulk(bulk_data)
+
+
 @router.get("/{visit_id}", response_model=Visit)
 async def get_visit(
     visit_id: int,
@@ -92,10 +104,7 @@ async def get_visit(
 ):
     """Получить визит по ID"""
     service = VisitsService(db)
-    visit = await service.get_visit(visit_id)
-
-    if not visit:
-        raise HTTPException(status_code=404, detail="Visit not found")
+    visit = await service.get_visit_detail(visit_id)
 
     # Проверяем права доступа (врач может видеть только свои визиты, админ - все)
     if current_user.role not in ["admin"] and visit.doctor_id != current_user.id:
@@ -122,7 +131,8 @@ async def update_visit(
     if current_user.role not in ["admin"] and visit.doctor_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    return await service.update_visit(visit_id, visit_data)
+    await service.update_visit(visit_id, visit_data)
+    return await service.get_visit_detail(visit_id)
 
 
 @router.put("/{visit_id}/complete", response_model=Visit)
@@ -142,7 +152,8 @@ async def complete_visit(
     if current_user.role not in ["admin"] and visit.doctor_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    return await service.complete_visit(visit_id)
+    await service.complete_visit(visit_id)
+    return await service.get_visit_detail(visit_id)
 
 
 @router.delete("/{visit_id}")
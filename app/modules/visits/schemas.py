@@ -4,6 +4,7 @@ Visits Schemas (Pydantic)
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional, List
+from app.modules.billing.schemas import BulkItemError
 from .models import VisitStatus
 
 
@@ -15,7 +16,6 @@ class VitalSignsBase(BaseModel):
     temperature: Optional[float] = Field(None, ge=30.0, le=45.0, description="Температура (°C)")
     weight: Optional[float] = Field(None, ge=1.0, le=300.0, description="Вес (кг)")
     height: Optional[float] = Field(None, ge=30.0, le=250.0, description="Рост (см)")
-    bmi: Optional[float] = Field(None, ge=5.0, le=70.0, description="ИМТ")
     oxygen_saturation: Optional[float] = Field(None, ge=50.0, le=100.0, description="Сатурация кислорода (%)")
 
 
@@ -23,16 +23,38 @@ class VitalSigns(VitalSignsBase):
     """Полная схема жизненных показателей"""
     id: int
     visit_id: int
+    bmi: Optional[float] = None  # ИМТ, вычисляется БД по весу и росту
     measured_at: datetime
 
     class Config:
         from_attributes = True
 
 
+class VitalSignsReading(BaseModel):
+    """Измерение с прикроватного монитора (диапазоны проверяются пакетно, см. VitalSignsBase)"""
+    visit_id: int
+    measured_at: Optional[datetime] = None
+    blood_pressure_systolic: Optional[int] = None
+    blood_pressure_diastolic: Optional[int] = None
+    heart_rate: Optional[int] = None
+    temperature: Optional[float] = None
+    weight: Optional[float] = None
+    height: Optional[float] = None
+
+
+class VitalSignsBulkCreate(BaseModel):
+    items: List[VitalSignsReading] = Field(..., min_length=1, max_length=1000)
+
+
+class VitalSignsBulkResult(BaseModel):
+    items: List[VitalSigns]
+    errors: List[BulkItemError] = []
+
+
 class DiagnosisBase(BaseModel):
     """Базовая схема диагноза"""
     icd_code: str = Field(..., min_length=1, max_length=10, description="Код по МКБ-10")
-    diagnosis_name: str = Field(..., min_length=1, max_length=255, description="Название диагноза")
+    diagnosis_name: Optional[str] = Field(None, min_length=1, max_length=255, description="Название диагноза (по умолчанию - из справочника МКБ-10)")
     is_primary: bool = Field(default=True, description="Основной диагноз")
 
 
@@ -95,8 +117,8 @@ class VisitUpdate(BaseModel):
     assessment: Optional[str] = None
     plan: Optional[str] = None
     vital_signs: Optional[VitalSignsBase] = None
-    diagnoses: Optional[List[DiagnosisBase]] = Field(default_factory=list)
-    treatments: Optional[List[TreatmentBase]] = Field(default_factory=list)
+    diagnoses: Optional[List[DiagnosisBase]] = None  # None - не менять, [] - очистить
+    treatments: Optional[List[TreatmentBase]] = None
 
 
 class Visit(VisitBase):
@@ -2,13 +2,120 @@
 Visits Service (Business Logic Layer)
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from typing import List, Optional
 from fastapi import HTTPException, status
-from datetime import datetime
+from datetime import datetime, timezone
+from app.db.collections import diff_collection, apply_collection_diff
+from app.db.references import Reference, validate_references, foreign_key_errors
+from app.modules.auth.models import User
+from app.modules.patients.models import Patient
 from .repository import VisitsRepository
 from .models import Visit, Diagnosis, Treatment, VitalSigns, VisitStatus
-from .schemas import VisitCreate, VisitUpdate, DiagnosisBase, TreatmentBase, VitalSignsBase
+from app.modules.billing.schemas import BulkItemError
+from app.modules.icd10.catalog import icd10_catalog, normalize_code
+from .schemas import (
+    Visit as VisitSchema, VisitCreate, VisitUpdate, DiagnosisBase, TreatmentBase, VitalSignsBase,
+    VitalSignsReading, VitalSignsBulkCreate, VitalSignsBulkResult, VitalSigns as VitalSignsSchema
+)
+
+
+# Естественный ключ и сравниваемые поля дочерних строк визита
+DIAGNOSIS_KEY = ("icd_code",)
+DIAGNOSIS_FIELDS = ("icd_code", "diagnosis_name", "is_primary")
+TREATMENT_KEY = ("treatment_name",)
+TREATMENT_FIELDS = ("treatment_name", "dosage", "frequency", "duration_days")
+
+
+# Показатели, которые принимаются от клиентов (ИМТ вычисляет БД)
+VITAL_SIGNS_FIELDS = (
+    "blood_pressure_systolic", "blood_pressure_diastolic", "heart_rate", "temperature", "weight", "height",
+)
+
+
+def _field_ranges(schema) -> dict:
+    """Допустимые диапазоны (ge/le) из ограничений полей схемы"""
+    ranges = {}
+    for name in VITAL_SIGNS_FIELDS:
+        low = high = None
+        for constraint in schema.model_fields[name].metadata:
+            low = getattr(constraint, "ge", low)
+            high = getattr(constraint, "le", high)
+        ranges[name] = (low, high)
+    return ranges
+
+
+# Физиологические диапазоны - те же, что проверяются при одиночной записи
+VITAL_RANGES = _field_ranges(VitalSignsBase)
+
+
+def vital_signs_values(data: VitalSignsBase) -> dict:
+    """Поля модели жизненных показателей (только хранимые колонки)"""
+    values = data.dict(exclude_unset=True)
+    return {field: values[field] for field in VITAL_SIGNS_FIELDS if field in values}
+
+
+def check_reading(reading: VitalSignsReading) -> Optional[str]:
+    """Ошибка измерения вне физиологического диапазона (None - корректно)"""
+    filled = 0
+    for field, (low, high) in VITAL_RANGES.items():
+        value = getattr(reading, field)
+        if value is None:
+            continue
+        filled += 1
+        if (low is not None and value < low) or (high is not None and value > high):
+            return f"{field} out of range [{low}, {high}]: {value}"
+    if not filled:
+        return "No measurements"
+    return None
+
+
+def diagnosis_values(data: DiagnosisBase) -> dict:
+    """Поля модели диагноза (is_primary хранится как Y/N, код - в виде справочника МКБ-10)"""
+    values = data.dict()
+    values["icd_code"] = normalize_code(data.icd_code)
+    values["is_primary"] = "Y" if data.is_primary else "N"
+    if not values["diagnosis_name"]:
+        entry = icd10_catalog.get(values["icd_code"])
+        if entry is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"diagnosis_name is required for ICD-10 code {values['icd_code']}"
+            )
+        values["diagnosis_name"] = entry.title[:255]
+    return values
+
+
+def check_icd_codes(diagnoses: List[dict]) -> None:
+    """Коды диагнозов должны быть в справочнике МКБ-10 (пока справочник не загружен - не проверяются)"""
+    if not len(icd10_catalog):
+        return
+    unknown = sorted({item["icd_code"] for item in diagnoses if item["icd_code"] not in icd10_catalog})
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown ICD-10 code(s): {', '.join(unknown)}"
+        )
+
+
+def treatment_values(data: TreatmentBase) -> dict:
+    """Поля модели назначения (в модели - treatment_name, инструкции не хранятся)"""
+    values = data.dict(exclude={"medication_name", "instructions"})
+    values["treatment_name"] = data.medication_name
+    return values
+
+
+def build_visit_detail(visit: Visit) -> VisitSchema:
+    """Схема визита со связанными данными (связи должны быть загружены заранее)"""
+    columns = {column.key: getattr(visit, column.key) for column in Visit.__table__.columns}
+    return VisitSchema.model_validate({
+        **columns,
+        # Показатели хранятся списком, в карточке - последние
+        "vital_signs": max(visit.vital_signs, key=lambda item: item.id, default=None),
+        "diagnoses": visit.diagnoses,
+        "treatments": visit.treatments,
+        "patient_name": visit.patient.full_name if visit.patient else None,
+        "doctor_name": visit.doctor.full_name if visit.doctor else None,
+    })
 
 
 class VisitsService:
@@ -22,6 +129,13 @@ class VisitsService:
         """Получить визит по ID"""
         return await self.repository.get_visit_by_id(visit_id)
 
+    async def get_visit_detail(self, visit_id: int) -> VisitSchema:
+        """Получить карточку визита со связанными данными"""
+        visit = await self.repository.get_visit_detail(visit_id)
+        if not visit:
+            raise HTTPException(status_code=404, detail="Visit not found")
+        return build_visit_detail(visit)
+
     async def get_visits(self, skip: int = 0, limit: int = 100, patient_id: Optional[int] = None,
                    doctor_id: Optional[int] = None, status: Optional[VisitStatus] = None) -> List[Visit]:
         """Получить список визитов с фильтрами"""
@@ -33,21 +147,19 @@ class VisitsService:
 
     async def create_visit(self, visit_data: VisitCreate, created_by: int) -> Visit:
         """Создать новый визит"""
-        # Проверяем, что пациент существует
-        from app.modules.patients.models import Patient
-        result = await self.db.execute(select(Patient).filter(Patient.id == visit_data.patient_id))
-        patient = result.scalar_one_or_none()
-        if not patient:
-            raise HTTPException(status_code=404, detail="Patient not found")
-
-        # Проверяем, что врач существует
-        from app.modules.auth.models import User
-        result = await self.db.execute(select(User).filter(User.id == visit_data.doctor_id))
-        doctor = result.scalar_one_or_none()
-        if not doctor:
-            raise HTTPException(status_code=404, detail="Doctor not found")
-
-        # Создаем визит
+        # Проверяем пациента, врача и запись одним запросом
+        from app.modules.appointments.models import Appointment
+        await validate_references(
+            self.db,
+            Reference(Patient, visit_data.patient_id, "Patient"),
+            Reference(User, visit_data.doctor_id, "Doctor"),
+            Reference(Appointment, visit_data.appointment_id, "Appointment"),
+        )
+
+        diagnoses = [diagnosis_values(diagnosis_data) for diagnosis_data in visit_data.diagnoses or []]
+        check_icd_codes(diagnoses)
+
+        # Создаем визит вместе со связанными данными: один flush (вставки пачками) и один коммит
         visit = Visit(
             patient_id=visit_data.patient_id,
             doctor_id=visit_data.doctor_id,
@@ -58,85 +170,54 @@ class VisitsService:
             physical_examination=visit_data.physical_examination,
             assessment=visit_data.assessment,
             plan=visit_data.plan,
-            created_by=created_by
+            created_by=created_by,
+            diagnoses=[Diagnosis(**values) for values in diagnoses],
+            treatments=[Treatment(**treatment_values(treatment_data)) for treatment_data in visit_data.treatments or []],
         )
-
-        visit = await self.repository.create_visit(visit)
-
-        # Добавляем связанные данные
         if visit_data.vital_signs:
-            vital_signs = VitalSigns(
-                visit_id=visit.id,
-                **visit_data.vital_signs.dict(exclude_unset=True)
-            )
-            await self.repository.add_vital_signs(vital_signs)
-
-        for diagnosis_data in visit_data.diagnoses or []:
-            diagnosis = Diagnosis(
-                visit_id=visit.id,
-                **diagnosis_data.dict()
-            )
-            await self.repository.add_diagnosis(diagnosis)
-
-        for treatment_data in visit_data.treatments or []:
-            treatment = Treatment(
-                visit_id=visit.id,
-                **treatment_data.dict()
-            )
-            await self.repository.add_treatment(treatment)
+            visit.vital_signs.append(VitalSigns(**vital_signs_values(visit_data.vital_signs)))
 
-        return visit
+        async with foreign_key_errors(self.db):
+            return await self.repository.create_visit(visit)
 
     async def update_visit(self, visit_id: int, visit_data: VisitUpdate) -> Visit:
-        """Обновить визит"""
+        """Обновить визит (одна транзакция; коллекции меняются по разнице)"""
         visit = await self.repository.get_visit_by_id(visit_id)
         if not visit:
             raise HTTPException(status_code=404, detail="Visit not found")
 
+        diagnoses = None
+        if visit_data.diagnoses is not None:
+            diagnoses = [diagnosis_values(item) for item in visit_data.diagnoses]
+            check_icd_codes(diagnoses)
+
         # Обновляем основные поля визита
         update_data = visit_data.dict(exclude_unset=True, exclude={'vital_signs', 'diagnoses', 'treatments'})
         for field, value in update_data.items():
             setattr(visit, field, value)
 
-        visit = await self.repository.update_visit(visit)
-
-        # Обновляем жизненные показатели
+        # Заменяем жизненные показатели
         if visit_data.vital_signs:
-            await self.update_vital_signs(visit_id, visit_data.vital_signs)
+            await self.repository.delete_vital_signs_by_visit(visit_id)
+            self.db.add(VitalSigns(visit_id=visit_id, **vital_signs_values(visit_data.vital_signs)))
 
-        # Обновляем диагнозы (удаляем старые и добавляем новые)
-        if visit_data.diagnoses is not None:
-            # Удаляем существующие диагнозы
-            existing_diagnoses = await self.repository.get_diagnoses_by_visit(visit_id)
-            for diagnosis in existing_diagnoses:
-                await self.db.delete(diagnosis)
-            await self.db.commit()
-
-            # Добавляем новые диагнозы
-            for diagnosis_data in visit_data.diagnoses:
-                diagnosis = Diagnosis(
-                    visit_id=visit_id,
-                    **diagnosis_data.dict()
-                )
-                await self.repository.add_diagnosis(diagnosis)
-
-        # Обновляем назначения лечения (удаляем старые и добавляем новые)
+        # Диагнозы и назначения: None - не трогать, список - привести к нему
+        if diagnoses is not None:
+            await self._sync_children(Diagnosis, visit_id, diagnoses, DIAGNOSIS_KEY, DIAGNOSIS_FIELDS)
         if visit_data.treatments is not None:
-            # Удаляем существующие назначения
-            existing_treatments = await self.repository.get_treatments_by_visit(visit_id)
-            for treatment in existing_treatments:
-                await self.db.delete(treatment)
-            await self.db.commit()
-
-            # Добавляем новые назначения
-            for treatment_data in visit_data.treatments:
-                treatment = Treatment(
-                    visit_id=visit_id,
-                    **treatment_data.dict()
-                )
-                await self.repository.add_treatment(treatment)
-
-        return visit
+            await self._sync_children(
+                Treatment, visit_id, [treatment_values(item) for item in visit_data.treatments],
+                TREATMENT_KEY, TREATMENT_FIELDS
+            )
+
+        return await self.repository.update_visit(visit)
+
+    async def _sync_children(self, model, visit_id: int, desired: List[dict], key_fields, fields) -> None:
+        """Привести дочерние строки визита к желаемому списку (без коммита)"""
+        existing = await self.repository.get_child_rows(model, visit_id, fields)
+        diff = diff_collection(existing, desired, key_fields, fields)
+        if not diff.empty:
+            await apply_collection_diff(self.db, model, "visit_id", visit_id, diff)
 
     async def delete_visit(self, visit_id: int) -> None:
         """Удалить визит"""
@@ -160,43 +241,65 @@ class VisitsService:
 
     async def add_diagnosis(self, visit_id: int, diagnosis_data: DiagnosisBase) -> Diagnosis:
         """Добавить диагноз к визиту"""
-        visit = await self.repository.get_visit_by_id(visit_id)
-        if not visit:
-            raise HTTPException(status_code=404, detail="Visit not found")
+        values = diagnosis_values(diagnosis_data)
+        check_icd_codes([values])
+        await validate_references(self.db, Reference(Visit, visit_id, "Visit"))
 
         diagnosis = Diagnosis(
             visit_id=visit_id,
-            **diagnosis_data.dict()
+            **values
         )
-        return await self.repository.add_diagnosis(diagnosis)
+        async with foreign_key_errors(self.db):
+            return await self.repository.add_diagnosis(diagnosis)
 
     async def add_treatment(self, visit_id: int, treatment_data: TreatmentBase) -> Treatment:
         """Добавить назначение лечения"""
-        visit = await self.repository.get_visit_by_id(visit_id)
-        if not visit:
-            raise HTTPException(status_code=404, detail="Visit not found")
+        await validate_references(self.db, Reference(Visit, visit_id, "Visit"))
 
         treatment = Treatment(
             visit_id=visit_id,
-            **treatment_data.dict()
+            **treatment_values(treatment_data)
+        )
+        async with foreign_key_errors(self.db):
+            return await self.repository.add_treatment(treatment)
+
+    async def add_vital_signs_bulk(self, bulk_data: VitalSignsBulkCreate) -> VitalSignsBulkResult:
+        """Принять пакет измерений: проверка диапазонов и визитов, затем один INSERT"""
+        items = bulk_data.items
+        visits = await self.repository.get_existing_visit_ids(list({item.visit_id for item in items}))
+        now = datetime.now(timezone.utc)
+
+        rows = []
+        errors = []
+        for index, item in enumerate(items):
+            error = check_reading(item)
+            if error is None and item.visit_id not in visits:
+                error = "Visit not found"
+            if error:
+                errors.append(BulkItemError(index=index, detail=error))
+                continue
+            # Одинаковый набор ключей во всех строках - один многострочный VALUES
+            rows.append({
+                "visit_id": item.visit_id,
+                "measured_at": item.measured_at or now,
+                **{field: getattr(item, field) for field in VITAL_SIGNS_FIELDS},
+            })
+
+        created = await self.repository.add_vital_signs_many(rows)
+        return VitalSignsBulkResult(
+            items=[VitalSignsSchema.from_orm(record) for record in created],
+            errors=errors
         )
-        return await self.repository.add_treatment(treatment)
 
     async def update_vital_signs(self, visit_id: int, vital_signs_data: VitalSignsBase) -> VitalSigns:
         """Обновить жизненные показатели"""
-        visit = await self.repository.get_visit_by_id(visit_id)
-        if not visit:
-            raise HTTPException(status_code=404, detail="Visit not found")
-
-        # Удаляем старые показатели, если есть
-        existing = await self.repository.get_vital_signs_by_visit(visit_id)
-        if existing:
-            await self.db.delete(existing)
-            await self.db.commit()
+        await validate_references(self.db, Reference(Visit, visit_id, "Visit"))
 
-        # Создаем новые
+        # Удаляем все прежние измерения визита и создаем новое в одной транзакции
+        await self.repository.delete_vital_signs_by_visit(visit_id)
         vital_signs = VitalSigns(
             visit_id=visit_id,
-            **vital_signs_data.dict(exclude_unset=True)
+            **vital_signs_values(vital_signs_data)
         )
-        return await self.repository.add_vital_signs(vital_signs)
+        async with foreign_key_errors(self.db):
+            return await self.repository.add_vital_signs(vital_signs)
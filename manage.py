@@ -320,5 +320,261 @@ async def _show_db_stats_async():
             sys.exit(1)
 
 
+@cli.command(name="mark-overdue")
+@click.option('--days', default=None, type=int, help='Days after which a pending invoice is overdue (default: BILLING_OVERDUE_DAYS)')
+@click.option('--chunk-size', default=None, type=int, help='Rows per UPDATE batch (default: BATCH_CHUNK_SIZE)')
+def mark_overdue(days, chunk_size):
+    """Перевести неоплаченные счета в статус OVERDUE"""
+    asyncio.run(_mark_overdue_async(days, chunk_size))
+
+
+async def _mark_overdue_async(days, chunk_size):
+    """Async функция для перевода счетов в OVERDUE"""
+    from app.modules.billing.tasks import mark_overdue_job
+
+    click.echo("💳 Marking overdue invoices...")
+
+    try:
+        result = await mark_overdue_job(days, chunk_size)
+        click.echo(f"✅ Marked {result.processed} invoice(s) as overdue "
+                   f"in {result.batches} batch(es), {result.duration_seconds:.3f}s")
+        click.echo(f"   Cutoff: {result.cutoff.isoformat()}")
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+@cli.command(name="mark-no-show")
+@click.option('--grace-minutes', default=None, type=click.IntRange(min=0), help='Minutes after the end of an appointment before it is a no-show (default: APPOINTMENT_NO_SHOW_GRACE_MINUTES)')
+@click.option('--chunk-size', default=None, type=click.IntRange(min=1), help='Rows per UPDATE batch (default: BATCH_CHUNK_SIZE)')
+def mark_no_show(grace_minutes, chunk_size):
+    """Перевести прошедшие записи без приема в статус NO_SHOW"""
+    asyncio.run(_mark_no_show_async(grace_minutes, chunk_size))
+
+
+async def _mark_no_show_async(grace_minutes, chunk_size):
+    """Async функция для перевода записей в NO_SHOW"""
+    from app.modules.appointments.tasks import mark_no_show_job
+
+    click.echo("📅 Marking past-due appointments as no-show...")
+
+    try:
+        result = await mark_no_show_job(grace_minutes, chunk_size)
+        click.echo(f"✅ Marked {result.processed} appointment(s) as no-show "
+                   f"in {result.batches} batch(es), {result.duration_seconds:.3f}s")
+        click.echo(f"   Cutoff: {result.cutoff.isoformat()}")
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+@cli.command(name="import-patients")
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'ndjson']), default=None, help='File format (default: by extension)')
+@click.option('--no-dedupe', is_flag=True, help='Do not skip patients with the same phone and date of birth')
+@click.option('--chunk-size', default=1000, type=click.IntRange(min=1), help='Rows per INSERT batch')
+@click.option('--errors-file', default=None, type=click.Path(dir_okay=False), help='Write per-row errors to CSV')
+def import_patients(path, file_format, no_dedupe, chunk_size, errors_file):
+    """Импортировать пациентов из CSV/NDJSON (поддерживается .gz)"""
+    asyncio.run(_import_patients_async(path, file_format, not no_dedupe, chunk_size, errors_file))
+
+
+async def _import_patients_async(path, file_format, dedupe, chunk_size, errors_file):
+    """Async функция для импорта пациентов"""
+    import csv
+    import gzip
+    from app.db.session import AsyncSessionLocal
+    from app.modules.patients.service import PatientsService
+    from app.modules.patients.importer import detect_format
+
+    file_format = file_format or detect_format(path[:-3] if path.endswith(".gz") else path)
+    if not file_format:
+        click.echo("❌ Cannot detect file format, use --format", err=True)
+        sys.exit(1)
+
+    def progress(result):
+        click.echo(f"   ... {result.processed} rows, {result.imported} imported, "
+                   f"{result.duplicates} duplicates, {result.failed} failed "
+                   f"({result.rows_per_second:.0f} rows/s)")
+
+    click.echo(f"📥 Importing patients from {path} ({file_format})...")
+
+    opener = gzip.open if path.endswith(".gz") else open
+    async with AsyncSessionLocal() as db:
+        try:
+            with opener(path, "rt", encoding="utf-8-sig", newline="") as stream:
+                service = PatientsService(db)
+                result = await service.import_patients(
+                    stream, file_format, dedupe=dedupe, chunk_size=chunk_size, on_progress=progress
+                )
+
+            click.echo(f"✅ Imported {result.imported} of {result.processed} row(s) "
+                       f"in {result.duration_seconds:.2f}s ({result.rows_per_second:.0f} rows/s)")
+            click.echo(f"   Duplicates: {result.duplicates}, failed: {result.failed}")
+
+            if errors_file and result.errors:
+                with open(errors_file, "w", encoding="utf-8", newline="") as out:
+                    writer = csv.writer(out)
+                    writer.writerow(["row", "detail"])
+                    writer.writerows((error.row, error.detail) for error in result.errors)
+                click.echo(f"   Errors written to {errors_file}")
+            elif result.errors:
+                for error in result.errors[:20]:
+                    click.echo(f"   row {error.row}: {error.detail}")
+
+        except Exception as e:
+            await db.rollback()
+            click.echo(f"❌ Error: {e}", err=True)
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+
+
+@cli.command(name="load-icd10")
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--delimiter', default=None, help='Field delimiter (default: detect tab/;/, or "CODE title" lines)')
+def load_icd10(path, delimiter):
+    """Загрузить справочник МКБ-10 из файла (код, название; поддерживается .gz)"""
+    asyncio.run(_load_icd10_async(path, delimiter))
+
+
+async def _load_icd10_async(path, delimiter):
+    """Async функция для загрузки справочника МКБ-10"""
+    import gzip
+    from app.db.session import async_engine
+    from app.modules.icd10.loader import load_icd10
+
+    click.echo(f"📥 Loading ICD-10 codes from {path}...")
+
+    opener = gzip.open if path.endswith(".gz") else open
+    try:
+        with opener(path, "rt", encoding="utf-8-sig", newline="") as stream:
+            async with async_engine.begin() as conn:
+                result = await load_icd10(conn, stream, delimiter)
+
+        click.echo(f"✅ Loaded {result.rows} code(s), {result.changed} inserted or changed, "
+                   f"{result.skipped} row(s) skipped in {result.duration_seconds:.2f}s")
+        click.echo("   Running servers pick it up on POST /icd10/reload or restart")
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+@cli.command(name="export-patients")
+@click.option('--output', '-o', default='-', help='Output file (default: stdout)')
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'ndjson']), default='csv', help='Output format')
+@click.option('--columns', default=None, help='Comma-separated columns (default: all)')
+@click.option('--active-only', is_flag=True, help='Export only active patients')
+@click.option('--gzip', 'use_gzip', is_flag=True, help='Compress output with gzip')
+@click.option('--chunk-size', default=1000, type=int, help='Rows fetched per cursor round trip')
+def export_patients(output, file_format, columns, active_only, use_gzip, chunk_size):
+    """Выгрузить реестр пациентов потоком"""
+    asyncio.run(_export_patients_async(output, file_format, columns, active_only, use_gzip, chunk_size))
+
+
+async def _export_patients_async(output, file_format, columns, active_only, use_gzip, chunk_size):
+    """Async функция для выгрузки пациентов"""
+    from app.modules.patients.export import iter_export, gzip_stream, parse_columns
+
+    try:
+        selected = parse_columns(columns)
+    except ValueError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
+
+    to_stdout = output == '-'
+    if not to_stdout:
+        click.echo(f"📤 Exporting patients to {output} ({file_format}{', gzip' if use_gzip else ''})...")
+
+    try:
+        body = iter_export(selected, file_format, active_only, chunk_size)
+        if use_gzip:
+            body = gzip_stream(body)
+
+        written = 0
+        with click.open_file(output, "wb") as out:
+            async for chunk in body:
+                out.write(chunk)
+                written += len(chunk)
+
+        if not to_stdout:
+            click.echo(f"✅ Written {written} bytes to {output}")
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+@cli.command(name="find-duplicates")
+@click.option('--threshold', default=None, type=float, help='Minimum match score 0..1 (default: 0.6)')
+@click.option('--workers', default=None, type=int, help='Worker processes (default: CPU count)')
+@click.option('--output', '-o', default=None, type=click.Path(dir_okay=False), help='Write pairs to CSV')
+@click.option('--limit', default=50, type=int, help='Pairs to print when no output file is given')
+def find_duplicates(threshold, workers, output, limit):
+    """Найти вероятные дубликаты пациентов по всему реестру"""
+    asyncio.run(_find_duplicates_async(threshold, workers, output, limit))
+
+
+async def _find_duplicates_async(threshold, workers, output, limit):
+    """Async функция для поиска дубликатов"""
+    import csv
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+    from app.db.session import AsyncSessionLocal
+    from app.modules.patients.repository import PatientsRepository
+    from app.modules.patients.dedupe import (
+        DEFAULT_THRESHOLD, build_blocks, chunk_blocks, merge_matches, score_blocks
+    )
+
+    threshold = DEFAULT_THRESHOLD if threshold is None else threshold
+    workers = workers or os.cpu_count() or 1
+    started = time.monotonic()
+
+    click.echo("🔍 Loading patients...")
+    async with AsyncSessionLocal() as db:
+        try:
+            records = [record async for record in PatientsRepository(db).iter_dedupe_records()]
+        except Exception as e:
+            click.echo(f"❌ Error: {e}", err=True)
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+
+    blocks = build_blocks(records)
+    del records
+    click.echo(f"   {len(blocks)} block(s) to compare, {workers} worker(s)")
+
+    # Блоки независимы: порции сравниваются в отдельных процессах
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            loop.run_in_executor(executor, partial(score_blocks, chunk, threshold))
+            for chunk in chunk_blocks(blocks, workers * 4)
+        ]
+        matches = merge_matches(*await asyncio.gather(*futures))
+
+    click.echo(f"✅ Found {len(matches)} probable duplicate pair(s) in {time.monotonic() - started:.2f}s")
+
+    if output:
+        with open(output, "w", encoding="utf-8", newline="") as out:
+            writer = csv.writer(out)
+            writer.writerow(["patient_id", "duplicate_id", "score", "reasons"])
+            writer.writerows(
+                (match.patient_id, match.duplicate_id, match.score, " ".join(match.reasons)) for match in matches
+            )
+        click.echo(f"   Written to {output}")
+    else:
+        for match in matches[:limit]:
+            click.echo(f"   {match.patient_id:<8} {match.duplicate_id:<8} {match.score:.3f}  {', '.join(match.reasons)}")
+
+
 if __name__ == "__main__":
     cli()
\ No newline at end of file
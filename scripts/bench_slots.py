@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Benchmark the free-slot finder on fully booked doctors
+
+Usage: python scripts/bench_slots.py [--doctors 100] [--days 30] [--limit 1000] [--runs 20]
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, time as clock, timedelta, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.modules.appointments.slots import find_slots, group_busy  # noqa: E402
+from app.modules.schedules.registry import CompiledSchedule, time_mask  # noqa: E402
+
+# Пн-Пт 9:00-18:00
+WEEKLY = [time_mask(clock(9), clock(18))] * 5 + [0, 0]
+
+
+def booked_rows(doctors: int, start: datetime, end: datetime):
+    """Занятость врачей: весь рабочий день, кроме последнего получаса"""
+    rows = []
+    for doctor_id in range(1, doctors + 1):
+        day = start
+        while day < end:
+            rows.append((doctor_id, day.replace(hour=9), day.replace(hour=17, minute=30)))
+            day += timedelta(days=1)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--doctors", type=int, default=100)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    start = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    end = start + timedelta(days=args.days)
+    rows = booked_rows(args.doctors, start, end)
+    doctor_ids = list(range(1, args.doctors + 1))
+    schedule = CompiledSchedule(WEEKLY)
+    utc = ZoneInfo("UTC")
+
+    def windows_for(doctor_id, window_start, window_end):
+        return schedule.windows(window_start, window_end, utc)
+
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        slots = find_slots(group_busy(rows), doctor_ids, start, end, 30, args.limit, windows_for, 15)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+
+    print(f"Doctors x days:  {args.doctors} x {args.days} ({len(rows):,} busy intervals)")
+    print(f"Slots found:     {len(slots):,}")
+    print(f"Search time:     p50 {statistics.median(timings):.1f} ms, max {timings[-1]:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Benchmark memory footprint and latency of the patient typeahead index
+
+Usage: python scripts/bench_typeahead.py [--patients 1000000] [--queries 10000]
+"""
+import argparse
+import gc
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.modules.patients.typeahead import PatientTypeaheadIndex, TypeaheadRecord  # noqa: E402
+
+LAST_NAMES = [
+    "Иванов", "Петров", "Сидоров", "Смирнов", "Кузнецов", "Попов", "Васильев", "Соколов",
+    "Михайлов", "Новиков", "Федоров", "Морозов", "Волков", "Алексеев", "Лебедев", "Семенов",
+    "Егоров", "Павлов", "Козлов", "Степанов", "Николаев", "Орлов", "Андреев", "Макаров",
+]
+FIRST_NAMES = [
+    "Иван", "Петр", "Алексей", "Сергей", "Дмитрий", "Андрей", "Михаил", "Николай",
+    "Анна", "Мария", "Елена", "Ольга", "Татьяна", "Наталья", "Ирина", "Светлана",
+]
+MIDDLE_NAMES = ["Иванович", "Петрович", "Сергеевич", "Андреевна", "Михайловна", None]
+
+
+def generate(count: int, rng: random.Random):
+    """Синтетические пациенты с реалистичным повторением имен"""
+    for patient_id in range(1, count + 1):
+        # Суффикс делает фамилии разнообразнее, как в реальной базе
+        last_name = rng.choice(LAST_NAMES) + rng.choice(["", "а", "ский", "ич", str(patient_id % 997)])
+        yield TypeaheadRecord(
+            patient_id,
+            last_name,
+            rng.choice(FIRST_NAMES),
+            rng.choice(MIDDLE_NAMES),
+            f"+7 ({rng.randint(900, 999)}) {rng.randint(100, 999)}-{rng.randint(10, 99)}-{rng.randint(10, 99)}",
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    records = list(generate(args.patients, rng))
+
+    # Память меряем отдельным построением: под tracemalloc замеры времени недостоверны
+    gc.collect()
+    tracemalloc.start()
+    index = PatientTypeaheadIndex()
+    index.build(records)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del index
+    gc.collect()
+
+    started = time.perf_counter()
+    index = PatientTypeaheadIndex()
+    index.build(records)
+    build_seconds = time.perf_counter() - started
+    del records
+
+    queries = []
+    for _ in range(args.queries):
+        kind = rng.random()
+        if kind < 0.6:
+            queries.append(rng.choice(LAST_NAMES)[:rng.randint(2, 6)])
+        elif kind < 0.8:
+            queries.append(f"{rng.choice(LAST_NAMES)[:4]} {rng.choice(FIRST_NAMES)[:2]}")
+        else:
+            queries.append(f"9{rng.randint(10, 99)}{rng.randint(1, 9)}")
+
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, limit=10)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    timings.sort()
+
+    print(f"Patients:        {len(index):,}")
+    print(f"Build time:      {build_seconds:.2f} s")
+    print(f"Memory (index):  {current / 1024 / 1024:.1f} MiB (peak during build {peak / 1024 / 1024:.1f} MiB)")
+    print(f"Bytes/patient:   {current / max(len(index), 1):.0f}")
+    print(f"Query latency:   p50 {statistics.median(timings):.1f} us, "
+          f"p95 {timings[int(len(timings) * 0.95)]:.1f} us, "
+          f"p99 {timings[int(len(timings) * 0.99)]:.1f} us, "
+          f"max {timings[-1]:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
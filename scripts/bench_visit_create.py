@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Benchmark visit creation throughput: per-row commits vs a single unit of work
+
+Usage: python scripts/bench_visit_create.py --patient-id 1 --doctor-id 1 [--visits 200]
+       [--diagnoses 3] [--treatments 5]
+
+Needs a migrated database (DATABASE_URL); created visits are deleted afterwards.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, event  # noqa: E402
+from app.db.session import AsyncSessionLocal, async_engine  # noqa: E402
+from app.modules.visits.models import Visit, Diagnosis, Treatment, VitalSigns  # noqa: E402
+from app.modules.visits.schemas import VisitCreate  # noqa: E402
+from app.modules.visits.service import VisitsService, diagnosis_values, treatment_values  # noqa: E402
+
+
+def make_payload(args) -> VisitCreate:
+    """Визит с диагнозами, назначениями и показателями"""
+    return VisitCreate(
+        patient_id=args.patient_id,
+        doctor_id=args.doctor_id,
+        visit_date=datetime.now(timezone.utc),
+        chief_complaint="Головная боль",
+        vital_signs={"blood_pressure_systolic": 120, "blood_pressure_diastolic": 80, "heart_rate": 70},
+        diagnoses=[
+            {"icd_code": f"R51.{i}", "diagnosis_name": "Головная боль", "is_primary": i == 0}
+            for i in range(args.diagnoses)
+        ],
+        treatments=[
+            {"medication_name": f"Препарат {i}", "dosage": "1 таб", "frequency": "2 раза в день"}
+            for i in range(args.treatments)
+        ],
+    )
+
+
+async def create_per_row(db, data: VisitCreate, created_by: int) -> Visit:
+    """Прежний путь: коммит и refresh на визит и на каждую связанную запись"""
+    visit = Visit(**data.dict(exclude={"vital_signs", "diagnoses", "treatments"}), created_by=created_by)
+    children = [VitalSigns(**data.vital_signs.dict(exclude_unset=True))] if data.vital_signs else []
+    children += [Diagnosis(**diagnosis_values(item)) for item in data.diagnoses]
+    children += [Treatment(**treatment_values(item)) for item in data.treatments]
+
+    db.add(visit)
+    await db.commit()
+    await db.refresh(visit)
+    for child in children:
+        child.visit_id = visit.id
+        db.add(child)
+        await db.commit()
+        await db.refresh(child)
+    return visit
+
+
+async def run(label: str, create, args, created_ids: list) -> None:
+    statements = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    data = make_payload(args)
+    started = time.perf_counter()
+    for _ in range(args.visits):
+        async with AsyncSessionLocal() as db:
+            visit = await create(db, data)
+            created_ids.append(visit.id)
+    elapsed = time.perf_counter() - started
+    event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+
+    print(f"{label:<14} {args.visits / elapsed:8.1f} visits/s   "
+          f"{statements / args.visits:5.1f} statements/visit   {elapsed * 1000 / args.visits:6.2f} ms/visit")
+
+
+async def cleanup(created_ids: list) -> None:
+    async with AsyncSessionLocal() as db:
+        for model in (Diagnosis, Treatment, VitalSigns):
+            await db.execute(delete(model).where(model.visit_id.in_(created_ids)))
+        await db.execute(delete(Visit).where(Visit.id.in_(created_ids)))
+        await db.commit()
+
+
+async def main_async(args) -> None:
+    created_ids: list = []
+    try:
+        await run("per-row", lambda db, data: create_per_row(db, data, args.doctor_id), args, created_ids)
+        await run("unit of work", lambda db, data: VisitsService(db).create_visit(data, args.doctor_id), args, created_ids)
+    finally:
+        await cleanup(created_ids)
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patient-id", type=int, required=True)
+    parser.add_argument("--doctor-id", type=int, required=True)
+    parser.add_argument("--visits", type=int, default=200)
+    parser.add_argument("--diagnoses", type=int, default=3)
+    parser.add_argument("--treatments", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
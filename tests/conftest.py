@@ -1,6 +1,13 @@
 """
 Pytest configuration and fixtures
 """
+import os
+
+# Background jobs and startup warm-ups must not touch the database from TestClient
+os.environ["SCHEDULER_ENABLED"] = "false"
+
+from datetime import date, datetime, timezone
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -8,6 +15,8 @@ from sqlalchemy.orm import sessionmaker
 
 from app.main import app
 from app.db.session import Base, get_db
+from app.modules.auth.models import User
+from app.modules.patients.models import Patient
 
 # Test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -30,6 +39,88 @@ def db():
         Base.metadata.drop_all(bind=engine)
 
 
+class AsyncSessionAdapter:
+    """Async session interface over the synchronous test session"""
+
+    def __init__(self, session):
+        self.session = session
+
+    def add(self, instance):
+        self.session.add(instance)
+
+    def add_all(self, instances):
+        self.session.add_all(instances)
+
+    async def execute(self, *args, **kwargs):
+        return self.session.execute(*args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return self.session.scalar(*args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return self.session.get(*args, **kwargs)
+
+    async def delete(self, instance):
+        self.session.delete(instance)
+
+    async def flush(self, *args, **kwargs):
+        self.session.flush(*args, **kwargs)
+
+    async def refresh(self, *args, **kwargs):
+        self.session.refresh(*args, **kwargs)
+
+    async def commit(self):
+        self.session.commit()
+
+    async def rollback(self):
+        self.session.rollback()
+
+
+@pytest.fixture
+def async_db(db):
+    """Async database fixture for services and repositories"""
+    return AsyncSessionAdapter(db)
+
+
+def _at(hour: int, minute: int = 0, day: int = 3, month: int = 6) -> datetime:
+    return datetime(2024, month, day, hour, minute, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def at():
+    """UTC time in June 2024 (2024-06-03 is a Monday)"""
+    return _at
+
+
+@pytest.fixture
+def patient(db):
+    """Seeded patient"""
+    patient = Patient(first_name="Иван", last_name="Иванов", date_of_birth=date(1990, 1, 1), gender="male",
+                      phone="+998901234567", updated_at=_at(8))
+    db.add(patient)
+    db.flush()
+    return patient
+
+
+@pytest.fixture
+def doctors(db):
+    """Three seeded doctors"""
+    doctors = [
+        User(username=f"doctor{n}", email=f"doctor{n}@example.com", full_name=f"Врач {n}", hashed_password="x",
+             updated_at=_at(8))
+        for n in (1, 2, 3)
+    ]
+    db.add_all(doctors)
+    db.flush()
+    return doctors
+
+
+@pytest.fixture
+def doctor(doctors):
+    """First seeded doctor"""
+    return doctors[0]
+
+
 @pytest.fixture
 def client(db):
     """Test client fixture"""
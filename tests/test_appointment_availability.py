@@ -0,0 +1,81 @@
+"""
+Unit tests for doctor availability
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+from app.core.exceptions import ConflictException
+from app.modules.appointments.availability import DayIntervals, booking_conflicts, build_intervals_query
+from app.modules.appointments.models import Appointment
+
+
+def test_ends_at_follows_start_and_duration(at):
+    """Test the end time follows start and duration changes"""
+    appointment = Appointment(duration_minutes=45, scheduled_date=at(10))
+    assert appointment.ends_at == at(10, 45)
+
+    appointment.duration_minutes = 60
+    assert appointment.ends_at == at(11)
+    appointment.scheduled_date = at(12)
+    assert appointment.ends_at == at(13)
+
+
+def test_intervals_query_uses_range_operator(at):
+    """Test doctor intervals are selected with && on the indexed expression"""
+    query = build_intervals_query(1, at(10), at(10, 30))
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert "tstzrange(appointments.scheduled_date, appointments.ends_at, '[)') &&" in sql
+
+    # Статусы встраиваются литералами, как в WHERE ограничения
+    sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert "appointments.status IN ('SCHEDULED', 'CONFIRMED', 'IN_PROGRESS')" in sql
+
+
+def test_day_intervals_find_overlap(at):
+    """Test overlap search handles earlier long intervals and half-open bounds"""
+    intervals = DayIntervals([
+        (at(9), at(13), 1),        # длинная процедура
+        (at(10), at(10, 30), 2),
+        (at(14), at(14, 30), 3),
+    ])
+
+    assert intervals.find_overlap(at(10, 30), at(11)) == 1
+    assert intervals.find_overlap(at(10, 30), at(11), exclude_id=1) is None
+    assert intervals.find_overlap(at(13), at(14)) is None
+    assert intervals.find_overlap(at(14, 15), at(15)) == 3
+    assert intervals.find_overlap(at(8), at(9)) is None
+
+
+class FakeDriverError(Exception):
+    """Driver error with an SQLSTATE code"""
+
+    def __init__(self, sqlstate):
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+class FakeSession:
+    def __init__(self):
+        self.rolled_back = False
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+def test_exclusion_violation_is_conflict():
+    """Test an exclusion violation becomes 409 and other integrity errors do not"""
+    async def raise_in_booking(sqlstate):
+        session = FakeSession()
+        async with booking_conflicts(session):
+            raise IntegrityError("INSERT", {}, FakeDriverError(sqlstate))
+
+    with pytest.raises(ConflictException) as exc:
+        asyncio.run(raise_in_booking("23P01"))
+    assert exc.value.status_code == 409
+
+    with pytest.raises(IntegrityError):
+        asyncio.run(raise_in_booking("23505"))
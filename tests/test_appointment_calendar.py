@@ -0,0 +1,94 @@
+"""
+Unit tests for the doctors' calendar
+"""
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from app.modules.appointments.availability import as_utc
+from app.modules.appointments.calendar import build_calendar_query, calendar_etag, etag_matches, group_calendar
+from app.modules.appointments.models import Appointment, AppointmentType
+from app.modules.appointments.service import AppointmentsService
+from app.modules.visits.models import Visit, VisitStatus
+
+
+def test_calendar_groups_appointments_and_walk_ins(db: Session, at, patient, doctors):
+    """Test appointments and walk-in visits come from one query, grouped by doctor and time"""
+    now = at(8)
+    first, second, idle = (doctor.id for doctor in doctors)
+
+    def appointment(doctor_id, start):
+        return Appointment(patient_id=patient.id, doctor_id=doctor_id, appointment_type=AppointmentType.CONSULTATION,
+                           scheduled_date=start, duration_minutes=30, created_by=first, updated_at=now)
+
+    late, early, other = appointment(first, at(11)), appointment(first, at(9)), appointment(second, at(10))
+    outside = appointment(first, at(9, day=4))
+    db.add_all([late, early, other, outside])
+    db.flush()
+    db.add_all([
+        Visit(patient_id=patient.id, doctor_id=first, appointment_id=early.id, status=VisitStatus.IN_PROGRESS,
+              visit_date=at(9, 5), created_by=first, updated_at=now),
+        Visit(patient_id=patient.id, doctor_id=first, chief_complaint="Головная боль", visit_date=at(10),
+              created_by=first, updated_at=now),
+    ])
+    db.commit()
+
+    rows = db.execute(build_calendar_query([first, second, idle], at(0), at(0, day=4))).all()
+    calendar = group_calendar(rows, [first, second, idle])
+
+    assert [(doctor.doctor_id, doctor.doctor_name) for doctor in calendar] == [
+        (first, "Врач 1"), (second, "Врач 2"), (idle, None),
+    ]
+    entries = calendar[0].entries
+    # SQLite возвращает время без пояса
+    assert [(entry.kind, as_utc(entry.starts_at)) for entry in entries] == [
+        ("appointment", at(9)), ("visit", at(10)), ("appointment", at(11)),
+    ]
+    assert entries[0].visit_status == VisitStatus.IN_PROGRESS
+    assert entries[1].reason == "Головная боль" and entries[1].appointment_id is None
+    assert entries[0].patient_name == "Иванов Иван"
+    assert entries[0].patient_phone == "+998901234567"
+    assert calendar[2].entries == []
+
+    # Изменение данных меняет ETag
+    etag = calendar_etag(rows)
+    assert calendar_etag(db.execute(build_calendar_query([first, second, idle], at(0), at(0, day=4))).all()) == etag
+    patient.phone = "+998907654321"
+    db.commit()
+    assert calendar_etag(db.execute(build_calendar_query([first, second, idle], at(0), at(0, day=4))).all()) != etag
+
+
+def test_etag_matches():
+    """Test If-None-Match lists, * and weak comparison"""
+    etag = 'W/"abc"'
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"xyz", "abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"xyz"', etag)
+    assert not etag_matches(None, etag)
+
+
+class FakeCalendarRepository:
+    """Calendar rows from memory; records the requested period"""
+
+    def __init__(self):
+        self.periods = []
+
+    async def get_calendar_rows(self, doctor_ids, start, end):
+        self.periods.append((start, end))
+        return []
+
+
+def test_calendar_accepts_mixed_timezone_bounds():
+    """Test an aware and a naive bound are both normalized to UTC"""
+    service = AppointmentsService(None)
+    service.repository = FakeCalendarRepository()
+
+    calendar, _ = asyncio.run(service.get_calendar(
+        [1], datetime(2024, 6, 3, 8, tzinfo=timezone.utc), datetime(2024, 6, 3, 20)
+    ))
+
+    utc = timezone.utc
+    assert service.repository.periods == [(datetime(2024, 6, 3, 8, tzinfo=utc), datetime(2024, 6, 3, 20, tzinfo=utc))]
+    assert calendar.date_to == datetime(2024, 6, 3, 20, tzinfo=utc)
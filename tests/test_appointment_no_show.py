@@ -0,0 +1,73 @@
+"""
+Unit tests for the no-show sweep
+"""
+import pytest
+from click.testing import CliRunner
+from pydantic import ValidationError
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings
+from app.modules.appointments.models import Appointment, AppointmentStatus, AppointmentType
+from app.modules.appointments.repository import past_due_conditions
+from app.modules.visits.models import Visit
+from manage import cli
+
+
+def test_past_due_conditions_match_partial_index(at):
+    """Test statuses are inlined like the partial index WHERE and the start is bounded"""
+    query = select(Appointment.id).where(*past_due_conditions(at(12)))
+    sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}))
+
+    assert "appointments.status IN ('SCHEDULED', 'CONFIRMED')" in sql
+    assert "appointments.scheduled_date < " in sql and "appointments.ends_at < " in sql
+    assert "NOT (EXISTS (SELECT * \nFROM visits \nWHERE visits.appointment_id = appointments.id))" in sql
+
+
+def test_past_due_appointments_become_no_show(db: Session, at, patient, doctor):
+    """Test only waiting appointments that ended before the cutoff without a visit become NO_SHOW"""
+    now = at(8)
+
+    def appointment(start, status=AppointmentStatus.SCHEDULED, duration=30):
+        return Appointment(patient_id=patient.id, doctor_id=doctor.id, appointment_type=AppointmentType.CONSULTATION,
+                           status=status, scheduled_date=start, duration_minutes=duration, created_by=doctor.id,
+                           updated_at=now)
+
+    missed = appointment(at(9))
+    confirmed = appointment(at(10), AppointmentStatus.CONFIRMED)
+    running = appointment(at(11), duration=120)       # начался, но еще не закончился
+    completed = appointment(at(9, 30), AppointmentStatus.COMPLETED)
+    cancelled = appointment(at(10, 30), AppointmentStatus.CANCELLED)
+    future = appointment(at(13))
+    attended = appointment(at(8))                   # визит открыт, статус записи не менялся
+    db.add_all([missed, confirmed, running, completed, cancelled, future, attended])
+    db.flush()
+    db.add(Visit(patient_id=patient.id, doctor_id=doctor.id, appointment_id=attended.id, visit_date=at(8, 5),
+                 created_by=doctor.id, updated_at=now))
+    db.commit()
+
+    result = db.execute(
+        update(Appointment).where(*past_due_conditions(at(12)))
+        .values(status=AppointmentStatus.NO_SHOW)
+        .returning(Appointment.id)
+    )
+    assert sorted(result.scalars()) == sorted([missed.id, confirmed.id])
+    db.commit()
+
+    statuses = dict(db.execute(select(Appointment.id, Appointment.status)).all())
+    assert statuses[running.id] == AppointmentStatus.SCHEDULED
+    assert statuses[completed.id] == AppointmentStatus.COMPLETED
+    assert statuses[cancelled.id] == AppointmentStatus.CANCELLED
+    assert statuses[future.id] == AppointmentStatus.SCHEDULED
+    assert statuses[attended.id] == AppointmentStatus.SCHEDULED
+
+
+def test_negative_grace_is_rejected():
+    """Test a negative grace period is rejected by the CLI and by the settings"""
+    result = CliRunner().invoke(cli, ["mark-no-show", "--grace-minutes", "-5"])
+    assert result.exit_code == 2
+    assert "--grace-minutes" in result.output
+
+    with pytest.raises(ValidationError):
+        Settings(database_url="postgresql://localhost/test", secret_key="x", appointment_no_show_grace_minutes=-5)
@@ -0,0 +1,84 @@
+"""
+Unit tests for recurring appointment series
+"""
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.modules.appointments.availability import DayIntervals
+from app.modules.appointments.models import Appointment, AppointmentSeries, AppointmentStatus, AppointmentType
+from app.modules.appointments.series import (
+    MAX_OCCURRENCES, build_following_update, expand_rrule, find_conflicts, occurrence_intervals, self_overlaps,
+    series_rows,
+)
+
+
+def test_expand_rrule_in_clinic_timezone(at):
+    """Test weekday recurrences keep the local time across DST changes"""
+    starts = expand_rrule("RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR;COUNT=4", at(4), ZoneInfo("Asia/Tashkent"))
+    assert starts == [at(4), at(4, day=5), at(4, day=7), at(4, day=10)]
+
+    berlin = ZoneInfo("Europe/Berlin")
+    starts = expand_rrule("FREQ=WEEKLY;COUNT=2", datetime(2024, 3, 25, 9, tzinfo=berlin), berlin)
+    assert [start.astimezone(berlin).hour for start in starts] == [9, 9]
+    assert starts[0] == datetime(2024, 3, 25, 8, tzinfo=timezone.utc)
+    assert starts[1] == datetime(2024, 4, 1, 7, tzinfo=timezone.utc)
+
+
+def test_expand_rrule_rejects_unbounded_rules(at):
+    """Test rules without COUNT/UNTIL or with too many occurrences are rejected"""
+    with pytest.raises(ValueError):
+        expand_rrule("FREQ=DAILY", at(9), ZoneInfo("UTC"))
+    with pytest.raises(ValueError):
+        expand_rrule(f"FREQ=DAILY;COUNT={MAX_OCCURRENCES + 1}", at(9), ZoneInfo("UTC"))
+    with pytest.raises(ValueError):
+        expand_rrule("FREQ=SOMETIMES;COUNT=3", at(9), ZoneInfo("UTC"))
+
+
+def test_conflicts_against_loaded_intervals(at):
+    """Test all occurrences are checked against intervals loaded in one query"""
+    intervals = occurrence_intervals([at(9), at(9, day=4), at(9, day=5)], 30)
+    busy = DayIntervals([(at(9, 15, day=4), at(10, day=4), 7), (at(8), at(9), 8)])
+
+    assert find_conflicts(intervals, busy) == [at(9, day=4)]
+    assert not self_overlaps(intervals)
+    assert self_overlaps(occurrence_intervals([at(9), at(9, 20)], 30))
+
+
+def test_following_update_is_single_statement(at):
+    """Test shifting "this and following" is one UPDATE with RETURNING intervals"""
+    query = build_following_update(5, at(9), shift=timedelta(hours=1), duration_minutes=45)
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("UPDATE appointments SET scheduled_date=(appointments.scheduled_date + ")
+    # SET видит старые значения строки: окончание = старое начало + сдвиг + новая продолжительность
+    assert "ends_at=(appointments.scheduled_date + %(scheduled_date_1)s + %(param_1)s)" in sql
+    assert "appointments.series_id = " in sql and "appointments.scheduled_date >= " in sql
+    assert "RETURNING appointments.id, appointments.doctor_id, appointments.scheduled_date, appointments.ends_at" in sql
+
+
+def test_series_rows_batch_insert(db: Session, at, patient, doctor):
+    """Test series appointments are inserted in one batch with computed end times"""
+    now = at(8, day=1)
+    series = AppointmentSeries(patient_id=patient.id, doctor_id=doctor.id, appointment_type=AppointmentType.PROCEDURE,
+                               rrule="FREQ=DAILY;COUNT=3", starts_at=at(9), duration_minutes=40, created_by=doctor.id,
+                               updated_at=now)
+    db.add(series)
+    db.flush()
+
+    values = {"patient_id": patient.id, "doctor_id": doctor.id, "appointment_type": AppointmentType.PROCEDURE,
+              "status": AppointmentStatus.SCHEDULED, "duration_minutes": 40, "created_by": doctor.id, "updated_at": now}
+    intervals = occurrence_intervals([at(9), at(9, day=4), at(9, day=5)], 40)
+    db.execute(insert(Appointment), series_rows(series.id, values, intervals))
+    db.commit()
+
+    rows = db.execute(
+        select(Appointment.scheduled_date, Appointment.ends_at).where(Appointment.series_id == series.id)
+        .order_by(Appointment.scheduled_date)
+    ).all()
+    assert [(start.day, end - start) for start, end in rows] == [(day, timedelta(minutes=40)) for day in (3, 4, 5)]
+    assert [appointment.scheduled_date.day for appointment in db.get(AppointmentSeries, series.id).appointments] == [3, 4, 5]
@@ -0,0 +1,87 @@
+"""
+Unit tests for the doctors' free-slot finder
+"""
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.dialects import postgresql
+
+from app.modules.appointments.availability import build_busy_query
+from app.modules.appointments.slots import find_slots, free_intervals, group_busy
+from app.modules.schedules.registry import CompiledSchedule, time_mask
+
+UTC = ZoneInfo("UTC")
+# Пн-Пт 9:00-18:00
+WEEKLY = [time_mask(time(9), time(18))] * 5 + [0, 0]
+
+
+def clinic_windows(tz: ZoneInfo = UTC):
+    schedule = CompiledSchedule(WEEKLY)
+    return lambda doctor_id, start, end: schedule.windows(start, end, tz)
+
+
+def test_free_intervals_with_overlapping_busy(at):
+    """Test overlapping and nested busy intervals are subtracted"""
+    windows = [(at(9), at(13)), (at(14), at(18))]
+    busy = [
+        (at(8), at(9, 30)),        # начался до окна
+        (at(10), at(11)),
+        (at(10, 30), at(10, 45)),  # вложен в предыдущий
+        (at(12, 30), at(14, 15)),  # через перерыв
+    ]
+
+    assert list(free_intervals(windows, busy)) == [
+        (at(9, 30), at(10)), (at(11), at(12, 30)), (at(14, 15), at(18)),
+    ]
+
+
+def test_working_windows_respect_timezone_and_weekdays(at):
+    """Test working windows use the clinic timezone and skip days off"""
+    windows_for = clinic_windows(ZoneInfo("Asia/Tashkent"))
+
+    # Пятница 2024-06-07 - понедельник 2024-06-10, UTC+5
+    windows = list(windows_for(1, at(0, day=7), at(0, day=11)))
+
+    assert windows == [(at(4, day=7), at(13, day=7)), (at(4, day=10), at(13, day=10))]
+
+
+def test_find_slots_earliest_across_doctors(at):
+    """Test the first N slots across doctors follow the step grid and skip busy time"""
+    busy = group_busy([
+        (1, datetime(2024, 6, 3, 9), datetime(2024, 6, 3, 10, 10)),  # время без пояса считается UTC
+        (2, at(9), at(9, 30)),
+    ])
+
+    slots = find_slots(busy, [1, 2], at(8, 50), at(18), 30, 4, clinic_windows(), 15)
+
+    assert [(slot.doctor_id, slot.start) for slot in slots] == [
+        (2, at(9, 30)), (2, at(9, 45)), (2, at(10)), (1, at(10, 15)),
+    ]
+    assert all(slot.end - slot.start == timedelta(minutes=30) for slot in slots)
+
+
+def test_busy_query_single_range_scan(at):
+    """Test busy intervals of all doctors are loaded in one query"""
+    sql = str(build_busy_query([1, 2], at(9), at(18)).compile(dialect=postgresql.dialect()))
+
+    assert "appointments.doctor_id IN" in sql
+    assert "tstzrange(appointments.scheduled_date, appointments.ends_at, '[)') &&" in sql
+    assert "ORDER BY appointments.doctor_id, appointments.scheduled_date" in sql
+
+
+def test_find_slots_fully_booked_doctors(at):
+    """Test 100 fully booked doctors over 30 days yield only the free half hours (timing: scripts/bench_slots.py)"""
+    start, end = at(0, day=1), at(0, day=1) + timedelta(days=30)
+    rows = []
+    for doctor_id in range(1, 101):
+        day = start
+        while day < end:
+            # Занято все, кроме последнего получаса дня
+            rows.append((doctor_id, day.replace(hour=9), day.replace(hour=17, minute=30)))
+            day += timedelta(days=1)
+
+    slots = find_slots(group_busy(rows), list(range(1, 101)), start, end, 30, 1000, clinic_windows(), 15)
+
+    assert len(slots) == 1000
+    assert slots[0].start == at(17, 30)
+    assert all(slot.start.hour == 17 and slot.start.minute == 30 for slot in slots)
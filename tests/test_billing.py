@@ -0,0 +1,203 @@
+"""
+Unit tests for billing module
+"""
+import asyncio
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.batch import iter_chunked_update
+from app.modules.billing.models import Billing, BillingStatus, PatientBalance
+from app.modules.billing.repository import BillingRepository
+from app.modules.billing.schemas import BillingBulkCreate, BillingBulkPay, BillingCreate
+from app.modules.billing.service import BillingService
+from app.modules.patients.models import Patient
+
+
+def _billing(patient_id=1, amount="100.00", status=BillingStatus.PENDING):
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return Billing(
+        patient_id=patient_id, amount=Decimal(amount), status=status, created_by=1,
+        created_at=created, updated_at=created
+    )
+
+
+def test_chunked_update_commits_each_chunk(db: Session, async_db):
+    """Test rows are updated in chunks with a commit after each one"""
+    db.add_all([_billing() for _ in range(5)] + [_billing(status=BillingStatus.PAID)])
+    db.commit()
+
+    statements = []
+    commits = []
+    execute, commit = async_db.execute, async_db.commit
+
+    async def recording_execute(statement, *args, **kwargs):
+        statements.append(statement)
+        return await execute(statement, *args, **kwargs)
+
+    async def counting_commit():
+        commits.append(len(statements))
+        await commit()
+
+    async_db.execute, async_db.commit = recording_execute, counting_commit
+
+    async def run():
+        return [
+            [row.id for row in rows]
+            async for rows in iter_chunked_update(
+                async_db, Billing,
+                where=[Billing.status == BillingStatus.PENDING],
+                values={"status": BillingStatus.OVERDUE},
+                returning=[Billing.id],
+                chunk_size=2,
+            )
+        ]
+
+    chunks = asyncio.run(run())
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert commits == [1, 2, 3]
+    statuses = db.scalars(select(Billing.status).order_by(Billing.id)).all()
+    assert statuses == [BillingStatus.OVERDUE] * 5 + [BillingStatus.PAID]
+
+    sql = str(statements[0].compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "RETURNING billing.id" in sql
+
+
+
+def _record(billing_id, patient_id=1, amount="10.00", status="pending", payment_date=None, description=None):
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return SimpleNamespace(
+        id=billing_id, patient_id=patient_id, appointment_id=None, prescription_id=None, amount=Decimal(amount),
+        status=status, description=description, payment_date=payment_date, created_by=1,
+        created_at=created, updated_at=None
+    )
+
+
+class FakeBulkRepository:
+    """Billing records and referenced ids from memory instead of the database"""
+
+    def __init__(self, existing=None, statuses=None):
+        self.existing = existing or {}
+        self.statuses = statuses or {}
+        self.created_rows = []
+
+    async def get_existing_ids(self, model, ids):
+        return set(ids) & self.existing.get(model.__tablename__, set())
+
+    async def create_many(self, rows):
+        self.created_rows.extend(rows)
+        return [
+            _record(index, row["patient_id"], str(row["amount"]), description=row["description"])
+            for index, row in enumerate(rows, start=1)
+        ]
+
+    async def mark_paid_many(self, billing_ids, payment_date):
+        paid = [billing_id for billing_id in billing_ids if self.statuses.get(billing_id) == BillingStatus.PENDING]
+        for billing_id in paid:
+            self.statuses[billing_id] = BillingStatus.PAID
+        return [_record(billing_id, status="paid", payment_date=payment_date) for billing_id in paid]
+
+    async def get_statuses(self, billing_ids):
+        return {billing_id: self.statuses[billing_id] for billing_id in billing_ids if billing_id in self.statuses}
+
+
+def test_bulk_create_reports_item_errors():
+    """Test valid items are created in one batch and invalid ones are reported by position"""
+    repository = FakeBulkRepository(existing={"patients": {1}, "appointments": {5}})
+    service = BillingService(None)
+    service.repository = repository
+    bulk = BillingBulkCreate(items=[
+        BillingCreate(patient_id=1, amount=Decimal("100.00"), appointment_id=5),
+        BillingCreate(patient_id=999, amount=Decimal("50.00")),
+        BillingCreate(patient_id=1, amount=Decimal("20.00"), appointment_id=777),
+        BillingCreate(patient_id=1, amount=Decimal("30.00"), prescription_id=8),
+        BillingCreate(patient_id=1, amount=Decimal("40.00"), description="Анализы"),
+    ])
+
+    result = asyncio.run(service.create_billing_bulk(bulk, created_by=3))
+
+    assert [item.amount for item in result.items] == [Decimal("100.00"), Decimal("40.00")]
+    assert [(error.index, error.detail) for error in result.errors] == [
+        (1, "Patient not found"), (2, "Appointment not found"), (3, "Prescription not found")
+    ]
+    assert [row["created_by"] for row in repository.created_rows] == [3, 3]
+
+
+def test_bulk_pay_reports_item_errors():
+    """Test unpayable and missing records are reported by id, duplicates are ignored"""
+    service = BillingService(None)
+    service.repository = FakeBulkRepository(
+        statuses={1: BillingStatus.PENDING, 2: BillingStatus.CANCELLED, 3: BillingStatus.PENDING}
+    )
+
+    result = asyncio.run(service.mark_as_paid_bulk(BillingBulkPay(ids=[1, 2, 1, 4, 3])))
+
+    assert [item.id for item in result.items] == [1, 3]
+    assert [(error.id, error.detail) for error in result.errors] == [
+        (2, "Billing record cannot be paid in status 'cancelled'"),
+        (4, "Billing record not found"),
+    ]
+
+
+def test_refresh_balances_upserts_totals(db: Session, async_db):
+    """Test balances are recomputed from invoices and overwritten on refresh"""
+    now = datetime(2024, 1, 1)
+    patients = [
+        Patient(first_name="Иван", last_name="Иванов", date_of_birth=date(1990, 1, 1), gender="male", updated_at=now),
+        Patient(first_name="Анна", last_name="Петрова", date_of_birth=date(1985, 5, 5), gender="female", updated_at=now),
+    ]
+    db.add_all(patients)
+    db.flush()
+    debtor, newcomer = patients[0].id, patients[1].id
+    db.add_all([
+        _billing(debtor, "100.00"),
+        _billing(debtor, "40.50", BillingStatus.OVERDUE),
+        _billing(debtor, "30.00", BillingStatus.PAID),
+        _billing(debtor, "999.00", BillingStatus.CANCELLED),
+    ])
+    db.commit()
+    repository = BillingRepository(async_db)
+
+    def balances():
+        return {
+            row.patient_id: (row.outstanding, row.overdue, row.paid, row.invoices_count)
+            for row in db.scalars(select(PatientBalance).execution_options(populate_existing=True))
+        }
+
+    asyncio.run(repository.refresh_balances([debtor, newcomer, debtor]))
+    db.commit()
+    assert balances() == {
+        debtor: (Decimal("140.50"), Decimal("40.50"), Decimal("30.00"), 4),
+        newcomer: (Decimal("0"), Decimal("0"), Decimal("0"), 0),
+    }
+
+    db.add(_billing(newcomer, "15.00"))
+    db.execute(
+        Billing.__table__.update().where(Billing.status == BillingStatus.PENDING, Billing.patient_id == debtor)
+        .values(status=BillingStatus.PAID)
+    )
+    db.commit()
+    asyncio.run(repository.refresh_balances([debtor, newcomer]))
+    db.commit()
+    assert balances() == {
+        debtor: (Decimal("40.50"), Decimal("40.50"), Decimal("130.00"), 4),
+        newcomer: (Decimal("15.00"), Decimal("0"), Decimal("0"), 1),
+    }
+
+
+def test_balance_of_missing_patient_is_none(db: Session, async_db):
+    """Test a patient without invoices has a zero balance and an unknown patient has none"""
+    patient = Patient(first_name="Иван", last_name="Иванов", date_of_birth=date(1990, 1, 1), gender="male",
+                      updated_at=datetime(2024, 1, 1))
+    db.add(patient)
+    db.commit()
+    service = BillingService(async_db)
+
+    assert asyncio.run(service.get_patient_balance(patient.id)).outstanding == Decimal("0")
+    assert asyncio.run(service.get_patient_balance(patient.id + 1)) is None
@@ -0,0 +1,54 @@
+"""
+Unit tests for the LRU cache with TTL
+"""
+from app.core.cache import TTLCache
+
+
+class FakeClock:
+    """Controllable clock for TTL checks"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test the least recently used entry is evicted when full"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    assert cache.get(1) == "a"
+    cache.set(3, "c")
+
+    assert 2 not in cache
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+    assert len(cache) == 2
+
+
+def test_ttl_cache_expires_entries():
+    """Test entries older than ttl are not returned"""
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("patient", 42)
+    clock.now = 4.9
+    assert cache.get("patient") == 42
+    clock.now = 5.0
+    assert cache.get("patient") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_delete_and_disabled():
+    """Test entry deletion and a zero-size cache"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set(1, "a")
+    cache.delete(1)
+    cache.delete(1)
+    assert cache.get(1) is None
+    assert cache.misses == 1
+
+    disabled = TTLCache(maxsize=0, ttl=60)
+    disabled.set(1, "a")
+    assert 1 not in disabled
@@ -0,0 +1,46 @@
+"""
+Unit tests for diff-based child collection updates
+"""
+from types import SimpleNamespace
+
+from app.db.collections import diff_collection
+from app.modules.visits.schemas import VisitUpdate
+from app.modules.visits.service import DIAGNOSIS_FIELDS, DIAGNOSIS_KEY
+
+
+def diagnosis(row_id, icd_code, name, is_primary="N"):
+    return SimpleNamespace(id=row_id, icd_code=icd_code, diagnosis_name=name, is_primary=is_primary)
+
+
+def test_unchanged_collection_is_empty_diff():
+    """Test an unchanged list produces no database writes"""
+    existing = [diagnosis(1, "J06.9", "ОРВИ", "Y"), diagnosis(2, "R51", "Головная боль")]
+    desired = [
+        {"icd_code": "R51", "diagnosis_name": "Головная боль", "is_primary": "N"},
+        {"icd_code": "J06.9", "diagnosis_name": "ОРВИ", "is_primary": "Y"},
+    ]
+
+    assert diff_collection(existing, desired, DIAGNOSIS_KEY, DIAGNOSIS_FIELDS).empty
+
+
+def test_diff_inserts_updates_and_deletes():
+    """Test only changed fields are updated, extra rows deleted and new rows inserted"""
+    existing = [diagnosis(1, "J06.9", "ОРВИ", "Y"), diagnosis(2, "R51", "Головная боль")]
+    desired = [
+        {"icd_code": "J06.9", "diagnosis_name": "ОРВИ", "is_primary": "N"},
+        {"icd_code": "I10", "diagnosis_name": "Гипертензия", "is_primary": "Y"},
+    ]
+
+    diff = diff_collection(existing, desired, DIAGNOSIS_KEY, DIAGNOSIS_FIELDS)
+
+    assert diff.updates == [{"id": 1, "is_primary": "N"}]
+    assert diff.deletes == [2]
+    assert diff.inserts == [{"icd_code": "I10", "diagnosis_name": "Гипертензия", "is_primary": "Y"}]
+
+
+def test_partial_visit_update_keeps_collections():
+    """Test a partial visit update leaves diagnoses and treatments untouched"""
+    update = VisitUpdate(plan="Контроль через неделю")
+
+    assert update.diagnoses is None
+    assert update.treatments is None
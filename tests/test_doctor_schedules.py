@@ -0,0 +1,117 @@
+"""
+Unit tests for compiled doctor schedules
+"""
+from datetime import date, time, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.modules.schedules.models import DoctorSchedule
+from app.modules.schedules.registry import ScheduleRegistry, ScheduleRule, mask_runs, time_mask
+from app.modules.schedules.service import SchedulesService
+
+MONDAY = date(2024, 6, 3)
+
+
+def weekly(doctor_id, weekday, start, end, available="Y"):
+    return ScheduleRule(doctor_id, weekday, None, start, end, available)
+
+
+def dated(doctor_id, day, start=None, end=None, available="N"):
+    return ScheduleRule(doctor_id, None, day, start, end, available)
+
+
+def make_registry(rules) -> ScheduleRegistry:
+    registry = ScheduleRegistry()
+    registry.tz = timezone.utc
+    registry.build(rules)
+    return registry
+
+
+def test_time_mask_rounds_partial_slots_outward():
+    """Test partial five-minute slots at the edges are included in the mask"""
+    assert list(mask_runs(time_mask(time(9), time(10)))) == [(108, 120)]
+    assert list(mask_runs(time_mask(time(9, 3), time(9, 7)))) == [(108, 110)]
+    assert list(mask_runs(time_mask(time(9), time(12)) & ~time_mask(time(10), time(11)))) == [(108, 120), (132, 144)]
+
+
+def test_template_with_break_and_day_off(at):
+    """Test a template with a break and a day off on a date"""
+    registry = make_registry([
+        weekly(1, 0, time(9), time(13)),
+        weekly(1, 0, time(14), time(18)),
+        weekly(1, 0, time(11), time(11, 30), available="N"),  # планерка
+        dated(1, date(2024, 6, 10)),                             # выходной в следующий понедельник
+    ])
+
+    assert registry.is_working(1, at(9), at(11))
+    assert not registry.is_working(1, at(10, 45), at(11, 15))
+    assert not registry.is_working(1, at(12, 30), at(14, 30))
+    assert not registry.is_working(1, at(10), at(10, 30, day=4))  # вторник не в шаблоне
+    assert not registry.is_working(1, at(10, day=10), at(10, 30, day=10))
+    # Врач без правил работает по часам клиники
+    assert registry.is_working(2, at(9), at(18))
+    assert not registry.is_working(2, at(22), at(23))
+
+
+def test_date_exception_replaces_hours(at):
+    """Test date intervals replace the weekday template"""
+    registry = make_registry([
+        weekly(1, 0, time(9), time(18)),
+        dated(1, MONDAY, time(15), time(20), available="Y"),
+    ])
+
+    assert registry.is_working(1, at(19), at(20))
+    assert not registry.is_working(1, at(9), at(10))
+    assert list(registry.windows(1, at(0), at(0, day=4))) == [(at(15), at(20))]
+
+
+def test_date_exception_without_template_uses_clinic_hours(at):
+    """Test a doctor with only a date exception keeps clinic hours on other days"""
+    registry = make_registry([dated(1, MONDAY, time(12), time(13))])
+    tuesday = (at(0, day=4), at(0, day=5))
+
+    assert registry.is_working(1, at(9, day=4), at(18, day=4))
+    assert not registry.is_working(1, at(3, day=4), at(4, day=4))
+    assert not registry.is_working(1, at(12), at(12, 30))
+    assert list(registry.windows(1, *tuesday)) == [(at(9, day=4), at(18, day=4))]
+    assert list(registry.windows(1, *tuesday)) == list(registry.windows(2, *tuesday))
+    assert list(registry.windows(1, at(0), at(0, day=4))) == [(at(9), at(12)), (at(13), at(18))]
+
+
+def test_incremental_update_keeps_date_exceptions(at):
+    """Test a template change recompiles the weekday and its dates without a full reload"""
+    registry = make_registry([
+        weekly(1, 0, time(9), time(18)),
+        dated(1, MONDAY, time(12), time(13)),
+    ])
+    assert registry.is_working(1, at(16), at(17))
+
+    registry.set_weekday(1, 0, [weekly(1, 0, time(8), time(14))])
+    assert registry.is_working(1, at(8), at(9))
+    assert not registry.is_working(1, at(12), at(12, 30))   # перерыв на дату сохранился
+    assert not registry.is_working(1, at(16), at(17))
+
+    # Правил не осталось - часы клиники
+    registry.set_weekday(1, 0, [])
+    registry.set_date(1, MONDAY, [])
+    assert 1 not in registry
+    assert registry.is_working(1, at(9), at(18))
+    assert not registry.is_working(1, at(22), at(23))
+
+
+def test_validate_rule():
+    """Test a rule sets either a weekday or a date, and only days off omit times"""
+    SchedulesService.validate_rule(DoctorSchedule(weekday=0, start_time=time(9), end_time=time(18), is_available="Y"))
+    SchedulesService.validate_rule(DoctorSchedule(schedule_date=MONDAY, is_available="N"))
+
+    invalid = [
+        DoctorSchedule(weekday=0, schedule_date=MONDAY, start_time=time(9), end_time=time(18), is_available="Y"),
+        DoctorSchedule(weekday=0, is_available="N"),
+        DoctorSchedule(weekday=0, start_time=time(18), end_time=time(9), is_available="Y"),
+        DoctorSchedule(schedule_date=MONDAY, start_time=time(9), is_available="Y"),
+    ]
+    for rule in invalid:
+        with pytest.raises(HTTPException) as exc:
+            SchedulesService.validate_rule(rule)
+        assert exc.value.status_code == 400
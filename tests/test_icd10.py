@@ -0,0 +1,84 @@
+"""
+Unit tests for the ICD-10 catalog
+"""
+import io
+
+import pytest
+from fastapi import HTTPException
+
+from app.modules.icd10.catalog import Icd10Catalog, Icd10Entry, icd10_catalog, normalize_code
+from app.modules.icd10.loader import iter_rows, parse_entries
+from app.modules.visits.schemas import DiagnosisBase
+from app.modules.visits.service import check_icd_codes, diagnosis_values
+
+ENTRIES = [
+    Icd10Entry("J06.9", "Острая инфекция верхних дыхательных путей неуточненная"),
+    Icd10Entry("J06.0", "Острый ларингофарингит"),
+    Icd10Entry("J20.9", "Острый бронхит неуточненный"),
+    Icd10Entry("I10", "Эссенциальная (первичная) гипертензия"),
+    Icd10Entry("E11.9", "Инсулиннезависимый сахарный диабет без осложнений"),
+]
+
+
+def make_catalog() -> Icd10Catalog:
+    catalog = Icd10Catalog()
+    catalog.build(ENTRIES)
+    return catalog
+
+
+def test_normalize_code():
+    """Test codes are upper-cased and get the dot after the category"""
+    assert normalize_code(" j069 ") == "J06.9"
+    assert normalize_code("J06.9") == "J06.9"
+    assert normalize_code("i10") == "I10"
+    assert normalize_code("S72,00") == "S72.00"
+    assert normalize_code("J06.") == "J06"
+
+
+def test_search_by_code_prefix():
+    """Test code prefixes match with or without the dot, ordered by code"""
+    catalog = make_catalog()
+
+    assert [entry.code for entry in catalog.search("j06")] == ["J06.0", "J06.9"]
+    assert [entry.code for entry in catalog.search("J069")] == ["J06.9"]
+    assert [entry.code for entry in catalog.search("J")] == ["J06.0", "J06.9", "J20.9"]
+
+
+def test_search_by_title_words():
+    """Test every query word must prefix a word of the title"""
+    catalog = make_catalog()
+
+    assert [entry.code for entry in catalog.search("остр бронх")] == ["J20.9"]
+    assert [entry.code for entry in catalog.search("острый")] == ["J06.0", "J20.9"]
+    assert [entry.code for entry in catalog.search("гипертенз")] == ["I10"]
+    assert catalog.search("остр диабет") == []
+    assert catalog.get("j069").title.startswith("Острая инфекция")
+
+
+def test_parse_file_rows():
+    """Test header, invalid and duplicate rows are handled while parsing"""
+    stream = io.StringIO("code;title\nj06.9;Старое название\nJ069;ОРВИ\nXYZ;Мусор\nI10;\n")
+    entries, skipped = parse_entries(iter_rows(stream))
+
+    assert entries == [("J06.9", "ОРВИ")]
+    assert skipped == 3
+
+    stream = io.StringIO("A00.0 Холера, вызванная холерным вибрионом\n")
+    assert list(iter_rows(stream)) == [("A00.0", "Холера, вызванная холерным вибрионом")]
+
+
+def test_diagnoses_checked_against_loaded_catalog():
+    """Test diagnosis codes are normalized, named and validated by the catalog"""
+    icd10_catalog.build(ENTRIES)
+    try:
+        values = diagnosis_values(DiagnosisBase(icd_code="j209"))
+        assert values["icd_code"] == "J20.9"
+        assert values["diagnosis_name"] == "Острый бронхит неуточненный"
+
+        check_icd_codes([values])
+        with pytest.raises(HTTPException) as exc:
+            check_icd_codes([{"icd_code": "Z99.9"}])
+        assert exc.value.status_code == 400
+    finally:
+        icd10_catalog.build([])
+        icd10_catalog.ready = False
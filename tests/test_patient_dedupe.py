@@ -0,0 +1,131 @@
+"""
+Unit tests for duplicate patient detection
+"""
+import asyncio
+from datetime import date, datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.modules.appointments.models import Appointment, AppointmentSeries, AppointmentType
+from app.modules.auth.models import User
+from app.modules.patients.models import Patient
+from app.modules.patients.service import PatientsService
+from app.modules.patients.dedupe import (
+    DedupeRecord, soundex, name_similarity, blocking_keys, find_duplicates, match_patient, chunk_blocks,
+    build_blocks
+)
+
+
+def _record(id, last_name, first_name, dob, phone=None, middle_name=None):
+    return DedupeRecord(id, last_name, first_name, middle_name, dob, phone)
+
+
+def test_soundex_cyrillic():
+    """Test soundex groups similar spellings"""
+    assert soundex("Иванов") == soundex("Иваноф")
+    assert soundex("Петров") != soundex("Иванов")
+    assert soundex("") == ""
+
+
+def test_name_similarity():
+    """Test trigram similarity"""
+    assert name_similarity("Иванов", "иванов") == 1.0
+    assert name_similarity("Иванов", "Иваном") > 0.4
+    assert name_similarity("Иванов", None) == 0.0
+
+
+def test_blocking_keys():
+    """Test blocking keys use local phone and date of birth with soundex"""
+    keys = blocking_keys(_record(1, "Иванов", "Иван", date(1990, 1, 1), "+7 (999) 123-45-67"))
+
+    assert ("phone", "9991234567") in keys
+    assert ("dob", date(1990, 1, 1), soundex("Иванов")) in keys
+
+
+def test_find_duplicates():
+    """Test duplicates are found within blocks and ranked by score"""
+    records = [
+        _record(1, "Иванов", "Иван", date(1990, 1, 1), "+7 999 123-45-67"),
+        _record(2, "Иванов", "Иван", date(1990, 1, 1), "89991234567"),
+        _record(3, "Иваноф", "Иван", date(1990, 1, 1)),
+        _record(4, "Петрова", "Анна", date(1990, 1, 1), "+7 999 123-45-67"),
+        _record(5, "Сидоров", "Петр", date(1975, 3, 3)),
+    ]
+    matches = find_duplicates(records)
+    pairs = [(match.patient_id, match.duplicate_id) for match in matches]
+
+    assert pairs[0] == (1, 2)
+    assert matches[0].score == 1.0
+    assert (1, 3) in pairs
+    assert not any(5 in pair for pair in pairs)
+    # Общий телефон семьи без совпадения имени - не дубликат
+    assert (1, 4) not in pairs
+
+
+def test_match_patient():
+    """Test single patient matching keeps requested patient first"""
+    record = _record(7, "Иванов", "Иван", date(1990, 1, 1))
+    candidates = [_record(2, "Иванов", "Иван", date(1990, 1, 1)), _record(3, "Смирнов", "Олег", date(1990, 1, 1))]
+
+    matches = match_patient(record, candidates)
+
+    assert [(match.patient_id, match.duplicate_id) for match in matches] == [(7, 2)]
+
+
+def test_chunk_blocks_balances_work():
+    """Test blocks are split into chunks without losing any"""
+    records = [_record(i, "Иванов", "Иван", date(1990, 1, i % 28 + 1)) for i in range(1, 100)]
+    blocks = build_blocks(records)
+    chunks = chunk_blocks(blocks, 4)
+
+    assert len(chunks) == 4
+    assert sum(len(chunk) for chunk in chunks) == len(blocks)
+
+
+def test_merge_moves_references(db: Session, async_db):
+    """Test merge moves appointments and appointment series to the kept patient"""
+    now = datetime(2024, 6, 1)
+    start = datetime(2024, 6, 3, 9, tzinfo=timezone.utc)
+    doctor = User(username="doctor", email="doctor@example.com", full_name="Врач", hashed_password="x", updated_at=now)
+    patient = Patient(first_name="Иван", last_name="Иванов", date_of_birth=date(1990, 1, 1), gender="male",
+                      updated_at=now)
+    duplicate = Patient(first_name="Иван", last_name="Иванов", date_of_birth=date(1990, 1, 1), gender="male",
+                        phone="+79991234567", updated_at=now)
+    db.add_all([doctor, patient, duplicate])
+    db.flush()
+    series = AppointmentSeries(patient_id=duplicate.id, doctor_id=doctor.id, appointment_type=AppointmentType.PROCEDURE,
+                               rrule="FREQ=DAILY;COUNT=1", starts_at=start, created_by=doctor.id, updated_at=now)
+    db.add(series)
+    db.flush()
+    db.add(Appointment(patient_id=duplicate.id, doctor_id=doctor.id, series_id=series.id, scheduled_date=start,
+                       appointment_type=AppointmentType.PROCEDURE, created_by=doctor.id, updated_at=now))
+    db.commit()
+
+    result = asyncio.run(PatientsService(async_db).merge_patients(patient.id, duplicate.id))
+
+    assert result.moved["appointments"] == 1
+    assert result.moved["appointment_series"] == 1
+    assert db.scalar(select(AppointmentSeries.patient_id)) == patient.id
+    assert db.scalar(select(Appointment.patient_id)) == patient.id
+    assert result.patient.phone == "+79991234567"
+    assert db.get(Patient, duplicate.id).is_active == "N"
+
+
+def test_merge_into_inactive_patient_is_conflict(db: Session, async_db):
+    """Test records are not moved into a patient that is already merged or deleted"""
+    now = datetime(2024, 6, 1)
+    kept = Patient(first_name="Иван", last_name="Иванов", date_of_birth=date(1990, 1, 1), gender="male",
+                   is_active="N", updated_at=now)
+    duplicate = Patient(first_name="Иван", last_name="Иванов", date_of_birth=date(1990, 1, 1), gender="male",
+                        updated_at=now)
+    db.add_all([kept, duplicate])
+    db.commit()
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(PatientsService(async_db).merge_patients(kept.id, duplicate.id))
+
+    assert exc.value.status_code == 409
+    assert db.get(Patient, duplicate.id).is_active == "Y"
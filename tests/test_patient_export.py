@@ -0,0 +1,43 @@
+"""
+Unit tests for patient export helpers
+"""
+import asyncio
+import gzip
+from datetime import date
+
+import pytest
+
+from app.modules.patients.export import parse_columns, gzip_stream, _encode_csv, _encode_ndjson
+from app.modules.patients.models import Gender
+
+
+def test_parse_columns():
+    """Test column selection"""
+    assert parse_columns("id, last_name") == ["id", "last_name"]
+    assert "phone" in parse_columns(None)
+
+    with pytest.raises(ValueError):
+        parse_columns("id,password")
+
+
+def test_encode_rows():
+    """Test CSV and NDJSON encoding of enum and date values"""
+    rows = [(1, date(1990, 1, 1), Gender.MALE, None)]
+    columns = ["id", "date_of_birth", "gender", "phone"]
+
+    assert _encode_csv(rows, header=columns).decode() == "id,date_of_birth,gender,phone\r\n1,1990-01-01,male,\r\n"
+    assert _encode_ndjson(rows, columns).decode() == (
+        '{"id": 1, "date_of_birth": "1990-01-01", "gender": "male", "phone": null}\n'
+    )
+
+
+def test_gzip_stream():
+    """Test on-the-fly gzip produces a valid archive"""
+    async def chunks():
+        for part in (b"id,name\n", b"1,a\n", b"2,b\n"):
+            yield part
+
+    async def collect():
+        return b"".join([chunk async for chunk in gzip_stream(chunks())])
+
+    assert gzip.decompress(asyncio.run(collect())) == b"id,name\n1,a\n2,b\n"
@@ -0,0 +1,115 @@
+"""
+Unit tests for patient import parsers
+"""
+import asyncio
+import io
+import threading
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from click.testing import CliRunner
+
+from app.modules.patients.importer import PatientImporter, detect_format, iter_csv_rows, iter_ndjson_rows
+from app.modules.patients.models import Patient
+from manage import cli
+
+
+def test_detect_format():
+    """Test format detection by file extension"""
+    assert detect_format("patients.CSV") == "csv"
+    assert detect_format("patients.jsonl") == "ndjson"
+    assert detect_format("patients.xlsx") is None
+
+
+def test_iter_csv_rows():
+    """Test CSV parsing keeps line numbers and converts empty cells to None"""
+    stream = io.StringIO(
+        "first_name,last_name,date_of_birth,gender,phone\n"
+        "Иван,Иванов,1990-01-01,male,\n"
+        "Петр,Петров,1985-05-05,male,+79991234567,extra\n"
+    )
+    rows = list(iter_csv_rows(stream))
+
+    assert rows[0] == (2, {
+        "first_name": "Иван", "last_name": "Иванов",
+        "date_of_birth": "1990-01-01", "gender": "male", "phone": None
+    })
+    assert rows[1] == (3, "Too many columns")
+
+
+def test_iter_ndjson_rows():
+    """Test NDJSON parsing reports broken lines"""
+    stream = io.StringIO(
+        '{"first_name": "Иван"}\n'
+        '\n'
+        '{broken\n'
+        '[1, 2]\n'
+    )
+    rows = list(iter_ndjson_rows(stream))
+
+    assert rows[0] == (1, {"first_name": "Иван"})
+    assert rows[1][0] == 3 and rows[1][1].startswith("Invalid JSON")
+    assert rows[2] == (4, "Expected a JSON object")
+
+
+def test_chunk_size_must_be_positive(tmp_path):
+    """Test a zero chunk size is rejected instead of importing nothing"""
+    path = tmp_path / "patients.csv"
+    path.write_text("first_name,last_name,date_of_birth,gender\n", encoding="utf-8")
+
+    result = CliRunner().invoke(cli, ["import-patients", str(path), "--chunk-size", "0"])
+    assert result.exit_code == 2
+    assert "--chunk-size" in result.output
+
+    with pytest.raises(ValueError):
+        PatientImporter(None, chunk_size=0)
+
+
+class FakeImportSession:
+    """Session with existing (phone digits, date of birth) keys that records inserts and commits"""
+
+    def __init__(self, existing):
+        self.existing = existing
+        self.inserted = []
+        self.commits = 0
+
+    async def execute(self, query):
+        return list(self.existing)
+
+    async def scalars(self, query, values):
+        patients = [Patient(id=len(self.inserted) + index, is_active="Y", **row) for index, row in enumerate(values, 1)]
+        self.inserted.extend(patients)
+        return SimpleNamespace(all=lambda: patients)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def test_import_drops_duplicates_and_inserts_chunks():
+    """Test duplicates from the database and the file are skipped and each chunk is committed"""
+    session = FakeImportSession({("79990000001", date(1990, 1, 1))})
+    stream = io.StringIO(
+        "first_name,last_name,date_of_birth,gender,phone\n"
+        "Иван,Иванов,1990-01-01,male,+7 999 000-00-01\n"
+        "Анна,Петрова,1985-05-05,female,+7 999 000-00-02\n"
+        "Анна,Петрова,1985-05-05,female,+7 (999) 000-00-02\n"
+        "Олег,Сидоров,не дата,male,\n"
+        "Петр,Орлов,1970-03-03,male,\n"
+    )
+    reader_threads = set()
+
+    def rows():
+        for row in iter_csv_rows(stream):
+            reader_threads.add(threading.get_ident())
+            yield row
+
+    result = asyncio.run(PatientImporter(session, chunk_size=2).run(rows()))
+
+    assert (result.processed, result.imported, result.duplicates, result.failed) == (5, 2, 2, 1)
+    errors = {error.row: error.detail for error in result.errors}
+    assert sorted(errors) == [2, 4, 5]
+    assert errors[2] == errors[4] == "Duplicate patient (same phone and date of birth)"
+    assert [patient.last_name for patient in session.inserted] == ["Петрова", "Орлов"]
+    assert session.commits == 2
+    assert threading.get_ident() not in reader_threads
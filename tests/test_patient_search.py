@@ -0,0 +1,43 @@
+"""
+Unit tests for patient search helpers
+"""
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.modules.patients.models import Patient
+from app.modules.patients.search import normalize_phone, tokenize, apply_search
+
+
+def test_normalize_phone():
+    """Test phone normalization"""
+    assert normalize_phone("+7 (999) 123-45-67") == "79991234567"
+    assert normalize_phone("79991234567") == "79991234567"
+    assert normalize_phone(None) == ""
+
+
+def test_tokenize_multi_token_name():
+    """Test multi-token name query"""
+    assert tokenize("Иванов  Петр") == (["иванов", "петр"], [])
+    assert tokenize("Римский-Корсаков") == (["римский-корсаков"], [])
+
+
+def test_tokenize_formatted_phone():
+    """Test formatted phone is treated as a single phone token"""
+    assert tokenize("+7 (999) 123-45-67") == ([], ["79991234567"])
+    assert tokenize("Иванов 4567") == (["иванов"], ["4567"])
+
+
+def test_apply_search_matches_all_name_parts():
+    """Test search query covers middle name and ranks by similarity"""
+    query = apply_search(select(Patient), "Иванов Петр")
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert "patients.middle_name ILIKE" in sql
+    assert "similarity(" in sql
+    assert " AND " in sql
+
+
+def test_apply_search_empty_query():
+    """Test empty query leaves statement unchanged"""
+    query = select(Patient)
+    assert apply_search(query, "  ,. ") is query
@@ -0,0 +1,58 @@
+"""
+Unit tests for patient timeline
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.modules.billing.models import Billing
+from app.modules.patients.models import Patient
+from app.modules.patients.timeline import build_timeline_query, decode_cursor, encode_cursor
+from app.modules.visits.models import Visit
+
+
+def test_cursor_roundtrip():
+    """Test cursor encoding"""
+    cursor = encode_cursor(datetime(2024, 5, 1, 10, 30), "visit", 42)
+
+    assert decode_cursor(cursor) == (datetime(2024, 5, 1, 10, 30), "visit", 42)
+    with pytest.raises(ValueError):
+        decode_cursor("garbage")
+
+
+def test_timeline_query_pages(db: Session):
+    """Test merged history is ordered by date and paged by cursor"""
+    now = datetime(2024, 6, 1)
+    patient = Patient(
+        first_name="Иван", last_name="Иванов", date_of_birth=date(1990, 1, 1), gender="male", updated_at=now
+    )
+    db.add(patient)
+    db.flush()
+
+    same_time = datetime(2024, 3, 1, 9, 0)
+    db.add_all([
+        Visit(patient_id=patient.id, doctor_id=1, created_by=1, updated_at=now, visit_date=datetime(2024, 1, 1, 9, 0)),
+        Visit(patient_id=patient.id, doctor_id=1, created_by=1, updated_at=now, visit_date=same_time),
+        Billing(patient_id=patient.id, created_by=1, updated_at=now, amount=Decimal("10"), created_at=same_time),
+        Billing(patient_id=patient.id, created_by=1, updated_at=now, amount=Decimal("20"), created_at=datetime(2024, 2, 1, 9, 0)),
+    ])
+    db.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        rows = db.execute(build_timeline_query(patient.id, 2 + 1, cursor)).all()
+        seen.extend((row.kind, row.occurred_at) for row in rows[:2])
+        if len(rows) <= 2:
+            break
+        last = rows[1]
+        cursor = (last.occurred_at, last.kind, last.id)
+
+    assert seen == [
+        ("visit", same_time),
+        ("billing", same_time),
+        ("billing", datetime(2024, 2, 1, 9, 0)),
+        ("visit", datetime(2024, 1, 1, 9, 0)),
+    ]
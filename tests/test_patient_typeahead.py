@@ -0,0 +1,86 @@
+"""
+Unit tests for patient typeahead index
+"""
+from app.core.prefix_index import PrefixIndex
+from app.modules.patients.models import Patient
+from app.modules.patients.typeahead import PatientTypeaheadIndex, TypeaheadRecord
+
+
+def _build_index() -> PatientTypeaheadIndex:
+    index = PatientTypeaheadIndex()
+    index.build([
+        TypeaheadRecord(1, "Иванов", "Петр", "Сергеевич", "+7 (999) 123-45-67"),
+        TypeaheadRecord(2, "Иванова", "Анна", None, None),
+        TypeaheadRecord(3, "Петров", "Иван", None, "8-912-000-11-22"),
+        TypeaheadRecord(4, "Сидоров", "Алексей", None, None),
+    ])
+    return index
+
+
+def test_prefix_index_add_remove():
+    """Test prefix index keeps pairs sorted and unique"""
+    index = PrefixIndex()
+    index.build([("b", 2), ("a", 1)])
+    index.add("ab", 3)
+    index.add("ab", 3)
+
+    assert index.search("a", 10) == [1, 3]
+    assert index.count("a") == 2
+
+    index.remove("ab", 3)
+    assert index.search("a", 10) == [1]
+
+
+def test_typeahead_prefix_search():
+    """Test search by last name, first name and phone prefix"""
+    index = _build_index()
+
+    assert [r.id for r in index.search("иван", 10)] == [3, 1, 2]
+    assert [r.id for r in index.search("Сид", 10)] == [4]
+    assert [r.id for r in index.search("999 12", 10)] == [1]
+    assert [r.id for r in index.search("912", 10)] == [3]
+
+
+def test_typeahead_multi_token():
+    """Test all tokens must match"""
+    index = _build_index()
+
+    assert [r.id for r in index.search("Иван Петр", 10)] == [1, 3]
+    assert [r.id for r in index.search("Иванова Ан", 10)] == [2]
+
+
+def test_typeahead_incremental_updates():
+    """Test upsert and remove keep index in sync"""
+    index = _build_index()
+
+    patient = Patient(id=5, last_name="Ёлкин", first_name="Олег", phone=None, is_active="Y")
+    index.upsert(patient)
+    assert [r.id for r in index.search("елк", 10)] == [5]
+
+    patient.last_name = "Смирнов"
+    index.upsert(patient)
+    assert index.search("елк", 10) == []
+    assert [r.id for r in index.search("смир", 10)] == [5]
+
+    index.remove(5)
+    assert index.search("смир", 10) == []
+    assert len(index) == 4
+
+
+def test_typeahead_changes_during_rebuild():
+    """Test changes made while rebuilding are applied on top of the snapshot"""
+    index = _build_index()
+    index.begin_rebuild()
+    index.upsert(Patient(id=5, last_name="Орлов", first_name="Олег", phone=None, is_active="Y"))
+    index.remove(4)
+    index.upsert(Patient(id=6, last_name="Зайцев", first_name="Илья", phone=None, is_active="Y"))
+    index.remove(6)
+
+    index.build([
+        TypeaheadRecord(4, "Сидоров", "Алексей", None, None),
+        TypeaheadRecord(6, "Зайцев", "Илья", None, None),
+    ])
+
+    assert [r.id for r in index.search("орл", 10)] == [5]
+    assert index.search("сид", 10) == []
+    assert index.search("зайц", 10) == []
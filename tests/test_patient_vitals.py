@@ -0,0 +1,47 @@
+"""
+Unit tests for patient vitals series
+"""
+from datetime import date, datetime
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.modules.patients.models import Patient
+from app.modules.patients.vitals import build_bucket_query, build_raw_query, to_columns
+from app.modules.visits.models import Visit, VitalSigns
+
+
+def test_bucket_query_groups_by_same_expression():
+    """Test date_trunc unit is inlined so SELECT and GROUP BY match"""
+    sql = str(build_bucket_query("blood_pressure", "week", 1).compile(dialect=postgresql.dialect()))
+
+    assert sql.count("date_trunc('week', vital_signs.measured_at)") == 3
+    assert "blood_pressure_systolic_avg" in sql and "blood_pressure_diastolic_max" in sql
+    assert "JOIN visits" in sql
+
+
+def test_raw_series_is_columnar(db: Session):
+    """Test raw points are filtered by patient and returned as column arrays"""
+    now = datetime(2024, 6, 1)
+    patients = [
+        Patient(first_name="Иван", last_name="Иванов", date_of_birth=date(1990, 1, 1), gender="male", updated_at=now),
+        Patient(first_name="Петр", last_name="Петров", date_of_birth=date(1985, 1, 1), gender="male", updated_at=now),
+    ]
+    db.add_all(patients)
+    db.flush()
+    for patient, rates in zip(patients, ([70, 80], [100])):
+        for day, rate in enumerate(rates, start=1):
+            db.add(Visit(
+                patient_id=patient.id, doctor_id=1, created_by=1, updated_at=now, visit_date=datetime(2024, 1, day),
+                vital_signs=[VitalSigns(heart_rate=rate, measured_at=datetime(2024, 1, day, 9, 0))],
+            ))
+    db.add(Visit(
+        patient_id=patients[0].id, doctor_id=1, created_by=1, updated_at=now, visit_date=datetime(2024, 1, 3),
+        vital_signs=[VitalSigns(weight=80.5, measured_at=datetime(2024, 1, 3, 9, 0))],
+    ))
+    db.commit()
+
+    rows = list(reversed(db.execute(build_raw_query("heart_rate", patients[0].id)).all()))
+
+    assert [row.ts for row in rows] == [datetime(2024, 1, 1, 9, 0), datetime(2024, 1, 2, 9, 0)]
+    assert to_columns(rows, ["heart_rate"]) == {"heart_rate": [70, 80]}
@@ -0,0 +1,44 @@
+"""
+Unit tests for reference validation
+"""
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from app.db.references import Reference, build_references_query, foreign_key_label
+from app.modules.auth.models import User
+from app.modules.patients.models import Patient
+
+
+class FakeDriverError(Exception):
+    """Driver error with an SQLSTATE code"""
+
+    def __init__(self, sqlstate, message):
+        super().__init__(message)
+        self.sqlstate = sqlstate
+
+
+def test_references_checked_in_one_statement():
+    """Test all references are checked by one SELECT with an EXISTS per reference"""
+    query = build_references_query([
+        Reference(Patient, 1, "Patient"),
+        Reference(User, 2, "Doctor"),
+    ])
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert sql.count("EXISTS") == 2
+    assert "patients" in sql and "users" in sql
+
+
+def test_foreign_key_violation_label():
+    """Test a foreign key violation is mapped to an entity label by column"""
+    orig = FakeDriverError(
+        "23503",
+        'insert or update on table "visits" violates foreign key constraint\n'
+        'DETAIL:  Key (doctor_id)=(42) is not present in table "users".'
+    )
+    assert foreign_key_label(IntegrityError("INSERT", {}, orig)) == "Doctor"
+
+
+def test_other_integrity_errors_are_not_translated():
+    """Test other integrity errors (e.g. unique violations) are not treated as 404"""
+    orig = FakeDriverError("23505", "duplicate key value violates unique constraint")
+    assert foreign_key_label(IntegrityError("INSERT", {}, orig)) is None
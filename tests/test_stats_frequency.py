@@ -0,0 +1,53 @@
+"""
+Unit tests for diagnosis and treatment frequency stats
+"""
+from datetime import date, datetime
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.modules.patients.models import Patient
+from app.modules.stats.frequency import build_frequency_query, format_group
+from app.modules.visits.models import Diagnosis, Treatment, Visit
+
+
+def test_age_band_groups_by_same_expression():
+    """Test age group bounds are inlined so SELECT and GROUP BY match"""
+    sql = str(build_frequency_query("diagnoses", "age_band").compile(dialect=postgresql.dialect()))
+
+    assert sql.count("age(visits.visit_date, patients.date_of_birth)) >= 75") == 2
+    assert "JOIN patients" in sql
+    assert "row_number() OVER (PARTITION BY counts.grp" in sql
+
+
+def test_top_diagnoses_per_doctor(db: Session):
+    """Test top-N codes are counted per group"""
+    now = datetime(2024, 6, 1)
+    patient = Patient(first_name="Иван", last_name="Иванов", date_of_birth=date(1990, 1, 1), gender="male", updated_at=now)
+    db.add(patient)
+    db.flush()
+    codes_by_doctor = {1: ["J06.9", "J06.9", "I10", "E11.9"], 2: ["I10"]}
+    for doctor_id, codes in codes_by_doctor.items():
+        for code in codes:
+            db.add(Visit(
+                patient_id=patient.id, doctor_id=doctor_id, created_by=1, updated_at=now, visit_date=now,
+                diagnoses=[Diagnosis(icd_code=code, diagnosis_name=f"Диагноз {code}", is_primary="Y")],
+                treatments=[Treatment(treatment_name="Парацетамол")],
+            ))
+    db.commit()
+
+    rows = db.execute(build_frequency_query("diagnoses", "doctor", top=2)).all()
+    assert [(row.grp, row.key, row.count, row.patients) for row in rows] == [
+        (1, "J06.9", 2, 1), (1, "E11.9", 1, 1), (2, "I10", 1, 1),
+    ]
+
+    rows = db.execute(build_frequency_query("treatments", date_from=datetime(2024, 1, 1))).all()
+    assert [(row.grp, row.key, row.count) for row in rows] == [(None, "Парацетамол", 5)]
+
+
+def test_format_group():
+    """Test groups are reported as YYYY-MM months and gender enum values"""
+    assert format_group("month", datetime(2024, 3, 1)) == "2024-03"
+    assert format_group("gender", Patient.gender.type.enum_class("male")) == "male"
+    assert format_group("doctor", 7) == "7"
+    assert format_group(None, None) is None
@@ -0,0 +1,78 @@
+"""
+Unit tests for visit creation
+"""
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.modules.visits.models import Diagnosis, Treatment, Visit, VitalSigns
+from app.modules.visits.schemas import DiagnosisBase, TreatmentBase, VisitCreate, VitalSignsBase
+from app.modules.visits.service import VisitsService, diagnosis_values, treatment_values
+
+
+class RecordingSession:
+    """Session that records added objects and commits instead of writing to a database"""
+
+    def __init__(self):
+        self.added = []
+        self.commits = 0
+
+    def add(self, instance):
+        self.added.append(instance)
+
+    async def execute(self, statement, *args, **kwargs):
+        # Every referenced row exists
+        return SimpleNamespace(one=lambda: (True, True, True))
+
+    async def commit(self):
+        self.commits += 1
+
+    async def refresh(self, instance):
+        pass
+
+
+def test_diagnosis_values_store_flag_as_yes_no():
+    """Test is_primary is stored as Y/N and the code is normalized"""
+    primary = diagnosis_values(DiagnosisBase(icd_code="j06.9", diagnosis_name="ОРВИ"))
+    secondary = diagnosis_values(DiagnosisBase(icd_code="R51", diagnosis_name="Головная боль", is_primary=False))
+
+    assert primary == {"icd_code": "J06.9", "diagnosis_name": "ОРВИ", "is_primary": "Y"}
+    assert secondary["is_primary"] == "N"
+
+
+def test_treatment_values_map_medication_name():
+    """Test medication_name is stored as treatment_name and instructions are dropped"""
+    values = treatment_values(TreatmentBase(
+        medication_name="Парацетамол", dosage="500 мг", frequency="3 раза в день", duration_days=5,
+        instructions="После еды"
+    ))
+
+    assert values == {
+        "treatment_name": "Парацетамол", "dosage": "500 мг", "frequency": "3 раза в день", "duration_days": 5
+    }
+
+
+def test_create_visit_with_children_in_one_commit():
+    """Test the visit and its children are added through relationships and committed once"""
+    session = RecordingSession()
+    visit_data = VisitCreate(
+        patient_id=1, doctor_id=2, visit_date=datetime(2024, 6, 1, 10),
+        vital_signs=VitalSignsBase(heart_rate=72, temperature=36.6),
+        diagnoses=[
+            DiagnosisBase(icd_code="J06.9", diagnosis_name="ОРВИ"),
+            DiagnosisBase(icd_code="R51", diagnosis_name="Головная боль", is_primary=False),
+        ],
+        treatments=[TreatmentBase(medication_name="Парацетамол", dosage="500 мг", frequency="3 раза в день")],
+    )
+
+    visit = asyncio.run(VisitsService(session).create_visit(visit_data, created_by=3))
+
+    assert session.added == [visit] and session.commits == 1
+    assert isinstance(visit, Visit) and visit.created_by == 3
+    assert [(type(item), item.icd_code, item.is_primary) for item in visit.diagnoses] == [
+        (Diagnosis, "J06.9", "Y"), (Diagnosis, "R51", "N")
+    ]
+    assert [(type(item), item.treatment_name) for item in visit.treatments] == [(Treatment, "Парацетамол")]
+    assert [(type(item), item.heart_rate, item.temperature) for item in visit.vital_signs] == [
+        (VitalSigns, 72, 36.6)
+    ]
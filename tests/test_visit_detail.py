@@ -0,0 +1,54 @@
+"""
+Unit tests for visit detail loading
+"""
+from datetime import date, datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.modules.auth.models import User
+from app.modules.patients.models import Patient
+from app.modules.visits.models import Diagnosis, Treatment, Visit, VitalSigns
+from app.modules.visits.repository import visit_detail_query
+from app.modules.visits.service import build_visit_detail
+
+
+def test_visit_detail_loads_in_bounded_queries(db: Session):
+    """Test visit detail with all relationships loads in 4 queries without lazy loads"""
+    now = datetime(2024, 6, 1)
+    patient = Patient(
+        first_name="Иван", last_name="Иванов", date_of_birth=date(1990, 1, 1), gender="male", updated_at=now
+    )
+    doctor = User(username="doctor", email="doctor@example.com", full_name="Петров П.П.",
+                  hashed_password="x", updated_at=now)
+    db.add_all([patient, doctor])
+    db.flush()
+    visit = Visit(
+        patient_id=patient.id, doctor_id=doctor.id, created_by=doctor.id, visit_date=now, updated_at=now,
+        diagnoses=[Diagnosis(icd_code="J06.9", diagnosis_name="ОРВИ", is_primary="Y"),
+                   Diagnosis(icd_code="R51", diagnosis_name="Головная боль", is_primary="N")],
+        treatments=[Treatment(treatment_name="Парацетамол", dosage="500 мг", frequency="3 раза в день")],
+        vital_signs=[VitalSigns(heart_rate=70)],
+    )
+    db.add(visit)
+    db.commit()
+    visit_id = visit.id
+    db.expunge_all()
+
+    statements = []
+    engine = db.get_bind()
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        loaded = db.execute(visit_detail_query(), {"visit_id": visit_id}).unique().scalar_one()
+        detail = build_visit_detail(loaded)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 4
+    assert detail.patient_name == "Иванов Иван"
+    assert detail.doctor_name == "Петров П.П."
+    assert [item.icd_code for item in detail.diagnoses] == ["J06.9", "R51"]
+    assert detail.diagnoses[0].is_primary is True
+    assert detail.treatments[0].medication_name == "Парацетамол"
+    assert detail.vital_signs.heart_rate == 70
@@ -0,0 +1,67 @@
+"""
+Unit tests for vital signs
+"""
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.modules.visits.models import Visit, VitalSigns
+from app.modules.visits.schemas import VitalSignsBase, VitalSignsBulkCreate, VitalSignsReading, VisitUpdate
+from app.modules.visits.service import VisitsService, check_reading
+
+
+def test_bmi_is_computed_by_database(db: Session):
+    """Test BMI is computed by the database from weight and height"""
+    now = datetime(2024, 6, 1)
+    visit = Visit(
+        patient_id=1, doctor_id=1, created_by=1, visit_date=now, updated_at=now,
+        vital_signs=[VitalSigns(weight=70.0, height=175.0), VitalSigns(heart_rate=70)],
+    )
+    db.add(visit)
+    db.commit()
+
+    measured, without_height = sorted(visit.vital_signs, key=lambda item: item.id)
+    db.refresh(measured)
+    db.refresh(without_height)
+
+    assert measured.bmi == 22.9
+    assert without_height.bmi is None
+
+
+def test_reading_ranges_are_checked():
+    """Test readings outside physiological ranges are rejected with the field name"""
+    assert check_reading(VitalSignsReading(visit_id=1, heart_rate=72, temperature=36.6)) is None
+    assert "heart_rate" in check_reading(VitalSignsReading(visit_id=1, heart_rate=400))
+    assert check_reading(VitalSignsReading(visit_id=1)) == "No measurements"
+
+
+def test_update_after_bulk_ingest_replaces_all_readings(db: Session, async_db):
+    """Test the latest reading is returned after bulk ingest and updates replace all readings"""
+    now = datetime(2024, 6, 1)
+    visit = Visit(patient_id=1, doctor_id=1, created_by=1, visit_date=now, updated_at=now)
+    db.add(visit)
+    db.commit()
+    service = VisitsService(async_db)
+
+    async def run():
+        await service.add_vital_signs_bulk(VitalSignsBulkCreate(items=[
+            VitalSignsReading(visit_id=visit.id, heart_rate=70, measured_at=datetime(2024, 6, 1, 9, tzinfo=timezone.utc)),
+            VitalSignsReading(visit_id=visit.id, heart_rate=90, measured_at=datetime(2024, 6, 1, 10, tzinfo=timezone.utc)),
+            VitalSignsReading(visit_id=visit.id, heart_rate=80, measured_at=datetime(2024, 6, 1, 8, tzinfo=timezone.utc)),
+        ]))
+        latest = await service.repository.get_vital_signs_by_visit(visit.id)
+        assert latest.heart_rate == 90
+
+        await service.update_vital_signs(visit.id, VitalSignsBase(heart_rate=75))
+        assert [row.heart_rate for row in db.scalars(select(VitalSigns))] == [75]
+
+        await service.add_vital_signs_bulk(VitalSignsBulkCreate(items=[
+            VitalSignsReading(visit_id=visit.id, heart_rate=60),
+            VitalSignsReading(visit_id=visit.id, heart_rate=65),
+        ]))
+        await service.update_visit(visit.id, VisitUpdate(vital_signs=VitalSignsBase(heart_rate=72)))
+        assert [row.heart_rate for row in db.scalars(select(VitalSigns))] == [72]
+
+    asyncio.run(run())